@@ -0,0 +1,273 @@
+import argparse
+import compileall
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ===========================
+# STARTUP BENCHMARK
+# ===========================
+#
+# Every measurement runs in a fresh interpreter so module caches never
+# hide cold-start cost. Settings and channel state go to a throwaway
+# home directory. Run from anywhere:
+#
+#   python benchmarks/startup.py                  report
+#   python benchmarks/startup.py --save-baseline  record this machine's numbers
+#   python benchmarks/startup.py --check          exit 1 on a regression
+#
+# --check only gates the aggregate metrics (CHECKED) that are present in
+# the baseline; per-module import times are too small and noisy to gate
+# on and are only reported. Baselines are scaled by the stdlib import
+# time measured in the same run, so a machine that is busier or slower
+# than when the baseline was saved doesn't fail the check. The committed
+# baseline was recorded headless, so it has no ui.* metrics and
+# TwitchChatUI startup is not covered by --check until a baseline is
+# saved on a machine with a display.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+PROJECT_MODULES = sorted(name[:-3] for name in os.listdir(ROOT) if name.endswith(".py"))
+RESULT_PREFIX = "@@RESULT "
+MOCK_LINES = "\n".join(f"mock chatter line {i} Kappa" for i in range(5))
+CALIBRATION = "calibration.stdlib_import"
+CALIBRATION_MODULES = "argparse, json, threading, gzip, dbm, mmap, heapq"
+CHECKED = (
+    "import.headless", "import.main", "config.first_get", "engine.total_to_first_message",
+    "ui.import", "ui.construct",
+)
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+def has_display():
+    """Whether Tk can open a window here"""
+    if sys.platform in ("win32", "darwin"):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+# ---------------------------
+# Probes (run in the child)
+# ---------------------------
+
+def probe_config():
+    start = time.perf_counter()
+    from config import Config
+    imported = time.perf_counter()
+    cfg = Config()
+    constructed = time.perf_counter()
+    cfg.get("STREAMER_NAME")  # Settings load lazily on first read
+    loaded = time.perf_counter()
+    return {
+        "config.import": _ms(imported - start),
+        "config.construct": _ms(constructed - imported),
+        "config.first_get": _ms(loaded - constructed),
+    }
+
+def probe_ui():
+    import tkinter as tk
+    start = time.perf_counter()
+    from main import TwitchChatUI
+    imported = time.perf_counter()
+    root = tk.Tk()
+    root.withdraw()
+    created = time.perf_counter()
+    app = TwitchChatUI(root)
+    root.update_idletasks()
+    constructed = time.perf_counter()
+    result = {
+        "ui.import": _ms(imported - start),
+        "ui.tk_root": _ms(created - imported),
+        "ui.construct": _ms(constructed - created),
+    }
+    for name in ("settings_window", "emote_panel", "perf_overlay"):
+        before = time.perf_counter()
+        getattr(app, name).show()
+        root.update_idletasks()
+        result[f"ui.{name}"] = _ms(time.perf_counter() - before)
+    app._on_close()
+    root.update()
+    root.destroy()
+    return result
+
+def probe_first_message():
+    import threading
+    start = time.perf_counter()
+    from engine import ChatEngine
+    from llm_client import llm_pool
+    from sinks import CallbackSink
+    imported = time.perf_counter()
+
+    llm_pool._call_llm = lambda system, user, image, cancel=None: MOCK_LINES
+    first = threading.Event()
+    engine = ChatEngine(sinks=[CallbackSink(lambda message: first.set())], capture_screen=False)
+    constructed = time.perf_counter()
+    engine.start()
+    received = first.wait(30)
+    done = time.perf_counter()
+    engine.close()
+    if not received:
+        raise RuntimeError("no message within 30s")
+    return {
+        "engine.import": _ms(imported - start),
+        "engine.construct": _ms(constructed - imported),
+        "engine.first_message": _ms(done - constructed),
+        "engine.total_to_first_message": _ms(done - start),
+    }
+
+PROBES = {
+    "config": probe_config,
+    "ui": probe_ui,
+    "first_message": probe_first_message,
+}
+
+# ---------------------------
+# Runner (parent process)
+# ---------------------------
+
+def _child_env(home):
+    env = dict(os.environ)
+    env["HOME"] = env["USERPROFILE"] = home
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+def run_probe(name, home):
+    """Run one probe in a fresh interpreter and return its timings"""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--probe", name],
+                          cwd=ROOT, env=_child_env(home), capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"probe {name} failed:\n{proc.stderr.strip()}")
+
+def run_importtime(module, home):
+    """Self and cumulative import time (ms) of every module imported by `import module`"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=_child_env(home), capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()}")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return timings
+
+def _median(samples):
+    return round(statistics.median(samples), 3)
+
+def collect(runs, include_ui):
+    """Median timings over `runs` cold starts, as a flat metric -> ms dict"""
+    samples = {}
+    slowest = {}
+    entry = "main" if include_ui else "headless"
+    # Children don't write bytecode; compile it once so edited modules aren't recompiled every run
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    with tempfile.TemporaryDirectory() as home:
+        os.makedirs(os.path.join(home, "Documents"), exist_ok=True)
+        for _ in range(runs):
+            calibration = run_importtime(CALIBRATION_MODULES, home)
+            samples.setdefault(CALIBRATION, []).append(
+                sum(cumulative for name, (_, cumulative) in calibration.items()
+                    if name in CALIBRATION_MODULES.split(", ")))
+
+            timings = run_importtime(entry, home)
+            for name, (self_ms, cumulative_ms) in timings.items():
+                if name in PROJECT_MODULES:
+                    samples.setdefault(f"import.{name}", []).append(cumulative_ms)
+                slowest.setdefault(name, []).append(self_ms)
+
+            probes = ["config", "first_message"] + (["ui"] if include_ui else [])
+            for probe in probes:
+                for metric, value in run_probe(probe, home).items():
+                    samples.setdefault(metric, []).append(value)
+
+    metrics = {metric: _median(values) for metric, values in sorted(samples.items())}
+    heaviest = sorted(((_median(v), k) for k, v in slowest.items()), reverse=True)[:10]
+    return metrics, heaviest
+
+def machine_scale(metrics, baseline):
+    """How much slower this run's stdlib imports were than the baseline's"""
+    if not metrics.get(CALIBRATION) or not baseline.get(CALIBRATION):
+        return 1.0
+    return metrics[CALIBRATION] / baseline[CALIBRATION]
+
+def compare(metrics, baseline, tolerance, slack_ms, scale=1.0):
+    """CHECKED metrics slower than baseline * scale * (1 + tolerance) + slack_ms"""
+    regressions = []
+    for metric in CHECKED:
+        value, base = metrics.get(metric), baseline.get(metric)
+        if value is not None and base is not None and value > base * scale * (1 + tolerance) + slack_ms:
+            regressions.append((metric, base * scale, value))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the chat simulator")
+    parser.add_argument("--runs", type=int, default=9, help="Cold starts per measurement (median is reported)")
+    parser.add_argument("--no-ui", action="store_true", help="Skip Tk measurements even if a display is available")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write results to {os.path.basename(BASELINE_PATH)}")
+    parser.add_argument("--check", action="store_true", help="Compare against the baseline, exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown for --check")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="Allowed absolute slowdown for --check")
+    parser.add_argument("--probe", choices=sorted(PROBES), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        sys.path.insert(0, ROOT)
+        print(RESULT_PREFIX + json.dumps(PROBES[args.probe]()), flush=True)
+        return 0
+
+    include_ui = not args.no_ui and has_display()
+    if not include_ui:
+        print("[INFO] No display available, skipping TwitchChatUI timings")
+    metrics, heaviest = collect(max(1, args.runs), include_ui)
+
+    print(f"{'metric':<40}{'ms':>10}")
+    for metric, value in metrics.items():
+        print(f"{metric:<40}{value:>10.2f}")
+    print("\nSlowest modules by self import time:")
+    for value, name in heaviest:
+        print(f"  {name:<38}{value:>10.2f}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "runs": args.runs,
+                "ui": include_ui,
+                "metrics": metrics,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"[OK] Baseline written to {BASELINE_PATH}")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"[ERROR] No baseline at {BASELINE_PATH}, run with --save-baseline first")
+            return 1
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["metrics"]
+        missing = sorted(metric for metric in CHECKED if metric in metrics and metric not in baseline)
+        if missing:
+            print(f"[INFO] Not in the baseline, not checked: {', '.join(missing)}")
+        if not any(metric.startswith("ui.") for metric in baseline):
+            print("[INFO] Baseline has no ui.* metrics: TwitchChatUI startup regressions are not covered")
+        scale = machine_scale(metrics, baseline)
+        print(f"[INFO] Stdlib imports ran {scale:.2f}x the baseline's time; baselines scaled to match")
+        regressions = compare(metrics, baseline, args.tolerance, args.slack_ms, scale)
+        for metric, base, value in regressions:
+            print(f"[ERROR] {metric}: {value:.2f}ms vs scaled baseline {base:.2f}ms")
+        if regressions:
+            return 1
+        print("[OK] No startup regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import threading
+
+# ===========================
+# CANCELLATION TOKENS
+# ===========================
+
+class CancelToken:
+    """One-shot cancellation signal shared by a worker and whatever it waits on.
+
+    Workers sleep with wait() instead of time.sleep() so stop() wakes
+    them at once; blocking calls register on_cancel() callbacks to be
+    interrupted.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def wait(self, timeout=None):
+        """Sleep up to `timeout` seconds; True if cancelled"""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback):
+        """Call `callback` on cancellation (now if already cancelled); returns a function that unregisters it"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
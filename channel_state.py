@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+import threading
+
+# ===========================
+# CHANNEL STATE PERSISTENCE
+# ===========================
+
+class ChannelStateStore:
+    """Saves a TwitchData channel as a compressed base snapshot plus a delta journal.
+
+    checkpoint() appends only the fields written since the previous
+    checkpoint to the journal. Once the journal grows past
+    `compact_bytes` it is folded into a fresh base snapshot. restore()
+    loads the base and replays the journal, skipping torn lines left by
+    interrupted or failed writes.
+    """
+    BASE_NAME = "channel_state.json.gz"
+    JOURNAL_NAME = "channel_state.journal"
+
+    def __init__(self, directory, compact_bytes=4 * 1024 * 1024):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self.base_path = os.path.join(directory, self.BASE_NAME)
+        self.journal_path = os.path.join(directory, self.JOURNAL_NAME)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def restore(self, data):
+        """Load saved state into a TwitchData, returns True if anything was restored"""
+        restored = False
+        with self._lock:
+            if os.path.exists(self.base_path):
+                try:
+                    with gzip.open(self.base_path, "rt", encoding="utf-8") as f:
+                        data.apply_state(json.load(f))
+                    restored = True
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] Could not read channel snapshot: {e}")
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "r", encoding="utf-8", errors="replace") as f:
+                    for line in f:
+                        try:
+                            changes = json.loads(line)
+                        except ValueError:
+                            continue  # Torn by an interrupted or failed write
+                        data.apply_state(changes)
+                        restored = True
+        # Everything just loaded is already on disk
+        data.take_changes()
+        return restored
+
+    def checkpoint(self, data):
+        """Append the changes since the last checkpoint, compacting when the journal is large"""
+        changes = data.take_changes()
+        if changes is None:
+            return False
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self._append(json.dumps(changes, separators=(",", ":")) + "\n")
+            except OSError:
+                # Keep them pending so the next checkpoint retries
+                data.mark_unsaved(changes)
+                raise
+            if os.path.getsize(self.journal_path) > self.compact_bytes:
+                self._compact(data)
+        return True
+
+    def _append(self, line):
+        data = line.encode("utf-8")
+        with open(self.journal_path, "a+b") as f:
+            # Start on a fresh line if a failed write left a torn one behind
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+
+    def compact(self, data):
+        """Write a full base snapshot and clear the journal"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._compact(data)
+
+    def _compact(self, data):
+        changes = data.take_changes()  # The full snapshot covers anything still pending
+        temp_path = self.base_path + ".tmp"
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+                json.dump(data.export_state(), f, separators=(",", ":"))
+            os.replace(temp_path, self.base_path)
+        except OSError:
+            if changes is not None:
+                data.mark_unsaved(changes)
+            raise
+        open(self.journal_path, "w").close()
+
+    def start(self, data, interval=30.0):
+        """Checkpoint periodically on a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(data, interval), daemon=True)
+        self._thread.start()
+
+    def _run(self, data, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.checkpoint(data)
+            except OSError as e:
+                print(f"[ERROR] Channel checkpoint failed: {e}")
+
+    def stop(self, data=None):
+        """Stop the checkpoint thread and save anything still pending"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if data is not None:
+            try:
+                self.checkpoint(data)
+            except OSError as e:
+                print(f"[ERROR] Final channel checkpoint failed: {e}")
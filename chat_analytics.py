@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+from collections import deque
+
+from hype_analyzer import HypeAnalyzer
+
+# ===========================
+# STREAMING CHAT ANALYTICS
+# ===========================
+
+class ChatAnalytics:
+    """Time-decayed rolling aggregates over every displayed message.
+
+    Counters decay exponentially with the given half-life, so each
+    message costs O(1) and old activity fades out without keeping a
+    list of past messages. Unique chatters use an exact sliding window
+    because a decayed count cannot tell repeat senders apart.
+    """
+    def __init__(self, half_life=10.0, unique_window=60.0, analyzer=None, emotes=()):
+        self.half_life = half_life
+        self.unique_window = unique_window
+        self.analyzer = analyzer or HypeAnalyzer()
+        self.emotes = emotes
+        self._lock = threading.Lock()
+        self._last = None
+        self._messages = 0.0
+        self._hype = 0.0
+        self._chill = 0.0
+        self._emotes = 0.0
+        self._words = 0.0
+        self._caps = 0.0
+        self._recent = deque()  # (timestamp, username) inside the unique window
+        self._senders = {}  # username -> messages inside the unique window
+
+    def _decay(self, now):
+        if self._last is not None and now > self._last:
+            factor = 0.5 ** ((now - self._last) / self.half_life)
+            self._messages *= factor
+            self._hype *= factor
+            self._chill *= factor
+            self._emotes *= factor
+            self._words *= factor
+            self._caps *= factor
+        if self._last is None or now > self._last:
+            self._last = now
+
+    def _expire(self, now):
+        cutoff = now - self.unique_window
+        while self._recent and self._recent[0][0] < cutoff:
+            _, username = self._recent.popleft()
+            remaining = self._senders[username] - 1
+            if remaining:
+                self._senders[username] = remaining
+            else:
+                del self._senders[username]
+
+    def record(self, message):
+        """Fold one ChatMessage into the aggregates"""
+        if message.kind != message.CHAT:
+            return
+        text = message.text
+        counts = self.analyzer.analyze(text, self.emotes)
+        letters = [ch for ch in text if ch.isalpha()]
+        is_caps = len(letters) > 3 and all(ch.isupper() for ch in letters)
+        now = message.timestamp
+
+        with self._lock:
+            self._decay(now)
+            self._messages += 1
+            self._hype += counts.get("hype", 0) + counts.get("emote", 0)
+            self._chill += counts.get("chill", 0)
+            self._emotes += counts.get("emote", 0)
+            self._words += len(text.split())
+            self._caps += is_caps
+            self._recent.append((now, message.username))
+            self._senders[message.username] = self._senders.get(message.username, 0) + 1
+            self._expire(now)
+
+    def snapshot(self, now=None):
+        """Current aggregates as a dict"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._decay(now)
+            self._expire(now)
+            messages = self._messages
+            per_message = messages or 1
+            # Fade the mood back to neutral once chat goes quiet
+            confidence = min(1.0, messages)
+            return {
+                # A decayed count with half-life h holds about rate * h / ln 2 messages
+                "messages_per_sec": messages * math.log(2) / self.half_life,
+                "hype_balance": max(-1.0, min(1.0, confidence * (self._hype - self._chill) / (per_message * 2))),
+                "emote_density": self._emotes / (self._words or 1),
+                "caps_ratio": self._caps / per_message,
+                "unique_chatters": len(self._senders),
+            }
+
+    def hype_balance(self, now=None):
+        return self.snapshot(now)["hype_balance"]
+
+    def reset(self):
+        with self._lock:
+            self._last = None
+            self._messages = self._hype = self._chill = 0.0
+            self._emotes = self._words = self._caps = 0.0
+            self._recent.clear()
+            self._senders.clear()
@@ -0,0 +1,268 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+
+from data_structures import ChatMessage
+
+# ===========================
+# ON-DISK CHAT LOG
+# ===========================
+
+# One index entry per record: message timestamp and byte offset into the segment
+INDEX_RECORD = struct.Struct("<dQ")
+
+class ChatLog:
+    """Append-only chat log split into fixed-size segments.
+
+    Each segment is a pair of files: NAME.jsonl with one record per line
+    and NAME.idx with a fixed-size (timestamp, offset) entry per record,
+    so readers can jump to record n or bisect by time without parsing text.
+    Buffered writes reach disk at most `flush_interval` seconds after they
+    are appended. With `max_bytes` set, the oldest segments in the
+    directory (from any session) are deleted whenever a segment is opened
+    and the logs there add up to more than that.
+    """
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, session=None,
+                 flush_interval=5.0, max_bytes=None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segments = []  # Base paths, oldest first
+        self._opened = 0
+        self._data = None
+        self._index = None
+        self._offset = 0
+        self._flush_timer = None
+        self._open_segment()
+
+    def _open_segment(self):
+        base = os.path.join(self.directory, f"chat-{self.session}-{self._opened:04d}")
+        self._opened += 1
+        self._data = open(base + ".jsonl", "ab")
+        self._index = open(base + ".idx", "ab")
+        self._offset = self._data.tell()
+        self._segments.append(base)
+        if self.max_bytes:
+            self._trim(base)
+
+    def _trim(self, current):
+        """Delete the oldest segments in the directory until the logs fit in max_bytes"""
+        segments = []
+        for path in glob.glob(os.path.join(self.directory, "chat-*.idx")):
+            base = path[:-4]
+            try:
+                size = os.path.getsize(path) + os.path.getsize(base + ".jsonl")
+                segments.append((os.path.getmtime(path), base, size))
+            except OSError:
+                continue
+        total = sum(size for _, _, size in segments)
+        for _, base, size in sorted(segments):
+            if total <= self.max_bytes:
+                break
+            if base == current:
+                continue
+            try:
+                os.remove(base + ".idx")
+                os.remove(base + ".jsonl")
+            except OSError as e:
+                print(f"[ERROR] Could not delete old chat log {base}: {e}")
+                continue
+            total -= size
+            if base in self._segments:
+                self._segments.remove(base)
+
+    def _close_segment(self):
+        self._data.close()
+        self._index.close()
+        self._data = self._index = None
+
+    def append(self, message):
+        """Append one ChatMessage to the current segment"""
+        line = (json.dumps(message.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._data is None:
+                return
+            if self._offset and self._offset + len(line) > self.segment_bytes:
+                self._close_segment()
+                self._open_segment()
+            # Both files are buffered, so either can reach disk first after a crash;
+            # _Segment drops index entries whose record isn't complete in the data file
+            self._data.write(line)
+            self._index.write(INDEX_RECORD.pack(message.timestamp, self._offset))
+            self._offset += len(line)
+            if self._flush_timer is None and self.flush_interval:
+                self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            self._flush_files()
+
+    def _flush_files(self):
+        if self._data:
+            self._data.flush()
+            self._index.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_files()
+
+    def reader(self):
+        """Get a reader over everything appended so far"""
+        self.flush()
+        with self._lock:
+            return ChatLogReader(list(self._segments))
+
+    def close(self):
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._data:
+                self._close_segment()
+
+class _Segment:
+    """Read-only memory maps of one segment's data and index files"""
+    def __init__(self, base):
+        self.count = 0
+        self.data = self.index = None
+        with open(base + ".idx", "rb") as index_file, open(base + ".jsonl", "rb") as data_file:
+            # Ignore a torn trailing index entry from an interrupted write
+            count = os.fstat(index_file.fileno()).st_size // INDEX_RECORD.size
+            if count and os.fstat(data_file.fileno()).st_size:
+                self.index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+                # After a crash the last entries may point at data that never reached disk
+                while count and not self._complete(count - 1):
+                    count -= 1
+                self.count = count
+                if not count:
+                    self.close()
+
+    def _complete(self, i):
+        offset = INDEX_RECORD.unpack_from(self.index, i * INDEX_RECORD.size)[1]
+        return offset < len(self.data) and self.data.find(b"\n", offset) >= 0
+
+    def timestamp(self, i):
+        return INDEX_RECORD.unpack_from(self.index, i * INDEX_RECORD.size)[0]
+
+    def record(self, i):
+        offset = INDEX_RECORD.unpack_from(self.index, i * INDEX_RECORD.size)[1]
+        return self.data[offset:self.data.find(b"\n", offset)]
+
+    def lower_bound(self, timestamp):
+        """First record index with a timestamp >= the given one"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def close(self):
+        if self.data:
+            self.data.close()
+            self.index.close()
+            self.data = self.index = None
+
+class ChatLogReader:
+    """Random access, time-range scans and export over ChatLog segments.
+
+    The reader sees the segments as they were when it was created. Time
+    lookups bisect the index, which assumes records were appended in
+    roughly timestamp order (true for a single engine).
+    """
+    def __init__(self, segments):
+        self._segments = []
+        self._starts = []  # Global record number of each segment's first record
+        total = 0
+        for base in segments:
+            segment = _Segment(base)
+            if segment.count:
+                self._segments.append(segment)
+                self._starts.append(total)
+                total += segment.count
+        self._count = total
+
+    @classmethod
+    def open_session(cls, directory, session):
+        """Open the log of a previous session"""
+        pattern = os.path.join(directory, f"chat-{session}-*.idx")
+        return cls([path[:-4] for path in sorted(glob.glob(pattern))])
+
+    @staticmethod
+    def sessions(directory):
+        """List the session names that have logs in a directory"""
+        names = set()
+        for path in glob.glob(os.path.join(directory, "chat-*-*.idx")):
+            names.add(os.path.basename(path)[5:].rsplit("-", 1)[0])
+        return sorted(names)
+
+    def __len__(self):
+        return self._count
+
+    def _locate(self, n):
+        i = bisect_right(self._starts, n) - 1
+        return self._segments[i], n - self._starts[i]
+
+    def get(self, n):
+        """Get record n (0-based) as a ChatMessage"""
+        if not 0 <= n < self._count:
+            raise IndexError(n)
+        segment, local = self._locate(n)
+        return ChatMessage.from_dict(json.loads(segment.record(local)))
+
+    def range(self, start=0, stop=None):
+        """Yield ChatMessages for records start..stop-1"""
+        stop = self._count if stop is None else min(stop, self._count)
+        n = max(0, start)
+        while n < stop:
+            segment, local = self._locate(n)
+            end = min(segment.count, local + (stop - n))
+            for i in range(local, end):
+                yield ChatMessage.from_dict(json.loads(segment.record(i)))
+            n += end - local
+
+    def find_time(self, timestamp):
+        """Record number of the first message at or after a timestamp"""
+        for segment, start in zip(self._segments, self._starts):
+            if segment.timestamp(segment.count - 1) >= timestamp:
+                return start + segment.lower_bound(timestamp)
+        return self._count
+
+    def scan_time(self, start_time=None, end_time=None):
+        """Yield messages with start_time <= timestamp < end_time"""
+        start = self.find_time(start_time) if start_time is not None else 0
+        stop = self.find_time(end_time) if end_time is not None else self._count
+        return self.range(start, stop)
+
+    def export(self, path, formatter, start_time=None, end_time=None):
+        """Write formatter(message) for each message in a time range, returns the count"""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for message in self.scan_time(start_time, end_time):
+                line = formatter(message)
+                if line is not None:
+                    f.write(line + "\n")
+                    count += 1
+        return count
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+        self._starts = []
+        self._count = 0
@@ -0,0 +1,110 @@
+import heapq
+import random
+import threading
+
+# ===========================
+# CHATTER REGISTRY
+# ===========================
+
+class IndexedSet:
+    """Set with O(1) add, discard and uniform random choice"""
+    def __init__(self, items=()):
+        self._items = []
+        self._positions = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item):
+        position = self._positions.pop(item, None)
+        if position is None:
+            return
+        # Move the last item into the hole so removal stays O(1)
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def choice(self, rng=random):
+        return self._items[rng.randrange(len(self._items))]
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+class ChatterRegistry:
+    """Tracks which pool names are available, active in chat or timed out.
+
+    available: pool names that are not banned
+    active:    names with an assigned chatter ID that are not banned
+
+    Both are kept up to date incrementally and bans expire from a
+    min-heap, so picking a chatter costs O(1) regardless of pool size.
+    """
+    def __init__(self, pool, rng=None):
+        self.rng = rng or random
+        self.chatters = {}  # base_name -> (full_id, color)
+        self.banned = {}  # base_name -> ban expiry time
+        self._pool = set(pool)
+        self._available = IndexedSet(pool)
+        self._active = IndexedSet()
+        self._ban_heap = []
+        self._lock = threading.Lock()
+
+    def expire_bans(self, now):
+        """Lift every ban that has expired by now"""
+        with self._lock:
+            while self._ban_heap and self._ban_heap[0][0] <= now:
+                expiry, name = heapq.heappop(self._ban_heap)
+                # A newer ban for the same name leaves a stale heap entry behind
+                if self.banned.get(name) != expiry:
+                    continue
+                del self.banned[name]
+                if name in self._pool:
+                    self._available.add(name)
+                if name in self.chatters:
+                    self._active.add(name)
+
+    def ban(self, name, until):
+        """Time out a base name until the given time and forget its chatter ID"""
+        with self._lock:
+            self.banned[name] = until
+            heapq.heappush(self._ban_heap, (until, name))
+            self._available.discard(name)
+            self._active.discard(name)
+            self.chatters.pop(name, None)
+
+    def register(self, name, full_id, color):
+        """Assign a chatter ID and color to a base name"""
+        with self._lock:
+            self.chatters[name] = (full_id, color)
+            if name not in self.banned:
+                self._active.add(name)
+
+    def get(self, name, default=None):
+        return self.chatters.get(name, default)
+
+    def pick_active(self):
+        """Pick a random active chatter's base name, or None"""
+        with self._lock:
+            return self._active.choice(self.rng) if self._active else None
+
+    def pick_available(self):
+        """Pick a random non-banned base name from the pool, or None"""
+        with self._lock:
+            return self._available.choice(self.rng) if self._available else None
+
+    def has_available(self):
+        return len(self._available) > 0
+
+    def has_active(self):
+        return len(self._active) > 0
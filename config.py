@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+from collections import namedtuple
 
 # ===========================
 # CONFIGURATION MANAGER
@@ -11,7 +13,7 @@ class Config:
     # Default settings
     DEFAULTS = {
         # Settings Directory
-        "SETTINGS_DIR": "C:\\Users\\ecomi\\Documents",
+        "SETTINGS_DIR": os.path.join(os.path.expanduser("~"), "Documents"),
         
         # LLM API Configuration
         "API_URL": "http://127.0.0.1:1234/v1/chat/completions",
@@ -63,6 +65,8 @@ class Config:
         "MESSAGE_CACHE_SIZE": 100,
         "DEBOUNCED_LLM_CALLS": True,
         "LAZY_LOAD_EMOTES": True,
+        "INLINE_EMOTES": True,
+        "EMOTE_IMAGE_CACHE_MB": 32,
         "COMPRESSION_ENABLED": True,
         "QUEUE_PRIORITIZATION": True,
         "AUTO_CLEAR_QUEUE": True,
@@ -72,6 +76,17 @@ class Config:
         "MAX_RETRIES": 3,
         "CONCURRENT_REQUESTS": 2,
         "REQUEST_BUFFER_SIZE": 10,
+        "VIRTUAL_CHAT_VIEW": False,
+        "VIRTUAL_CHAT_HISTORY": 20000,
+        "PERF_INSTRUMENTATION": False,
+        "CHAT_LOG_ENABLED": True,
+        "CHAT_LOG_DIR": "",
+        "CHAT_LOG_SEGMENT_MB": 64,
+        "CHAT_LOG_FLUSH_SECONDS": 5,
+        "CHAT_LOG_MAX_MB": 2048,
+        "CHANNEL_STATE_ENABLED": True,
+        "CHANNEL_STATE_INTERVAL": 30,
+        "USER_TABLE_SIZE": 20000,
         
         # Twitch Feature Toggles
         "SUB_STREAKS_ENABLED": True,
@@ -126,17 +141,17 @@ class Config:
         "PATTERN_DETECTION": True,
         "CONTEXT_AWARENESS": True,
         
-        # Event Settings
-        "EVENT_FOLLOWER_CHANCE": 0.02,
-        "EVENT_SUBSCRIBER_CHANCE": 0.01,
-        "EVENT_HYPE_TRAIN_CHANCE": 0.005,
-        "EVENT_RAID_CHANCE": 0.003,
-        "EVENT_HOST_CHANCE": 0.002,
-        "EVENT_BITS_CHANCE": 0.008,
-        "EVENT_SUB_STREAK_CHANCE": 0.01,
-        "EVENT_FOLLOWER_GOAL_CHANCE": 0.02,
-        "EVENT_GIVEAWAY_CHANCE": 0.001,
-        "EVENT_MILESTONE_CHANCE": 0.001,
+        # Event Settings (average events per minute)
+        "EVENT_FOLLOWER_RATE": 0.12,
+        "EVENT_SUBSCRIBER_RATE": 0.06,
+        "EVENT_HYPE_TRAIN_RATE": 0.03,
+        "EVENT_RAID_RATE": 0.018,
+        "EVENT_HOST_RATE": 0.012,
+        "EVENT_BITS_RATE": 0.048,
+        "EVENT_SUB_STREAK_RATE": 0.06,
+        "EVENT_FOLLOWER_GOAL_RATE": 0.12,
+        "EVENT_GIVEAWAY_RATE": 0.006,
+        "EVENT_MILESTONE_RATE": 0.006,
         
         # Viewer Dynamics
         "VIEWER_BASE_COUNT": 50,
@@ -144,11 +159,28 @@ class Config:
         "VIEWER_FLUCTUATION_MAX": 15,
         "VIEWER_GROWTH_RATE": 0.1,
         "VIEWER_PEAK_HOUR_MULTIPLIER": 1.5,
+        "SYNTHETIC_POPULATION_SIZE": 0,
     }
     
+    SAVE_DELAY = 2.0  # Seconds of quiet before changed settings are written
+    
     def __init__(self):
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self.version = 0
+        self._snapshot = None
+        self._subscribers = ()  # (keys or None, callback), replaced on change
         self._settings = self.DEFAULTS.copy()
-        self.load_settings()
+        self._loaded = False  # The settings file is read on first use, not at import
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                self.load_settings()
     
     def get_settings_file(self):
         """Get the settings file path based on current SETTINGS_DIR"""
@@ -159,51 +191,173 @@ class Config:
         """Load settings from JSON file or use defaults"""
         settings_file = self.get_settings_file()
         
-        # Create directory if it doesn't exist
-        settings_dir = os.path.dirname(settings_file)
-        if settings_dir:
-            os.makedirs(settings_dir, exist_ok=True)
-        
         if os.path.exists(settings_file):
             try:
                 with open(settings_file, 'r', encoding='utf-8') as f:
-                    saved_settings = json.load(f)
-                    # Update defaults with saved settings
-                    self._settings.update(saved_settings)
-                    print("[OK] Settings loaded from", settings_file)
+                    saved_settings = self._migrate(json.load(f))
+                # Update defaults with saved settings
+                self._apply(saved_settings, persist=False)
+                print("[OK] Settings loaded from", settings_file)
             except Exception as e:
                 print("[ERROR] Error loading settings:", e)
                 print("[INFO] Using default settings")
         else:
             print("[INFO] No settings file found, using defaults")
     
+    @staticmethod
+    def _migrate(saved_settings):
+        """Convert settings written by older versions"""
+        for key in [key for key in saved_settings if key.startswith("EVENT_") and key.endswith("_CHANCE")]:
+            chance = saved_settings.pop(key)
+            # Events used to be rolled once every 10 seconds
+            saved_settings.setdefault(key[:-len("_CHANCE")] + "_RATE", round(chance * 6, 6))
+        # Full saves wrote the old one-million-message default; the ring now preallocates
+        if saved_settings.get("VIRTUAL_CHAT_HISTORY") == 1000000:
+            del saved_settings["VIRTUAL_CHAT_HISTORY"]
+        return saved_settings
+    
+    def _changed_settings(self):
+        """Only the values that differ from DEFAULTS"""
+        missing = object()
+        return {key: value for key, value in self._settings.items() 
+                if self.DEFAULTS.get(key, missing) != value}
+    
     def save_settings(self):
-        """Save current settings to JSON file"""
-        try:
-            settings_file = self.get_settings_file()
-            
-            # Create directory if it doesn't exist
-            settings_dir = os.path.dirname(settings_file)
-            if settings_dir:
-                os.makedirs(settings_dir, exist_ok=True)
-            
-            with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self._settings, f, indent=2)
-            print("[OK] Settings saved to", settings_file)
-        except Exception as e:
-            print("[ERROR] Error saving settings:", e)
+        """Write non-default settings atomically (temp file + rename)"""
+        self._ensure_loaded()
+        with self._save_lock:
+            try:
+                settings_file = self.get_settings_file()
+                
+                # Created on first save rather than at import
+                settings_dir = os.path.dirname(settings_file)
+                if settings_dir:
+                    os.makedirs(settings_dir, exist_ok=True)
+                
+                temp_file = settings_file + ".tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._changed_settings(), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, settings_file)
+                print("[OK] Settings saved to", settings_file)
+            except Exception as e:
+                print("[ERROR] Error saving settings:", e)
+    
+    def schedule_save(self, delay=None):
+        """Save on a background thread once settings stop changing for a moment"""
+        with self._lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY if delay is None else delay, self._save_pending)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def _save_pending(self):
+        """Timer target: clear the pending save so flush() knows nothing is left, then write"""
+        with self._lock:
+            if self._save_timer is not threading.current_thread():
+                return  # Superseded by a newer schedule_save() or taken over by flush()
+            self._save_timer = None
+        self.save_settings()
+    
+    def flush(self):
+        """Write any pending change now on a non-daemon thread so it survives interpreter exit"""
+        with self._lock:
+            pending = self._save_timer
+            self._save_timer = None
+        if pending:
+            pending.cancel()
+            thread = threading.Thread(target=self.save_settings)
+            thread.start()
+            return thread
+        return None
     
     def get(self, key, default=None):
         """Get a setting value"""
+        if not self._loaded:
+            self._ensure_loaded()
         return self._settings.get(key, default)
     
+    def snapshot(self):
+        """Immutable ConfigSnapshot of every default key, rebuilt only after a change.
+        
+        Hot loops should take one snapshot per iteration and read attributes
+        from it instead of calling get() for each key.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        self._ensure_loaded()
+        with self._lock:
+            if self._snapshot is None:
+                settings = self._settings
+                self._snapshot = ConfigSnapshot(
+                    self.version, *[settings.get(key, default) for key, default in self.DEFAULTS.items()]
+                )
+            return self._snapshot
+    
+    def subscribe(self, keys, callback):
+        """Call callback(changed_keys, snapshot) whenever any of keys change.
+        
+        keys=None subscribes to every change. Callbacks run on the thread
+        that changed the setting, after the change is published, so Tk
+        code must marshal itself onto the Tk thread. Returns a token for
+        unsubscribe().
+        """
+        token = (frozenset(keys) if keys is not None else None, callback)
+        with self._lock:
+            self._subscribers = self._subscribers + (token,)
+        return token
+    
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers = tuple(sub for sub in self._subscribers if sub is not token)
+    
+    def _notify(self, changed, snapshot):
+        changed_set = set(changed)
+        for keys, callback in self._subscribers:
+            if keys is None or keys & changed_set:
+                try:
+                    callback(changed, snapshot)
+                except Exception as e:
+                    print(f"[ERROR] Settings subscriber failed for {changed}: {e}")
+    
     def set(self, key, value):
-        """Set a setting value"""
-        self._settings[key] = value
+        """Set a setting value, returns True if it changed"""
+        return bool(self.update({key: value}))
     
     def update(self, updates):
-        """Update multiple settings at once"""
-        self._settings.update(updates)
+        """Update multiple settings as one atomic change, returns the changed keys.
+        
+        Readers see either none or all of the updates: the settings dict is
+        replaced rather than mutated, and the version only moves when a
+        value actually changed. Changes are saved after a short debounce.
+        """
+        self._ensure_loaded()
+        return self._apply(updates, persist=True)
+    
+    def _apply(self, updates, persist):
+        with self._lock:
+            missing = object()
+            changed = [key for key, value in updates.items() 
+                       if self._settings.get(key, missing) != value]
+            if not changed:
+                return []
+            settings = dict(self._settings)
+            for key in changed:
+                settings[key] = updates[key]
+            self._settings = settings
+            self.version += 1
+            self._snapshot = None
+            # Taken under the lock so subscribers see this change, not a later one
+            snapshot = self.snapshot()
+        self._notify(changed, snapshot)
+        if persist:
+            self.schedule_save()
+        return changed
+
+ConfigSnapshot = namedtuple("ConfigSnapshot", ["version"] + list(Config.DEFAULTS))
 
 # Create global config instance
 config = Config()
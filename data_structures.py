@@ -1,4 +1,10 @@
-from collections import deque, defaultdict
+import random
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from user_tables import LRUTable
 
 # ===========================
 # DATA STRUCTURES
@@ -175,19 +181,349 @@ USER_BADGES = {
     "bot": {"text": "🤖", "color": "#95A5A6", "tooltip": "Bot Account"},
 }
 
+# Badge bitmask values for compact storage, in USER_BADGES display order
+BADGE_BITS = {badge: 1 << i for i, badge in enumerate(USER_BADGES)}
+
+def badges_to_mask(badges):
+    mask = 0
+    for badge in badges:
+        mask |= BADGE_BITS.get(badge, 0)
+    return mask
+
+def mask_to_badges(mask):
+    return [badge for badge, bit in BADGE_BITS.items() if mask & bit]
+
+# Chat Message Record
+class ChatMessage:
+    """Compact chat record passed from the engine through sinks, the UI queue,
+    the message store and export. Formatting happens only at render time.
+    """
+    __slots__ = ("timestamp", "kind", "username", "color", "text", "badges", "queued_at")
+    
+    CHAT = "chat"
+    BAN = "ban"
+    
+    def __init__(self, username, color, text, badges=0, kind=CHAT, timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp  # Epoch seconds
+        self.kind = kind
+        self.username = sys.intern(username)
+        self.color = sys.intern(color) if color else None
+        self.text = text  # Reason for bans
+        self.badges = badges if isinstance(badges, int) else badges_to_mask(badges)
+        self.queued_at = None  # time.monotonic() when put on the UI queue
+        
+    @classmethod
+    def ban(cls, username, reason):
+        return cls(username, None, reason, kind=cls.BAN)
+    
+    @property
+    def reason(self):
+        return self.text
+    
+    def badge_names(self):
+        return mask_to_badges(self.badges) if self.badges else []
+    
+    def time_string(self, fmt="%H:%M:%S"):
+        return time.strftime(fmt, time.localtime(self.timestamp))
+    
+    def to_dict(self):
+        record = {
+            "type": self.kind,
+            "timestamp": self.timestamp,
+            "username": self.username,
+        }
+        if self.kind == self.BAN:
+            record["reason"] = self.text
+        else:
+            record["color"] = self.color
+            record["text"] = self.text
+            record["badges"] = self.badge_names()
+        return record
+    
+    @classmethod
+    def from_dict(cls, record):
+        if record.get("type") == cls.BAN:
+            return cls(record["username"], None, record.get("reason", ""), 
+                       kind=cls.BAN, timestamp=record.get("timestamp"))
+        return cls(record["username"], record.get("color"), record.get("text", ""), 
+                   record.get("badges", []), timestamp=record.get("timestamp"))
+
 # Twitch Data Storage Class
+ChannelSnapshot = namedtuple("ChannelSnapshot", [
+    "version", "follower_count", "follower_goal", "subscriber_count", "hype_train_level",
+    "viewer_count", "peak_viewers", "total_views", "viewer_history"
+])
+
+# Channel state that survives restarts (see channel_state.py)
+USER_TABLE_SIZE = 20000  # Users kept in memory per table by default
+
+PERSISTED_COUNTERS = ("follower_count", "follower_goal", "peak_viewers", "total_views")
+PERSISTED_TABLES = ("subscribers", "user_badges", "user_reputation", "highlighted_users", "chat_users")
+
 class TwitchData:
-    subscribers = {}
-    follower_count = 0
-    follower_goal = 100
-    hype_train_level = 0
-    highlighted_users = {}
-    user_reputation = defaultdict(lambda: {"score": 0, "messages": 0, "warnings": 0})
-    user_badges = defaultdict(list)
-    viewer_count = 0
-    chat_users = {}  # Store user data for consistency
-    viewer_history = deque(maxlen=60)  # Track viewer count over time
-    peak_viewers = 0
-    total_views = 0
+    """Channel state shared by the engine threads and the Tk thread.
+    
+    Writers go through the mutation methods, which take the lock and bump
+    `version`. Readers that need several fields at once use snapshot(),
+    an immutable ChannelSnapshot cached until the next write. Writes to
+    persisted fields are also tracked so checkpoints only save changes.
+    """
+    def __init__(self):
+        # Instance attributes so several simulated channels don't share state
+        self._lock = threading.RLock()
+        self.version = 0
+        self._snapshot = None
+        self.subscribers = {}
+        self.follower_count = 0
+        self.follower_goal = 100
+        self.hype_train_level = 0
+        self.highlighted_users = {}
+        # Bounded so memory stays flat; cold users spill to disk once configure_user_tables() attaches a store
+        self.user_reputation = LRUTable("user_reputation", USER_TABLE_SIZE, 
+                                        lambda: {"score": 0, "messages": 0, "warnings": 0})
+        self.user_badges = LRUTable("user_badges", USER_TABLE_SIZE, list)
+        self.viewer_count = 0
+        self.chat_users = {}  # Store user data for consistency
+        self.viewer_history = deque(maxlen=60)  # Track viewer count over time
+        self.peak_viewers = 0
+        self.total_views = 0
+        self._dirty_counters = False
+        self._dirty = {table: set() for table in PERSISTED_TABLES}
+        
+    def configure_user_tables(self, capacity, cold_store=None):
+        """Resize the reputation and badge tables and set where evicted users go"""
+        with self._lock:
+            for table in (self.user_reputation, self.user_badges):
+                table.cold_store = cold_store
+                table.resize(capacity)
+                
+    def resize_user_tables(self, capacity):
+        with self._lock:
+            for table in (self.user_reputation, self.user_badges):
+                table.resize(capacity)
+        
+    def _changed(self):
+        self.version += 1
+        self._snapshot = None
+        
+    def snapshot(self):
+        """Immutable view of the counters, rebuilt only after a write"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = ChannelSnapshot(
+                    self.version, self.follower_count, self.follower_goal, len(self.subscribers),
+                    self.hype_train_level, self.viewer_count, self.peak_viewers, self.total_views,
+                    tuple(self.viewer_history)
+                )
+            return self._snapshot
+    
+    def add_follower(self, count=1):
+        with self._lock:
+            self.follower_count += count
+            self._dirty_counters = True
+            self._changed()
+            return self.follower_count
+        
+    def add_subscriber(self, username, months):
+        """Record a subscription and give the user a subscriber badge"""
+        with self._lock:
+            self.subscribers[username] = months
+            badges = self.user_badges.get(username, [])
+            if "subscriber" not in badges:
+                self.user_badges[username] = badges + ["subscriber"]
+            self._dirty["subscribers"].add(username)
+            self._dirty["user_badges"].add(username)
+            self._changed()
+            
+    def ensure_subscriber(self, username):
+        """Mark a chatter as subscribed without overwriting an existing streak"""
+        with self._lock:
+            if username not in self.subscribers:
+                self.subscribers[username] = 1
+                self._dirty["subscribers"].add(username)
+                self._changed()
+                
+    def random_subscriber(self, rng=random):
+        """Pick a (username, months) pair, or None without subscribers"""
+        with self._lock:
+            if not self.subscribers:
+                return None
+            username = rng.choice(list(self.subscribers))
+            return username, self.subscribers[username]
+        
+    def raise_hype_train(self, max_level=5):
+        with self._lock:
+            self.hype_train_level = min(max_level, self.hype_train_level + 1)
+            self._changed()
+            return self.hype_train_level
+        
+    def add_viewers(self, count):
+        with self._lock:
+            self.viewer_count += count
+            self._changed()
+            
+    def set_viewer_count(self, count):
+        with self._lock:
+            self.viewer_count = count
+            self._changed()
+            
+    def record_viewer_sample(self, count):
+        """Set the viewer count and fold it into history, peak and total views"""
+        with self._lock:
+            self.viewer_count = count
+            self.viewer_history.append(count)
+            self.peak_viewers = max(self.peak_viewers, count)
+            self.total_views += count
+            self._dirty_counters = True
+            self._changed()
+            
+    def get_badges(self, username):
+        """Copy of a user's badges (empty if unknown)"""
+        with self._lock:
+            return list(self.user_badges.get(username, ()))
+        
+    def set_badges(self, username, badges):
+        with self._lock:
+            self.user_badges[username] = list(badges)
+            self._dirty["user_badges"].add(username)
+            
+    def record_user_message(self, username):
+        with self._lock:
+            self.user_reputation[username]["messages"] += 1
+            self._dirty["user_reputation"].add(username)
+            
+    def highlight_user(self, username, color):
+        with self._lock:
+            self.highlighted_users = {**self.highlighted_users, username: color}
+            self._dirty["highlighted_users"].add(username)
+            
+    def highlight_color(self, username):
+        """Highlight color for a user, or None"""
+        return self.highlighted_users.get(username)
+    
+    def register_chatter(self, base_name, full_id, color):
+        """Remember the chatter ID and color minted for a base name"""
+        with self._lock:
+            self.chat_users[base_name] = (full_id, color)
+            self._dirty["chat_users"].add(base_name)
+            
+    def chatter_identities(self):
+        """Copy of base name -> (chatter ID, color) for every known chatter"""
+        with self._lock:
+            return dict(self.chat_users)
+    
+    @staticmethod
+    def _copy_value(value):
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return value
+    
+    def export_state(self):
+        """Full persisted state as plain JSON-serializable data"""
+        with self._lock:
+            return {
+                "counters": {name: getattr(self, name) for name in PERSISTED_COUNTERS},
+                "tables": {
+                    table: {key: self._copy_value(value) for key, value in getattr(self, table).items()}
+                    for table in PERSISTED_TABLES
+                },
+            }
+    
+    def take_changes(self):
+        """Persisted fields written since the last call, in export_state() format, or None"""
+        with self._lock:
+            if not self._dirty_counters and not any(self._dirty.values()):
+                return None
+            changes = {"counters": {}, "tables": {}}
+            if self._dirty_counters:
+                changes["counters"] = {name: getattr(self, name) for name in PERSISTED_COUNTERS}
+            for table, keys in self._dirty.items():
+                if keys:
+                    values = getattr(self, table)
+                    changes["tables"][table] = {
+                        key: self._copy_value(values[key]) for key in keys if key in values
+                    }
+                    keys.clear()
+            self._dirty_counters = False
+            return changes
+    
+    def mark_unsaved(self, changes):
+        """Mark the fields of a take_changes() result dirty again after a failed write"""
+        with self._lock:
+            if changes["counters"]:
+                self._dirty_counters = True
+            for table, values in changes["tables"].items():
+                self._dirty[table].update(values)
+    
+    def apply_state(self, state):
+        """Merge a full state or a change set into this channel"""
+        with self._lock:
+            for name, value in state.get("counters", {}).items():
+                if name in PERSISTED_COUNTERS:
+                    setattr(self, name, value)
+            for table, values in state.get("tables", {}).items():
+                if table not in PERSISTED_TABLES:
+                    continue
+                target = getattr(self, table)
+                for key, value in values.items():
+                    if isinstance(target, LRUTable):
+                        target.restore(key, value)
+                    else:
+                        target[key] = tuple(value) if table == "chat_users" else value
+            self._changed()
 
 twitch_data = TwitchData()
+
+# Message History Storage Class
+class MessageStore:
+    """Ring of the newest messages addressed by a global sequence number.
+    
+    The ring is allocated once at `capacity` slots, so memory stays
+    constant however long the session runs: appending past capacity
+    overwrites the oldest message and advances first_seq.
+    """
+    
+    def __init__(self, capacity=20000):
+        self.capacity = max(1, int(capacity))
+        self._slots = [None] * self.capacity
+        self._next_seq = 0
+        
+    def append(self, message):
+        """Store a message and return its sequence number"""
+        seq = self._next_seq
+        self._slots[seq % self.capacity] = message
+        self._next_seq = seq + 1
+        return seq
+    
+    @property
+    def first_seq(self):
+        return max(0, self._next_seq - self.capacity)
+    
+    @property
+    def next_seq(self):
+        return self._next_seq
+    
+    def __len__(self):
+        return self._next_seq - self.first_seq
+    
+    def get(self, seq):
+        """Get a message by sequence number, or None if it was overwritten"""
+        if seq is not None and self.first_seq <= seq < self._next_seq:
+            return self._slots[seq % self.capacity]
+        return None
+    
+    def range(self, start, stop):
+        """Get messages with sequence numbers in [start, stop)"""
+        start = max(start, self.first_seq)
+        stop = min(stop, self._next_seq)
+        return [self._slots[seq % self.capacity] for seq in range(start, stop)]
+    
+    def iter_from(self, seq):
+        """Iterate over (seq, message) pairs starting at seq"""
+        for seq in range(max(seq, self.first_seq), self._next_seq):
+            yield seq, self._slots[seq % self.capacity]
@@ -0,0 +1,133 @@
+import heapq
+import itertools
+import threading
+import time
+
+# ===========================
+# DISPLAY TIMELINE
+# ===========================
+
+class DisplayTimeline:
+    """Releases generated chat at planned display times from one thread.
+
+    Producers reserve() evenly spaced slots after everything already
+    queued and add() a callback per slot, then go straight back to
+    generating. The releaser thread sleeps until the earliest slot and
+    runs its callback, so pacing no longer depends on how long the
+    producer takes. wait_for_backlog() is the back-pressure: it blocks
+    until the queued playout is short enough to make another request.
+    Times are time.monotonic() seconds.
+    """
+    def __init__(self):
+        self._heap = []
+        self._order = itertools.count()  # Keeps equal times in insertion order
+        self._tail = 0.0  # Time of the last reserved slot
+        self._cond = threading.Condition()
+        self._running = False
+        self._generation = 0  # A thread left over from before a restart sees a newer one and exits
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def reserve(self, count, spacing, front=False):
+        """Times for `count` slots `spacing` seconds apart, after every slot already reserved.
+
+        front=True starts them now instead, between the queued slots, for
+        lines that react to something and shouldn't wait out the backlog.
+        """
+        if count <= 0:
+            return []
+        with self._cond:
+            now = time.monotonic()
+            start = now if front else max(now, self._tail + spacing)
+            times = [start + i * spacing for i in range(count)]
+            self._tail = max(self._tail, times[-1])
+            return times
+
+    def add(self, at, callback, *args):
+        """Run callback(*args) on the releaser thread at time `at`"""
+        with self._cond:
+            heapq.heappush(self._heap, (at, next(self._order), callback, args))
+            self._tail = max(self._tail, at)
+            self._cond.notify_all()
+
+    def backlog(self):
+        """Seconds until the last reserved slot is released"""
+        with self._cond:
+            return max(0.0, self._tail - time.monotonic())
+
+    def wait_for_backlog(self, seconds, timeout=None):
+        """Block until at most `seconds` of playout is queued; False if stopped or timed out"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._running:
+                excess = self._tail - time.monotonic() - seconds
+                if excess <= 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    excess = min(excess, remaining)
+                self._cond.wait(excess)
+            return False
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def clear(self):
+        """Drop everything not yet released"""
+        with self._cond:
+            self._heap = []
+            self._tail = 0.0
+            self._cond.notify_all()
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._generation += 1
+            self._heap = []
+            self._tail = 0.0
+            self._thread = threading.Thread(target=self._run, args=(self._generation,), daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop releasing and drop pending lines"""
+        with self._cond:
+            self._running = False
+            self._heap = []
+            self._tail = 0.0
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """Wait for the thread of the last start() to exit"""
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+        return not (thread and thread.is_alive())
+
+    def _run(self, generation):
+        while True:
+            with self._cond:
+                item = None
+                while self._running and generation == self._generation and item is None:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    item = heapq.heappop(self._heap)
+                if item is None:
+                    return
+            _, _, callback, args = item
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[ERROR] Timeline release failed: {e}")
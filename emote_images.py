@@ -0,0 +1,132 @@
+import queue
+import threading
+from collections import OrderedDict
+
+# ===========================
+# INLINE EMOTE IMAGES
+# ===========================
+
+class EmoteImageCache:
+    """Tk PhotoImages for emotes, decoded on first use and kept in a bounded LRU.
+
+    get() must be called on the Tk thread. A miss queues the emote for a
+    worker thread that opens and scales it with PIL; the Tk thread turns
+    decoded images into PhotoImages from an after() poll, because Tk
+    objects cannot be created off its own thread. Images are evicted
+    least recently used first once their pixel memory passes
+    `budget_bytes`. on_ready(name) and on_evict(name, photo) let the
+    chat view swap text for images and back.
+    """
+    POLL_MS = 50
+    PER_POLL = 20  # PhotoImages created per poll, keeps a preload from stalling the UI
+
+    def __init__(self, root, emotes, height=28, budget_bytes=32 * 1024 * 1024,
+                 on_ready=None, on_evict=None):
+        self.root = root
+        self.emotes = emotes  # EmoteRegistry, resolves names to files
+        self.height = height
+        self.budget_bytes = budget_bytes
+        self.on_ready = on_ready
+        self.on_evict = on_evict
+        self._images = OrderedDict()  # (name, height) -> (photo, bytes)
+        self._bytes = 0
+        self._requested = set()  # Keys queued or decoding
+        self._missing = set()  # Names without a usable file
+        self._requests = queue.Queue()
+        self._decoded = queue.Queue()
+        self._worker = None
+        self._polling = False
+
+    def get(self, name):
+        """PhotoImage for an emote, or None while it is loading or unavailable"""
+        key = (name, self.height)
+        entry = self._images.get(key)
+        if entry is not None:
+            self._images.move_to_end(key)
+            return entry[0]
+        self.request(name)
+        return None
+
+    def request(self, name):
+        """Queue an emote for decoding unless it is cached, pending or missing"""
+        key = (name, self.height)
+        if key in self._images or key in self._requested or name in self._missing:
+            return
+        self._requested.add(key)
+        self._requests.put(key)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._decode_loop, daemon=True)
+            self._worker.start()
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+
+    def preload(self, names):
+        """Decode every emote in the background instead of on first use"""
+        for name in names:
+            self.request(name)
+
+    def set_height(self, height):
+        """Scale future images to a new line height; old sizes age out of the LRU"""
+        self.height = height
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict_overflow()
+
+    def memory_bytes(self):
+        return self._bytes
+
+    def _decode_loop(self):
+        try:
+            from PIL import Image
+        except ImportError:
+            print("[ERROR] Pillow is not installed, emotes stay as text")
+            Image = None
+        while True:
+            key = self._requests.get()
+            name, height = key
+            path = self.emotes.path(name)
+            image = None
+            if Image is not None and path:
+                try:
+                    with Image.open(path) as source:
+                        source.seek(0)  # First frame of animated emotes
+                        image = source.convert("RGBA")
+                    width = max(1, round(image.width * height / max(1, image.height)))
+                    image = image.resize((width, height), Image.Resampling.LANCZOS)
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] Could not load emote {name}: {e}")
+                    image = None
+            self._decoded.put((key, image))
+
+    def _poll(self):
+        for _ in range(self.PER_POLL):
+            try:
+                key, image = self._decoded.get_nowait()
+            except queue.Empty:
+                break
+            self._requested.discard(key)
+            if image is None:
+                self._missing.add(key[0])
+                continue
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(image)
+            size = image.width * image.height * 4
+            self._images[key] = (photo, size)
+            self._bytes += size
+            self._evict_overflow()
+            if self.on_ready and key in self._images and key[1] == self.height:
+                self.on_ready(key[0])
+        if self._requested or not self._decoded.empty():
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _evict_overflow(self):
+        # Always keep the newest image so one oversized emote can still show
+        while self._bytes > self.budget_bytes and len(self._images) > 1:
+            (name, _), (photo, size) = self._images.popitem(last=False)
+            self._bytes -= size
+            if self.on_evict:
+                self.on_evict(name, photo)
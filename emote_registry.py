@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+import zlib
+
+from data_structures import EMOTE_LIST, EMOTE_COLORS, USERNAME_COLORS
+
+# ===========================
+# EMOTE REGISTRY
+# ===========================
+
+EMOJIS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'Emojis_The_Camp____Social__Karaoke__Events__VC__Valorant__Pinoy__Filipino__Call__Anime__Voice', 'Emojis'))
+IMAGE_EXTENSIONS = ('.png', '.gif', '.jpg', '.jpeg')
+
+# Emote colors are matched case-insensitively like emote names
+_COLOR_OVERRIDES = {name.upper(): color for name, color in EMOTE_COLORS.items()}
+
+def emote_color(name):
+    """Stable color for an emote: its EMOTE_COLORS entry or a crc32-picked palette color"""
+    color = _COLOR_OVERRIDES.get(name)
+    if color is None:
+        color = USERNAME_COLORS[zlib.crc32(name.encode("utf-8")) % len(USERNAME_COLORS)]
+    return color
+
+def style_tag(name):
+    """Text tag shared by every emote drawn in the same color"""
+    return "emote_" + emote_color(name).lstrip("#")
+
+class EmoteRegistry:
+    """Upper-cased emote names from the Emojis directory, with their files.
+
+    The directory is scanned on first use and only rescanned when its
+    mtime changes, checked at most every `check_interval` seconds, so a
+    large pack costs nothing until chat needs it. Falls back to
+    EMOTE_LIST when the directory cannot be read. Thread-safe.
+    """
+    def __init__(self, emojis_dir=EMOJIS_DIR, fallback=EMOTE_LIST, check_interval=5.0):
+        self.emojis_dir = emojis_dir
+        self.fallback = [name.upper() for name in fallback]
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._paths = None  # NAME -> file path, None for fallback names
+
+    def _current(self):
+        now = time.monotonic()
+        if self._paths is not None and now - self._checked_at < self.check_interval:
+            return self._paths
+        with self._lock:
+            if self._paths is not None and now - self._checked_at < self.check_interval:
+                return self._paths
+            try:
+                mtime = os.stat(self.emojis_dir).st_mtime_ns
+            except OSError:
+                mtime = None
+            if self._paths is None or mtime != self._mtime:
+                self._paths = self._scan() if mtime is not None else dict.fromkeys(self.fallback)
+                self._mtime = mtime
+            self._checked_at = now
+            return self._paths
+
+    def _scan(self):
+        paths = {}
+        try:
+            with os.scandir(self.emojis_dir) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        paths[os.path.splitext(entry.name)[0].upper()] = entry.path
+        except OSError:
+            return dict.fromkeys(self.fallback)
+        return paths
+
+    def lookup(self, word):
+        """Emote name for a chat word (case-insensitive, surrounding punctuation ignored), or None"""
+        paths = self._current()
+        name = word.upper()
+        if name in paths:
+            return name
+        stripped = name.strip(".,!?:;\"'()[]")
+        if stripped and stripped != name and stripped in paths:
+            return stripped
+        return None
+
+    def path(self, name):
+        """Image file of an emote, None for fallback emotes without one"""
+        return self._current().get(name)
+
+    def __contains__(self, name):
+        return name in self._current()
+
+    def __iter__(self):
+        return iter(list(self._current()))
+
+    def __len__(self):
+        return len(self._current())
@@ -0,0 +1,592 @@
+import threading
+import time
+import re
+from collections import deque
+
+from config import config
+from data_structures import (
+    twitch_data, ChatMessage, DONATION_MESSAGES, EVENT_MESSAGES,
+    USERNAME_POOL, USERNAME_COLORS
+)
+from llm_client import clean_chat_line, get_screen_data_url, llm_pool
+from chatter_registry import ChatterRegistry
+from population import ViewerPopulation
+from hype_analyzer import HypeAnalyzer
+from chat_analytics import ChatAnalytics
+from emote_registry import EmoteRegistry
+from event_scheduler import EventScheduler
+from display_timeline import DisplayTimeline
+from cancellation import CancelToken
+from replay import RandomStreams
+from prompts import templates
+
+# ===========================
+# HEADLESS CHAT ENGINE
+# ===========================
+
+class ChatEngine:
+    """Runs chat generation, events and moderation without any UI.
+    
+    Messages are written to every sink in self.sinks. The optional
+    on_donation(donor, amount, message, theme) and on_screenshot(img)
+    hooks let a UI show popups and previews. Every random draw comes
+    from a per-subsystem stream of `rng` (a RandomStreams) and every
+    completion from `llm`, so a seeded engine given a recorded LLM
+    replays a session.
+    """
+    
+    EVENT_NAMES = [
+        "follower", "subscriber", "hype_train", "donation", "raid", "host",
+        "bits", "sub_streak", "follower_goal", "giveaway", "milestone"
+    ]
+    # Events that happen on their own at EVENT_<NAME>_RATE per minute
+    SCHEDULED_EVENTS = [
+        "follower", "subscriber", "hype_train", "follower_goal", "raid",
+        "host", "bits", "sub_streak", "giveaway", "milestone"
+    ]
+    BOOSTED_EVENTS = ("hype_train", "bits")
+    
+    def __init__(self, sinks=None, capture_screen=True, data=None, emotes=None, username_pool=None,
+                 population=None, rng=None, llm=None):
+        self.rng = rng if rng is not None else RandomStreams()
+        self.llm = llm if llm is not None else llm_pool
+        self.sinks = list(sinks or [])
+        self.capture_screen = capture_screen
+        self.data = data if data is not None else twitch_data
+        self.emotes = emotes if emotes is not None else EmoteRegistry()
+        self.on_donation = None
+        self.on_screenshot = None
+        
+        self.batch_size = None  # Runtime override of BATCH_SIZE, e.g. scaled by the viewer count
+        self.running = False
+        self._cancel = None  # CancelToken of the current run
+        self._worker = None
+        self.recent_chat = deque(maxlen=config.get("HISTORY_LEN"))
+        self.last_screenshot_data = None
+        self.last_screenshot_time = 0
+        self.scheduler = EventScheduler(self._on_scheduled_event, rng=self.rng.get("schedule"))
+        self.timeline = DisplayTimeline()
+        self.request_time_estimate = 0.0  # Smoothed LLM latency, sets how early the next batch starts
+        self.scheduler.set_rates(self._event_rates(config.snapshot()))
+        self._config_token = config.subscribe(
+            ["HISTORY_LEN", "IMAGE_SIZE"] + [f"EVENT_{name.upper()}_RATE" for name in self.SCHEDULED_EVENTS],
+            self._on_config_changed)
+        self.hype_analyzer = HypeAnalyzer()
+        self.analytics = ChatAnalytics(analyzer=self.hype_analyzer, emotes=self.emotes)
+        self.chatters = ChatterRegistry(username_pool or USERNAME_POOL, rng=self.rng.get("chatters"))
+        # Chatters from a restored channel keep their IDs and colors
+        pool = set(username_pool or USERNAME_POOL)
+        for base_name, (full_id, color) in self.data.chatter_identities().items():
+            if base_name in pool:
+                self.chatters.register(base_name, full_id, color)
+        
+        # Large synthetic audiences replace the username pool when configured
+        if population is None and config.get("SYNTHETIC_POPULATION_SIZE", 0) > 0:
+            population = ViewerPopulation(config.get("SYNTHETIC_POPULATION_SIZE"), rng=self.rng.get("population"))
+        self.population = population
+        self.present = None  # Viewers the population samples from, pinned by seeded runs
+        self.modjv_override_requested = False
+        self.last_streamer_message = None
+        self.last_streamer_message_time = 0
+        
+    def emit(self, username, color, text, badges):
+        """Write a chat message to every sink"""
+        message = ChatMessage(username, color, text, badges)
+        self.analytics.record(message)
+        for sink in self.sinks:
+            sink.write(message)
+            
+    def emit_ban(self, banned_user_id, reason):
+        """Time out a chatter for 120s and announce it on every sink"""
+        viewer_index = self.population.index_of(banned_user_id) if self.population else None
+        if viewer_index is not None:
+            self.population.ban(viewer_index, time.time() + 120)
+        else:
+            base_name = re.sub(r'\d+$', '', banned_user_id)
+            self.chatters.ban(base_name, time.time() + 120)
+            
+        message = ChatMessage.ban(banned_user_id, reason)
+        for sink in self.sinks:
+            sink.write(message)
+        
+    def start(self):
+        """Start the generation and event loops"""
+        if not self.running:
+            self.running = True
+            # Raids and hosts land at wall-clock moments; a seeded run keeps sampling from
+            # the crowd it started with so replays pick the same chatters
+            self.present = self.data.viewer_count if self.rng.seed is not None else None
+            self._cancel = CancelToken()
+            self.timeline.start()
+            self._worker = threading.Thread(target=self._loop, args=(self._cancel,), daemon=True)
+            self._worker.start()
+            self.scheduler.start()
+            
+    def stop(self, timeout=2.0):
+        """Stop the generation and event loops and wait for their threads.
+        
+        Every wait in them is interruptible, an in-flight LLM call
+        included, so this returns almost at once and a following start()
+        never runs next to a leftover loop.
+        """
+        self.running = False
+        if self._cancel:
+            self._cancel.cancel()
+        self.scheduler.stop()
+        self.timeline.stop()
+        worker = self._worker
+        if worker and worker is not threading.current_thread():
+            worker.join(timeout)
+        stopped = self.scheduler.join(timeout) and self.timeline.join(timeout)
+        if (worker and worker.is_alive()) or not stopped:
+            print("[ERROR] Engine threads did not stop in time")
+        
+    def close(self):
+        """Stop the engine and close all sinks"""
+        self.stop()
+        config.unsubscribe(self._config_token)
+        for sink in self.sinks:
+            sink.close()
+            
+    def _on_config_changed(self, changed, cfg):
+        """Resize the chat context, refresh the capture and reschedule events when their settings change"""
+        if "HISTORY_LEN" in changed:
+            self.recent_chat = deque(self.recent_chat, maxlen=cfg.HISTORY_LEN)
+        if "IMAGE_SIZE" in changed:
+            self.last_screenshot_time = 0  # Recapture at the new size on the next batch
+        if any(key.startswith("EVENT_") for key in changed):
+            self.scheduler.set_rates(self._event_rates(cfg))
+            
+    def request_mod_intervention(self):
+        """Force a moderator message on the next loop iteration"""
+        self.modjv_override_requested = True
+        
+    def send_streamer_message(self, text):
+        """Post a message as the streamer and maybe trigger an immediate reply"""
+        self.emit(config.get("STREAMER_NAME"), "#00FF00", text, ["moderator"])
+        self.recent_chat.append(f"[{config.get('STREAMER_NAME')}]: {text}")
+        
+        # Store streamer message for immediate response
+        self.last_streamer_message = text
+        self.last_streamer_message_time = time.time()
+        
+        # Trigger immediate response based on probability
+        if self.rng.get("streamer").random() < config.get("RESPOND_TO_STREAMER_CHANCE"):
+            self._trigger_immediate_response(text)
+            
+    def trigger_event(self, name):
+        """Trigger one of EVENT_NAMES immediately"""
+        getattr(self, f"_trigger_{name}_event")()
+
+    def _trigger_immediate_response(self, streamer_message):
+        """Trigger immediate response to streamer message"""
+        threading.Thread(target=self._generate_immediate_response, 
+                        args=(streamer_message,), daemon=True).start()
+
+    def _generate_immediate_response(self, streamer_message):
+        """Generate immediate response to streamer message"""
+        try:
+            # Get a random chatter
+            username, color, base_name, badges = self._get_chatter_id()
+            
+            system_instructions, user_text = templates().immediate_response(streamer_message)
+            
+            content = self.llm._call_llm(system_instructions, user_text, self.last_screenshot_data or "",
+                                         cancel=self._cancel)
+            
+            if content and len(content.strip()) > 5:
+                text = clean_chat_line(content.strip())
+                self.emit(username, color, text, badges)
+                self.recent_chat.append(f"[{username}]: {text}")
+                
+        except Exception as e:
+            print(f"Immediate response error: {e}")
+
+    def _trigger_follower_event(self):
+        """Trigger new follower event"""
+        rng = self.rng.get("events")
+        self.data.add_follower()
+        username = rng.choice(USERNAME_POOL)
+        message = rng.choice(EVENT_MESSAGES["follower"]).format(username=username)
+        self.emit("System", "#9147FF", message, [])
+
+    def _trigger_subscriber_event(self):
+        """Trigger new subscriber event"""
+        rng = self.rng.get("events")
+        username = rng.choice(USERNAME_POOL)
+        months = rng.randint(1, 24)
+        # Records the subscription and assigns the subscriber badge
+        self.data.add_subscriber(username, months)
+        message = rng.choice(EVENT_MESSAGES["subscriber"]).format(username=username, months=months)
+        self.emit("System", "#FFD700", message, [])
+
+    def _trigger_hype_train_event(self):
+        """Trigger hype train event"""
+        rng = self.rng.get("events")
+        level = self.data.raise_hype_train()
+        message = rng.choice(EVENT_MESSAGES["hype_train"]).format(level=level)
+        self.emit("System", "#FF6B35", message, [])
+
+    def _trigger_donation_event(self):
+        """Trigger donation event"""
+        donor, amount, message, theme = self.rng.get("donations").choice(DONATION_MESSAGES)
+        if self.on_donation:
+            self.on_donation(donor, amount, message, theme)
+        self._make_chat_react_to_donation(donor, amount, message)
+
+    def _trigger_raid_event(self):
+        """Trigger raid event"""
+        rng = self.rng.get("events")
+        streamer = rng.choice(USERNAME_POOL)
+        viewers = rng.randint(10, 100)
+        message = rng.choice(EVENT_MESSAGES["raid"]).format(streamer=streamer, viewers=viewers)
+        self.emit("System", "#FF69B4", message, [])
+        # Add raid viewers to current count
+        self.data.add_viewers(viewers)
+
+    def _trigger_host_event(self):
+        """Trigger host event"""
+        rng = self.rng.get("events")
+        streamer = rng.choice(USERNAME_POOL)
+        viewers = rng.randint(5, 50)
+        message = rng.choice(EVENT_MESSAGES["host"]).format(streamer=streamer, viewers=viewers)
+        self.emit("System", "#00CED1", message, [])
+        # Add host viewers to current count
+        self.data.add_viewers(viewers)
+
+    def _trigger_bits_event(self):
+        """Trigger bits event"""
+        rng = self.rng.get("events")
+        username = rng.choice(USERNAME_POOL)
+        amount = rng.randint(100, 5000)
+        message = rng.choice(EVENT_MESSAGES["bits"]).format(username=username, amount=amount)
+        self.emit("System", "#9147FF", message, [])
+
+    def _trigger_sub_streak_event(self):
+        """Trigger sub streak event"""
+        rng = self.rng.get("events")
+        picked = self.data.random_subscriber(rng)
+        if picked:
+            subscriber, streak = picked
+            if streak > 1:
+                message = rng.choice(EVENT_MESSAGES["sub_streak"]).format(username=subscriber, streak=streak)
+                self.emit("System", "#FFD700", message, [])
+
+    def _trigger_follower_goal_event(self):
+        """Trigger follower goal event"""
+        rng = self.rng.get("events")
+        channel = self.data.snapshot()
+        remaining = channel.follower_goal - channel.follower_count
+        if remaining > 0:
+            message = rng.choice(EVENT_MESSAGES["follower_goal"]).format(
+                count=remaining, goal=channel.follower_goal, current=channel.follower_count
+            )
+            self.emit("System", "#9147FF", message, [])
+
+    def _trigger_giveaway_event(self):
+        """Trigger giveaway event"""
+        rng = self.rng.get("events")
+        message = rng.choice(EVENT_MESSAGES["giveaway"])
+        self.emit("System", "#FFD700", message, [])
+
+    def _trigger_milestone_event(self):
+        """Trigger milestone event"""
+        rng = self.rng.get("events")
+        milestones = [
+            "Reached 1000 total views!",
+            "500 followers achieved!",
+            "24 hour stream completed!",
+            "100 subscribers milestone!",
+            "Top 100 in category!",
+        ]
+        description = rng.choice(milestones)
+        message = rng.choice(EVENT_MESSAGES["milestone"]).format(description=description)
+        self.emit("System", "#32CD32", message, [])
+
+    def _make_chat_react_to_donation(self, donor, amount, message):
+        """Make chat react to donation"""
+        reactions = [
+            f"POG {amount}!",
+            f"LETS GO {donor}!",
+            f"WOW {amount}!",
+            f"POGCHAMP {donor}!",
+            f"THANK YOU {donor}!",
+            f"{amount} POGGERS",
+            f"BIG DONO {donor}!",
+            f"HOLY {amount}!",
+        ]
+        
+        # Add multiple reactions from different users, 0.2s apart ahead of the queued chat
+        rng = self.rng.get("donations")
+        texts = [rng.choice(reactions) for _ in range(rng.randint(2, 5))]
+        if not self.timeline.running:
+            # Simulated from the UI while stopped: nothing would release them
+            for text in texts:
+                self._release_chat_line(text)
+            return
+        for at, text in zip(self.timeline.reserve(len(texts), 0.2, front=True), texts):
+            self.timeline.add(at, self._release_chat_line, text)
+
+    def _release_chat_line(self, text):
+        """Show one generated line from a chatter picked at display time"""
+        username, color, base_name, badges = self._get_chatter_id()
+        self.recent_chat.append(f"[{username}]: {text}")
+        self.emit(username, color, text, badges)
+
+    def _release_mod_line(self, text, banned_user_id):
+        """Show a moderator intervention, timing out its target first"""
+        if banned_user_id:
+            self.emit_ban(banned_user_id, 'toxicity')
+        if len(text) > 2:
+            username = config.get("MODJV_USERNAME")
+            self.recent_chat.append(f"[{username}]: {text}")
+            self.emit(username, "#FFD700", text, ["moderator"])
+
+    def _event_rates(self, cfg):
+        """Scheduler rates per event; boosted events are drawn at their peak rate and thinned"""
+        return {name: getattr(cfg, f"EVENT_{name.upper()}_RATE") * (2 if name in self.BOOSTED_EVENTS else 1)
+                for name in self.SCHEDULED_EVENTS}
+
+    def _on_scheduled_event(self, name):
+        """Fire an event drawn by the scheduler if its settings allow it right now"""
+        cfg = config.snapshot()
+        if name == "hype_train" and not cfg.HYPE_TRAIN_ENABLED:
+            return
+        if name == "sub_streak" and not cfg.SUB_STREAKS_ENABLED:
+            return
+        if name == "follower_goal":
+            channel = self.data.snapshot()
+            if not cfg.FOLLOWER_GOAL_ENABLED or channel.follower_count >= channel.follower_goal:
+                return
+        if name in self.BOOSTED_EVENTS:
+            # Up to twice as likely while chat is hyped: keep a drawn event with probability boost / 2
+            hype_boost = 1 + max(0.0, self.analytics.hype_balance())
+            if self.rng.get("events").random() >= hype_boost / 2:
+                return
+        self.trigger_event(name)
+
+    def _get_chatter_id(self):
+        """Get or create a consistent chatter ID with badges"""
+        if self.population:
+            return self._get_population_chatter()
+        rng = self.rng.get("chatters")
+            
+        self.chatters.expire_bans(time.time())
+
+        if not self.chatters.has_available():
+            return "Viewer", rng.choice(USERNAME_COLORS), "Viewer", []
+
+        # Check if we should reuse an existing user
+        if self.chatters.has_active() and rng.random() < 0.6:  # 60% chance to reuse existing user
+            base_name = self.chatters.pick_active()
+            if base_name is not None:
+                full_id, color = self.chatters.get(base_name)
+                # Get badges from stored user data
+                badges = self.data.get_badges(full_id)
+                return full_id, color, base_name, badges
+
+        # Create new user
+        base_name = self.chatters.pick_available()
+        if base_name is None:
+            return "Viewer", rng.choice(USERNAME_COLORS), "Viewer", []
+        unique_num = rng.randint(100, 999)
+        full_id = base_name + str(unique_num)
+        color = rng.choice(USERNAME_COLORS)
+        
+        # Store user data
+        self.chatters.register(base_name, full_id, color)
+        self.data.register_chatter(base_name, full_id, color)
+        
+        # Assign badges based on probability (consistent for this user)
+        badges = []
+        if rng.random() < 0.3:  # 30% chance of being a sub
+            badges.append("subscriber")
+            self.data.ensure_subscriber(base_name)
+                
+        if rng.random() < 0.1:  # 10% chance of VIP
+            badges.append("vip")
+            
+        if rng.random() < 0.05:  # 5% chance of founder
+            badges.append("founder")
+            
+        # Store badges for this user
+        self.data.set_badges(full_id, badges)
+        
+        # Update reputation
+        self.data.record_user_message(base_name)
+        
+        return full_id, color, base_name, badges
+
+    def _present_viewers(self):
+        return self.present if self.present is not None else self.data.viewer_count
+
+    def _get_population_chatter(self):
+        """Draw a chatter from the synthetic population, weighted by activity"""
+        index = self.population.sample(present=self._present_viewers())
+        if index is None:
+            return "Viewer", self.rng.get("chatters").choice(USERNAME_COLORS), "Viewer", []
+            
+        self.population.record_message(index)
+        name = self.population.name(index)
+        return name, self.population.color(index), name, self.population.badge_names(index)
+
+    def _analyze_hype(self, lines):
+        """Analyze hype level in messages to adjust chat speed"""
+        return self.hype_analyzer.score(lines, self.emotes)
+
+    def _loop(self, cancel):
+        """Main chat generation loop.
+        
+        Lines are not emitted here: each batch is placed on the display
+        timeline, which releases them at their drip times while the next
+        batch is already being generated.
+        """
+        last_request_time = 0
+        
+        while not cancel.cancelled:
+            try:
+                # Back-pressure: start the next request once the queued lines
+                # will run out in about the time the LLM takes to answer
+                if not self.timeline.wait_for_backlog(self.request_time_estimate):
+                    break
+                
+                # One consistent view of the settings per iteration
+                cfg = config.snapshot()
+                
+                # Minimum spacing between LLM requests
+                pause_needed = cfg.LLM_REQUEST_INTERVAL - (time.time() - last_request_time)
+                if pause_needed > 0 and cancel.wait(pause_needed):
+                    break
+                last_request_time = time.time()
+
+                now = time.time()
+                
+                # Update screenshot if needed
+                if self.capture_screen and ((now - self.last_screenshot_time > cfg.SCREENSHOT_COOLDOWN) or self.last_screenshot_data is None):
+                    data_url, img_obj = get_screen_data_url()
+                    self.last_screenshot_data = data_url
+                    self.last_screenshot_time = now
+                    if self.on_screenshot:
+                        self.on_screenshot(img_obj)
+                
+                # Check for mod intervention
+                trigger_modjv = self.modjv_override_requested or self.rng.get("moderation").random() < cfg.MODJV_CHAT_CHANCE
+                
+                if trigger_modjv:
+                    self.modjv_override_requested = False
+                    
+                    lines, request_time = self._llm_generate_mod_intervention(self.last_screenshot_data, list(self.recent_chat), cancel)
+                    if cancel.cancelled:
+                        break
+                    
+                    if lines:
+                        raw_line = lines[0]
+                        ban_match = re.search(r'\[ACTION:BAN\s+(\w+)\]\s*(.*)', raw_line, re.IGNORECASE)
+                        full_user_id_to_ban = None
+                        
+                        if ban_match:
+                            base_name_to_ban = ban_match.group(1).strip()
+                            mod_comment = ban_match.group(2).strip()
+                            full_user_id_to_ban = self.chatters.get(base_name_to_ban, (base_name_to_ban, None))[0]
+                            
+                            text = mod_comment or f"Keep the chat clean, {full_user_id_to_ban} is out for a bit."
+                        else:
+                            text = clean_chat_line(raw_line)
+                            
+                        for at in self.timeline.reserve(1, cfg.MIN_DRIP_SPEED):
+                            self.timeline.add(at, self._release_mod_line, text, full_user_id_to_ban)
+                    
+                else:
+                    # Check for donation popup
+                    donations = self.rng.get("donations")
+                    if donations.random() < cfg.DONATION_CHANCE:
+                        donor, amount, message, theme = donations.choice(DONATION_MESSAGES)
+                        if self.on_donation:
+                            self.on_donation(donor, amount, message, theme)
+                        # Make chat react to donation
+                        self._make_chat_react_to_donation(donor, amount, message)
+
+                    # Generate normal chat batch
+                    lines, request_time = self._llm_generate_batch(self.last_screenshot_data, list(self.recent_chat), count=self.batch_size or cfg.BATCH_SIZE, cancel=cancel)
+                    if cancel.cancelled:
+                        break
+                    
+                    # Calculate dynamic drip speed from the new batch and the live chat mood
+                    hype_score = (self._analyze_hype(lines) + self.analytics.hype_balance()) / 2
+                    normalized_score = (hype_score + 1) / 2
+                    drip_range = cfg.MAX_DRIP_SPEED - cfg.MIN_DRIP_SPEED
+                    drip_speed = cfg.MIN_DRIP_SPEED + drip_range * (1 - normalized_score)
+                    drip_speed = max(cfg.MIN_DRIP_SPEED, min(drip_speed, cfg.MAX_DRIP_SPEED))
+                    
+                    # Default speed for single messages
+                    if len(lines) <= 1:
+                        drip_speed = (cfg.MIN_DRIP_SPEED + cfg.MAX_DRIP_SPEED) / 2
+
+                    texts = [clean_chat_line(line.replace('"', '').strip()) for line in lines]
+                    texts = [text for text in texts if len(text) >= 2]
+                    
+                    # Drip feed messages with calculated speed
+                    for at, text in zip(self.timeline.reserve(len(texts), drip_speed), texts):
+                        self.timeline.add(at, self._release_chat_line, text)
+                
+                self.request_time_estimate = 0.7 * self.request_time_estimate + 0.3 * request_time
+                    
+            except Exception as e:
+                print(f"Error in LLM loop: {e}")
+                cancel.wait(1)  # Brief pause on error
+
+    def _llm_generate_batch(self, screen_data_url, recent_chat, count=None, cancel=None):
+        """Generate a batch of chat messages using LLM"""
+        cfg = config.snapshot()
+        prompts = templates(cfg)
+        if count is None:
+            count = cfg.BATCH_SIZE
+            
+        start_time = time.time()
+        
+        # Select personalities based on current weights
+        rng = self.rng.get("personalities")
+        personalities = []
+        for personality, weight in prompts.personality_weights.items():
+            if rng.random() < weight / 2.0:  # Normalize probability
+                personalities.append(personality)
+        
+        # Ensure we have at least 2 personalities
+        if len(personalities) < 2:
+            personalities = prompts.personality_names[:2]
+        else:
+            personalities = rng.sample(personalities, min(3, len(personalities)))
+        
+        reply_to = None
+        if recent_chat and rng.random() < cfg.CHATTER_REPLY_CHANCE:
+            reply_to = rng.choice(list(recent_chat))
+
+        system_instructions, user_text = prompts.batch(count, personalities, recent_chat, reply_to)
+
+        content = self.llm._call_llm(system_instructions, user_text, screen_data_url, cancel=cancel)
+        
+        end_time = time.time()
+        request_time = end_time - start_time
+        
+        lines = [x.strip() for x in content.split('\n') if x.strip()]
+        return lines[:count], request_time
+
+    def _llm_generate_mod_intervention(self, screen_data_url, recent_chat, cancel=None):
+        """Generate moderator intervention using LLM"""
+        start_time = time.time()
+        rng = self.rng.get("moderation")
+        if self.population:
+            index = self.population.sample(present=self._present_viewers(), rng=rng)
+            target_username = self.population.name(index) if index is not None else rng.choice(USERNAME_POOL)
+        else:
+            target_username = rng.choice(USERNAME_POOL)
+        
+        system_instructions, user_text = templates().mod_intervention(target_username, recent_chat)
+
+        content = self.llm._call_llm(system_instructions, user_text, screen_data_url, cancel=cancel)
+        
+        end_time = time.time()
+        request_time = end_time - start_time
+        
+        lines = [x.strip() for x in content.split('\n') if x.strip()]
+        return lines[:1], request_time
@@ -0,0 +1,110 @@
+import heapq
+import random
+import threading
+import time
+
+# ===========================
+# EVENT SCHEDULER
+# ===========================
+
+class EventScheduler:
+    """Fires named events as independent Poisson processes.
+
+    Each event's next occurrence is drawn from an exponential
+    inter-arrival time with its rate (events per minute) and kept in a
+    timer heap; the thread sleeps until the earliest one is due. A rate
+    change redraws that event's next time, which is exact because the
+    exponential distribution is memoryless. handler(name) runs on the
+    scheduler thread.
+    """
+    def __init__(self, handler, rng=None):
+        self.handler = handler
+        self.rng = rng or random.Random()
+        self._rates = {}
+        self._due = {}  # name -> current due time; heap entries that disagree are stale
+        self._heap = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._generation = 0  # A thread left over from before a restart sees a newer one and exits
+        self._thread = None
+
+    def _schedule(self, name, now):
+        rate = self._rates.get(name, 0)
+        if rate <= 0:
+            self._due.pop(name, None)
+            return
+        due = now + self.rng.expovariate(rate / 60.0)
+        self._due[name] = due
+        heapq.heappush(self._heap, (due, name))
+
+    def set_rates(self, rates):
+        """Update per-minute rates, rescheduling only the events whose rate changed"""
+        with self._cond:
+            now = time.monotonic()
+            for name, rate in rates.items():
+                if self._rates.get(name) != rate:
+                    self._rates[name] = rate
+                    if self._running:
+                        self._schedule(name, now)
+            self._cond.notify_all()
+
+    def next_due(self):
+        """Seconds until the next scheduled event, or None"""
+        with self._cond:
+            if not self._due:
+                return None
+            return max(0.0, min(self._due.values()) - time.monotonic())
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._generation += 1
+            self._heap = []
+            self._due = {}
+            now = time.monotonic()
+            for name in self._rates:
+                self._schedule(name, now)
+            self._thread = threading.Thread(target=self._run, args=(self._generation,), daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop firing events; an event already running finishes on its own"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """Wait for the thread of the last start() to exit"""
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout)
+        return not (thread and thread.is_alive())
+
+    def _run(self, generation):
+        while True:
+            with self._cond:
+                name = None
+                while self._running and generation == self._generation and name is None:
+                    # Drop entries superseded by a reschedule
+                    while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, candidate = self._heap[0]
+                    delay = due - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    # From now, not `due`, so a stalled handler never causes a burst of catch-up events
+                    self._schedule(candidate, time.monotonic())
+                    name = candidate
+                if name is None:
+                    return
+            try:
+                self.handler(name)
+            except Exception as e:
+                print(f"[ERROR] Event {name} failed: {e}")
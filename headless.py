@@ -0,0 +1,123 @@
+import argparse
+import os
+import time
+
+from config import config
+from data_structures import TwitchData
+from engine import ChatEngine
+from population import ViewerPopulation
+from sinks import StdoutSink, JsonlSink, ChatLogSink
+from chat_log import ChatLog
+from channel_state import ChannelStateStore
+from user_tables import ColdUserStore
+from llm_client import llm_pool
+from replay import RandomStreams, LLMRecorder, LLMReplayer
+
+# ===========================
+# HEADLESS SIMULATION
+# ===========================
+
+def numbered_path(path, i, chats):
+    """Per-chat file name: chat.jsonl -> chat-2.jsonl when running several chats"""
+    if chats <= 1:
+        return path
+    root, ext = path.rsplit(".", 1) if "." in path else (path, "jsonl")
+    return f"{root}-{i + 1}.{ext}"
+
+def build_engines(args):
+    """Create one engine per simulated chat with its own sinks, state stores and LLM client"""
+    engines = []
+    stores = []
+    clients = []
+    for i in range(args.chats):
+        sinks = []
+        if not args.quiet:
+            prefix = f"[chat{i + 1}] " if args.chats > 1 else ""
+            sinks.append(StdoutSink(prefix))
+        if args.jsonl:
+            sinks.append(JsonlSink(numbered_path(args.jsonl, i, args.chats)))
+        if args.log_dir:
+            session = time.strftime("%Y%m%d-%H%M%S") + (f"-chat{i + 1}" if args.chats > 1 else "")
+            sinks.append(ChatLogSink(ChatLog(args.log_dir, session=session,
+                                             segment_bytes=config.get("CHAT_LOG_SEGMENT_MB") * 1024 * 1024,
+                                             flush_interval=config.get("CHAT_LOG_FLUSH_SECONDS"),
+                                             max_bytes=config.get("CHAT_LOG_MAX_MB") * 1024 * 1024)))
+        data = TwitchData()
+        if args.state_dir:
+            store = ChannelStateStore(os.path.join(args.state_dir, f"chat{i + 1}"))
+            # Users evicted from the bounded tables live next to the snapshot
+            cold_users = ColdUserStore(os.path.join(store.directory, "cold_users"))
+            data.configure_user_tables(config.get("USER_TABLE_SIZE"), cold_users)
+            store.restore(data)
+            store.start(data, config.get("CHANNEL_STATE_INTERVAL"))
+            stores.append((store, data, cold_users))
+        # Every chat gets its own streams so chats don't mirror each other
+        rng = RandomStreams(None if args.seed is None else f"{args.seed}:chat{i + 1}")
+        population = None
+        if args.population:
+            population = ViewerPopulation(args.population, rng=rng.get("population"))
+            data.set_viewer_count(args.viewers or args.population)
+        llm = None
+        if args.replay:
+            llm = LLMReplayer(numbered_path(args.replay, i, args.chats), realtime=not args.replay_fast)
+        elif args.record:
+            llm = LLMRecorder(numbered_path(args.record, i, args.chats), llm_pool)
+        if llm:
+            clients.append(llm)
+        engines.append(ChatEngine(sinks=sinks, capture_screen=args.screen, data=data,
+                                  population=population, rng=rng, llm=llm))
+    return engines, stores, clients
+
+def replay_drain_time(engines, clients):
+    """Seconds of queued chat left once every recording is used up, else None"""
+    if not all(client.exhausted for client in clients):
+        return None
+    return max(engine.timeline.backlog() for engine in engines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the chat simulator without a UI")
+    parser.add_argument("--chats", type=int, default=1, help="Number of simulated chats to run")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--jsonl", help="Append messages to this JSON Lines file")
+    parser.add_argument("--log-dir", help="Keep an indexed on-disk chat log in this directory")
+    parser.add_argument("--state-dir", help="Persist and resume each chat's channel state here")
+    parser.add_argument("--quiet", action="store_true", help="Do not print messages to stdout")
+    parser.add_argument("--screen", action="store_true", help="Send screenshots to the LLM")
+    parser.add_argument("--population", type=int, default=0, help="Size of a synthetic viewer population")
+    parser.add_argument("--viewers", type=int, default=0, help="Viewers present out of the population")
+    parser.add_argument("--seed", type=int, help="Seed every random stream for a reproducible run")
+    parser.add_argument("--record", help="Record LLM responses to this JSON Lines file")
+    parser.add_argument("--replay", help="Answer from a --record file instead of the LLM (stops when it runs out)")
+    parser.add_argument("--replay-fast", action="store_true", help="Replay without the recorded LLM latency")
+    args = parser.parse_args(argv)
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be combined")
+
+    engines, stores, clients = build_engines(args)
+    for engine in engines:
+        engine.start()
+    print(f"[INFO] Headless simulation running {len(engines)} chat(s)")
+
+    try:
+        deadline = time.time() + args.duration if args.duration > 0 else None
+        while deadline is None or time.time() < deadline:
+            time.sleep(0.5)
+            if args.replay:
+                # Show what the last recorded responses queued, then stop
+                drain = replay_drain_time(engines, clients)
+                if drain is not None and (deadline is None or time.time() + drain < deadline):
+                    deadline = time.time() + drain
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for engine in engines:
+            engine.close()
+        for client in clients:
+            client.close()
+        for store, data, cold_users in stores:
+            store.stop(data)
+            cold_users.close()
+        print("[INFO] Headless simulation stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from collections import deque
+
+from data_structures import HYPE_WORDS, CHILL_WORDS
+
+# ===========================
+# HYPE ANALYZER
+# ===========================
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton counting whole-word keyword hits in one pass.
+
+    Patterns are matched case-insensitively and only count when they are
+    not glued to other word characters, so "OP" does not match in "STOP".
+    """
+    def __init__(self, patterns):
+        # patterns: {keyword: label}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # node -> [(pattern length, label)]
+        for pattern, label in patterns.items():
+            self._add(pattern.upper(), label)
+        self._build()
+
+    def _add(self, pattern, label):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if pattern:
+            self._out[node].append((len(pattern), label))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def count(self, text):
+        """Count whole-word hits per label in already uppercased text"""
+        counts = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, label in out[node]:
+                start = i - length + 1
+                # Only whole words: a word keyword must not touch other word characters
+                if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+                    continue
+                if i < last and _is_word_char(ch) and _is_word_char(text[i + 1]):
+                    continue
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+class HypeAnalyzer:
+    """Scores a batch of chat lines as hype (positive) or chill (negative).
+
+    Hype and chill words go through an automaton compiled once. Emotes
+    are counted per whitespace token with a set lookup, so the size of
+    the emote pack does not matter. `emotes` is an EmoteRegistry or any
+    container of upper-cased names.
+    """
+    def __init__(self, hype_words=HYPE_WORDS, chill_words=CHILL_WORDS):
+        self.hype_words = list(hype_words)
+        self.chill_words = list(chill_words)
+        patterns = {word: "hype" for word in self.hype_words}
+        # Chill words were lowercase in the old scan and never matched the uppercased text
+        patterns.update({word: "chill" for word in self.chill_words})
+        self._hype_set = {word.upper() for word in self.hype_words}
+        self._automaton = KeywordAutomaton(patterns)
+
+    def _count(self, upper, emotes):
+        counts = self._automaton.count(upper)
+        if not emotes:
+            return counts
+        lookup = getattr(emotes, "lookup", None)
+        for token in upper.split():
+            name = lookup(token) if lookup else (token if token in emotes else None)
+            if name is None:
+                continue
+            # A hype word that is also an emote counts once, as an emote
+            if name in self._hype_set:
+                counts["hype"] = counts.get("hype", 0) - 1
+            counts["emote"] = counts.get("emote", 0) + 1
+        return counts
+
+    def analyze(self, text, emotes=()):
+        """Whole-word hit counts per label ("hype", "emote", "chill") in one text"""
+        return self._count(text.upper(), emotes)
+
+    def score(self, lines, emotes=()):
+        """Normalized hype minus chill score for a batch of lines"""
+        joined = " ".join(" ".join(line.split()) for line in lines)
+        upper = joined.upper()
+        hype_score = 0
+
+        # All caps messages are hype (needs letters, otherwise emoji-only text counts)
+        if len(joined) > 10 and joined == upper and any(ch.isalpha() for ch in joined):
+            hype_score += 2
+
+        counts = self._count(upper, emotes)
+        hype_score += counts.get("hype", 0) + counts.get("emote", 0)
+        chill_score = counts.get("chill", 0)
+        return (hype_score - chill_score) / (len(lines) * 2 or 1)
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from config import config
+
+# ===========================
+# UI RENDER INSTRUMENTATION
+# ===========================
+
+class RenderProfiler:
+    """Times Tk callbacks and render stages, main-thread frame times and
+    queue-to-screen latency. All samples are in milliseconds and kept in
+    bounded ring buffers so collection can stay on during long streams.
+    """
+
+    FRAME_INTERVAL_MS = 16  # Heartbeat period used to measure frame times
+    JANK_THRESHOLD_MS = 50
+
+    def __init__(self, window=1000):
+        self._enabled = None  # Read from the settings on first use, not at import
+        self.window = window
+        self.stages = {}
+        self.frame_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._root = None
+        self._last_tick = None
+
+    @property
+    def enabled(self):
+        if self._enabled is None:
+            self._enabled = config.get("PERF_INSTRUMENTATION", False)
+        return self._enabled
+
+    def enable(self, root=None):
+        """Turn on collection and start the frame monitor if a Tk root is given"""
+        self._enabled = True
+        if root is not None and self._root is None:
+            self._root = root
+            self._last_tick = time.perf_counter()
+            root.after(self.FRAME_INTERVAL_MS, self._frame_tick)
+
+    def disable(self):
+        self._enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.frame_times.clear()
+            self.latencies.clear()
+            self.started_at = time.time()
+
+    def record(self, stage, duration_ms):
+        with self._lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                samples = self.stages[stage] = deque(maxlen=self.window)
+            samples.append(duration_ms)
+
+    def record_latency(self, queued_at):
+        """Record queue-to-screen latency for a message queued at time.monotonic() queued_at"""
+        if self.enabled and queued_at is not None:
+            self.latencies.append((time.monotonic() - queued_at) * 1000)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as a render stage"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name):
+        """Decorator that times every call of a Tk callback or render method"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+
+    def _frame_tick(self):
+        """Heartbeat on the Tk thread; a late tick means the main loop was blocked"""
+        now = time.perf_counter()
+        if self.enabled:
+            self.frame_times.append((now - self._last_tick) * 1000)
+        self._last_tick = now
+        try:
+            self._root.after(self.FRAME_INTERVAL_MS, self._frame_tick)
+        except Exception:
+            self._root = None  # Root was destroyed
+
+    @staticmethod
+    def _describe(samples):
+        if not samples:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0, "total": 0.0}
+        ordered = sorted(samples)
+        count = len(ordered)
+        total = sum(ordered)
+        return {
+            "count": count,
+            "mean": total / count,
+            "p50": ordered[count // 2],
+            "p95": ordered[min(count - 1, int(count * 0.95))],
+            "max": ordered[-1],
+            "total": total,
+        }
+
+    def summary(self):
+        """Get per-stage, frame-time and latency statistics"""
+        with self._lock:
+            stages = {name: list(samples) for name, samples in self.stages.items()}
+        frame_times = list(self.frame_times)
+        return {
+            "stages": {name: self._describe(samples) for name, samples in stages.items()},
+            "frame_times": self._describe(frame_times),
+            "janky_frames": sum(1 for t in frame_times if t > self.JANK_THRESHOLD_MS),
+            "queue_latency": self._describe(list(self.latencies)),
+        }
+
+    def export(self, path):
+        """Write the summary and raw samples to a JSON file"""
+        with self._lock:
+            stages = {name: list(samples) for name, samples in self.stages.items()}
+        report = {
+            "started_at": self.started_at,
+            "exported_at": time.time(),
+            "summary": self.summary(),
+            "samples": {
+                "stages": stages,
+                "frame_times": list(self.frame_times),
+                "queue_latency": list(self.latencies),
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print("[OK] Render profile exported to", path)
+
+profiler = RenderProfiler()
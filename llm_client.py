@@ -0,0 +1,226 @@
+import threading
+import queue
+import base64
+import io
+
+from config import config
+from data_structures import INVISIBLE_CHARS
+
+# ===========================
+# HELPER FUNCTIONS
+# ===========================
+
+def clean_chat_line(text):
+    for invisible, replacement in INVISIBLE_CHARS.items():
+        text = text.replace(invisible, replacement)
+    return ' '.join(text.split()).strip()
+
+def get_screen_data_url(max_w=None, max_h=None):
+    """Get screenshot as data URL"""
+    if max_w is None:
+        max_w = config.get("IMAGE_SIZE")
+    if max_h is None:
+        max_h = config.get("IMAGE_SIZE")
+
+    try:
+        # Imported here so headless runs without screen capture don't need them
+        import mss
+        from PIL import Image, ImageOps
+
+        with mss.mss() as sct:
+            monitor = sct.monitors[1]
+            raw = sct.grab(monitor)
+            img = Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
+
+            if config.get("ADAPTIVE_QUALITY") and threading.active_count() > 10:
+                max_w = max_w // 2
+                max_h = max_h // 2
+
+            img = ImageOps.contain(img, (max_w, max_h))
+
+            buf = io.BytesIO()
+            quality = 70 if threading.active_count() <= 10 else 30
+            img.save(buf, format="JPEG", quality=quality)
+            b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+            buf.close()
+
+            return f"data:image/jpeg;base64,{b64}", img
+    except Exception as e:
+        print(f"[ERROR] Screenshot error: {e}")
+        return "data:image/jpeg;base64,", None
+
+# ===========================
+# LLM CONNECTION POOL
+# ===========================
+
+class LLMConnectionPool:
+    """Sends chat completions to the LLM server.
+
+    At most CONCURRENT_REQUESTS calls are in flight at once, across every
+    engine. A call given a CancelToken hands its request to a pool worker
+    and returns "" as soon as it is cancelled. requests cannot abort a
+    request mid-flight, so the abandoned one keeps its slot until the
+    server answers or times out, and no new call starts until every
+    abandoned request has finished: a restart never puts extra load on
+    the model. There is at most one worker per queued or running request;
+    workers idle for WORKER_IDLE seconds exit.
+    """
+    WORKER_IDLE = 60.0
+    
+    def __init__(self):
+        # The session (and requests itself) is created on the first call
+        self.session = None
+        self.request_queue = queue.Queue()
+        self.active_requests = 0
+        self.abandoned = 0  # Cancelled calls whose request is still running
+        self.workers = 0
+        self._jobs = 0  # Submitted to the workers and not finished
+        # Connection settings are read on the first call so importing doesn't load the settings file
+        self.keep_alive = None
+        self.max_concurrent = None
+        self._slots = threading.Condition()
+        config.subscribe(["KEEP_ALIVE_CONNECTION", "CONCURRENT_REQUESTS"], self._reconfigure)
+        
+    def _reconfigure(self, changed, cfg):
+        """Apply connection settings without a restart"""
+        with self._slots:
+            self.max_concurrent = cfg.CONCURRENT_REQUESTS
+            self.keep_alive = cfg.KEEP_ALIVE_CONNECTION
+            self._slots.notify_all()
+        self._retire_session()
+        
+    def _retire_session(self):
+        """Close the kept-alive session once it's switched off and no call is using it"""
+        with self._slots:
+            if self.keep_alive or self.session is None or self.active_requests:
+                return
+            session, self.session = self.session, None
+        session.close()
+
+    def _acquire(self, cancel):
+        """Wait for a request slot (and for abandoned requests to end); False if cancelled first"""
+        if self.max_concurrent is None:
+            self._reconfigure(None, config.snapshot())
+        remove = cancel.on_cancel(self._wake) if cancel else None
+        try:
+            with self._slots:
+                # 0 from the settings slider still allows one request
+                while self.abandoned or self.active_requests >= max(1, self.max_concurrent):
+                    if cancel and cancel.cancelled:
+                        return False
+                    self._slots.wait()
+                if cancel and cancel.cancelled:
+                    return False
+                self.active_requests += 1
+                return True
+        finally:
+            if remove:
+                remove()
+
+    def _wake(self):
+        with self._slots:
+            self._slots.notify_all()
+
+    def _release(self):
+        with self._slots:
+            self.active_requests -= 1
+            self._slots.notify_all()
+        self._retire_session()
+        
+    def _submit(self, job):
+        """Queue a job for a worker, starting one unless a worker is free for it"""
+        with self._slots:
+            self._jobs += 1
+            start = self.workers < self._jobs
+            if start:
+                self.workers += 1
+        if start:
+            threading.Thread(target=self._work, daemon=True).start()
+        self.request_queue.put(job)
+        
+    def _work(self):
+        while True:
+            try:
+                job = self.request_queue.get(timeout=self.WORKER_IDLE)
+            except queue.Empty:
+                with self._slots:
+                    if self.workers > self._jobs:
+                        self.workers -= 1
+                        return
+                continue
+            try:
+                job["content"] = self._post(*job["args"])
+            finally:
+                with self._slots:
+                    self._jobs -= 1
+                    self.active_requests -= 1
+                    job["finished"] = True
+                    if job["abandoned"]:
+                        self.abandoned -= 1
+                    self._slots.notify_all()
+                self._retire_session()
+                job["done"].set()
+
+    def _call_llm(self, system_instructions, user_text, screen_data_url, cancel=None):
+        """Completion text for one prompt, "" on error or cancellation"""
+        if not self._acquire(cancel):
+            return ""
+        if cancel is None:
+            try:
+                return self._post(system_instructions, user_text, screen_data_url)
+            finally:
+                self._release()
+
+        # Run the blocking request on a worker so cancellation returns at once
+        job = {"args": (system_instructions, user_text, screen_data_url), "content": "",
+               "done": threading.Event(), "finished": False, "abandoned": False}
+        self._submit(job)
+        remove = cancel.on_cancel(job["done"].set)
+        job["done"].wait()
+        remove()
+        if not cancel.cancelled:
+            return job["content"]
+        with self._slots:
+            if not job["finished"]:
+                job["abandoned"] = True
+                self.abandoned += 1
+        return ""
+
+    def _post(self, system_instructions, user_text, screen_data_url):
+        import requests  # Deferred so startup doesn't pay for it
+        
+        user_content = [{"type": "text", "text": user_text}]
+        # Headless runs without screen capture send text only
+        if screen_data_url and not screen_data_url.endswith(","):
+            user_content.append({"type": "image_url", "image_url": {"url": screen_data_url}})
+
+        payload = {
+            "model": config.get("MODEL"),
+            "messages": [
+                {"role": "system", "content": [{"type": "text", "text": system_instructions}]},
+                {"role": "user", "content": user_content}
+            ],
+            "temperature": config.get("TEMPERATURE"),
+            "max_tokens": config.get("MAX_TOKENS"),
+            "stream": False
+        }
+
+        try:
+            timeout = config.get("LLM_TIMEOUT", 30)
+            with self._slots:
+                if self.session is None and self.keep_alive:
+                    self.session = requests.Session()
+                session = self.session
+            if session:
+                resp = session.post(config.get("API_URL"), json=payload, timeout=timeout)
+            else:
+                resp = requests.post(config.get("API_URL"), json=payload, timeout=timeout)
+
+            resp.raise_for_status()
+            content = resp.json()["choices"][0]["message"]["content"]
+            return content
+        except Exception as e:
+            print(f"[ERROR] LLM Error: {e}")
+            return ""
+
+llm_pool = LLMConnectionPool()
@@ -1,26 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-import threading
 import time
-import random
 import queue
 import re
 import os
-import sys
+import itertools
+from array import array
 from collections import deque
-from datetime import datetime
-from PIL import Image, ImageTk
 
 from config import config
-from data_structures import (
-    twitch_data, INVISIBLE_CHARS, DONATION_MESSAGES, EVENT_MESSAGES, 
-    EMOTE_LIST, EMOTE_COLORS, HYPE_WORDS, CHILL_WORDS, USERNAME_POOL, 
-    USERNAME_COLORS, CHAT_PERSONALITIES, USER_BADGES
-)
+from data_structures import twitch_data, USER_BADGES, ChatMessage, MessageStore
 from ui_components import (
-    ModernCheckbox, DonationPopup, EmotePanel, EnhancedText, StreamStatsPanel, 
-    SettingsWindow, LLMConnectionPool, clean_chat_line, get_screen_data_url, llm_pool
+    DonationPopup, EmotePanel, EnhancedText, VirtualChatView, StreamStatsPanel, 
+    PerfOverlay, SettingsWindow
 )
+from instrumentation import profiler
+from engine import ChatEngine
+from emote_registry import emote_color, style_tag
+from emote_images import EmoteImageCache
+from sinks import QueueSink, ChatLogSink
+from chat_log import ChatLog
+from channel_state import ChannelStateStore
+from user_tables import ColdUserStore
+from search_index import ChatSearchIndex, parse_query
 
 # ===========================
 # MAIN TWITCH CHAT UI CLASS
@@ -45,40 +47,68 @@ class TwitchChatUI:
         self.root.geometry(f"+{x}+{y}")
         
         # Enhanced functionality
-        self.running = False
         self.msg_queue = queue.Queue()
-        self.recent_chat = deque(maxlen=config.get("HISTORY_LEN"))
         self.message_cache = deque(maxlen=config.get("MESSAGE_CACHE_SIZE"))
-        self.last_screenshot_data = None
-        self.last_screenshot_time = 0
+        # Only the virtual view reads messages back; text mode keeps them in the widget
+        self.message_store = MessageStore(config.get("VIRTUAL_CHAT_HISTORY")) if config.get("VIRTUAL_CHAT_VIEW") else None
+        self.next_seq = 0  # Text mode: seq of the next message
+        self.chat_view = None
         self.photo = None
-        self.chatter_map = {}
-        self.banned_users = {}
-        self.modjv_override_requested = False
         self.is_paused = False
+        self.search_index = ChatSearchIndex()
+        self.seq_lines = array('I')  # Text mode: chat box line of each stored seq
         self.search_results = []
         self.current_search_index = -1
-        self.last_streamer_message = None
-        self.last_streamer_message_time = 0
+        
+        # Resume the saved channel before the engine picks up its chatters
+        self.channel_state = None
+        self.cold_users = None
+        if config.get("CHANNEL_STATE_ENABLED"):
+            self.channel_state = ChannelStateStore(os.path.join(config.get("SETTINGS_DIR"), "channel_state"))
+            # Users evicted from the bounded tables live next to the snapshot
+            self.cold_users = ColdUserStore(os.path.join(self.channel_state.directory, "cold_users"))
+        twitch_data.configure_user_tables(config.get("USER_TABLE_SIZE"), self.cold_users)
+        if self.channel_state:
+            if self.channel_state.restore(twitch_data):
+                print(f"[OK] Channel state restored from {self.channel_state.directory}")
+            self.channel_state.start(twitch_data, config.get("CHANNEL_STATE_INTERVAL"))
+        
+        # Chat generation runs in the engine; the UI only renders its queue
+        sinks = [QueueSink(self.msg_queue)]
+        self.chat_log = self._open_chat_log()
+        if self.chat_log:
+            sinks.append(ChatLogSink(self.chat_log))
+        self.engine = ChatEngine(sinks=sinks)
+        self.engine.on_donation = lambda d, a, m, t: self.root.after(0, lambda: DonationPopup(self.root, d, a, m, t))
+        self.engine.on_screenshot = self._on_screenshot
         
         # Queue monitoring
         self.queue_monitor_active = False
         self.last_queue_size = 0
         
-        # Create helper objects FIRST
-        self.settings_window = SettingsWindow(root, self)
-        self.emote_panel = EmotePanel(root, self)
+        # Create helper objects FIRST; windows not shown at startup are built on first use
+        self._settings_window = None
+        self._emote_panel = None
+        self._perf_overlay = None
         self.stream_stats = StreamStatsPanel(root, self)
         self.hover_timer = None
         
-        # Dynamic emote loading from Emojis directory
-        self.emojis_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'Emojis_The_Camp____Social__Karaoke__Events__VC__Valorant__Pinoy__Filipino__Call__Anime__Voice', 'Emojis'))
-        try:
-            files = [f for f in os.listdir(self.emojis_dir) if f.lower().endswith(('.png', '.gif', '.jpg', '.jpeg'))]
-            self.emote_list = {os.path.splitext(f)[0].upper() for f in files}
-        except (OSError, FileNotFoundError):
-            self.emote_list = set(EMOTE_LIST)
-        self.emote_colors = {emote: EMOTE_COLORS.get(emote, random.choice(USERNAME_COLORS)) for emote in self.emote_list}
+        # The engine's registry scans the Emojis directory on first lookup; emotes
+        # share one text tag per color, configured the first time the color shows up
+        self.emotes = self.engine.emotes
+        self.emote_styles = {}  # tag -> color
+        # Inline emote images are decoded off the Tk thread, on first use unless preloading
+        self.emote_images = EmoteImageCache(root, self.emotes, height=self._emote_height(),
+                                            budget_bytes=config.get("EMOTE_IMAGE_CACHE_MB") * 1024 * 1024,
+                                            on_ready=self._on_emote_image_ready,
+                                            on_evict=self._on_emote_image_evicted)
+        self._emote_refresh_pending = False
+        # Text mode: emote -> {mark: [word, PhotoImage shown or None]} for each occurrence in chat,
+        # so an image change touches only that emote instead of scanning the history
+        self.emote_marks = {}
+        self._mark_ids = itertools.count()
+        if config.get("INLINE_EMOTES") and not config.get("LAZY_LOAD_EMOTES"):
+            self.emote_images.preload(self.emotes)
         
         # THEN create UI elements
         self._configure_styles()
@@ -89,8 +119,11 @@ class TwitchChatUI:
         
         self._configure_tags()
         self._setup_bindings()
+        self._subscribe_settings()
         self.root.after(100, self._drain_queue)
         self.root.after(5000, self._monitor_queue)  # Start queue monitoring
+        if config.get("PERF_INSTRUMENTATION"):
+            profiler.enable(self.root)
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # Debug frame if enabled
@@ -102,6 +135,24 @@ class TwitchChatUI:
             self.debug_label.pack(fill="both", expand=True, padx=5, pady=5)
             self.debug_frame.pack(side="top", fill="x", expand=False)
         
+    @property
+    def settings_window(self):
+        if self._settings_window is None:
+            self._settings_window = SettingsWindow(self.root, self)
+        return self._settings_window
+        
+    @property
+    def emote_panel(self):
+        if self._emote_panel is None:
+            self._emote_panel = EmotePanel(self.root, self)
+        return self._emote_panel
+        
+    @property
+    def perf_overlay(self):
+        if self._perf_overlay is None:
+            self._perf_overlay = PerfOverlay(self.root)
+        return self._perf_overlay
+        
     def _configure_styles(self):
         style = ttk.Style()
         style.theme_use('default')
@@ -132,9 +183,10 @@ class TwitchChatUI:
             ("🕒", self._toggle_timestamps, "Toggle Timestamps"),
             ("🔍", self._show_search, "Search Chat"),
             ("💾", self._export_chat, "Export Chat"),
-            ("😀", self.emote_panel.show, "Emote Panel"),
-            ("⚙", self.settings_window.show, "Settings"),
+            ("😀", lambda: self.emote_panel.show(), "Emote Panel"),
+            ("⚙", lambda: self.settings_window.show(), "Settings"),
             ("👥", self._show_follower_stats, "Follower Stats"),
+            ("📊", lambda: self.perf_overlay.show(), "Render Profiler"),
             ("⭐", self._simulate_event, "Simulate Event"),
         ]
         
@@ -154,17 +206,27 @@ class TwitchChatUI:
         chat_frame = tk.Frame(self.root, bg="#0E0E10")
         chat_frame.pack(side="top", fill="both", expand=True, padx=5, pady=5)
         
-        self.chat_box = EnhancedText(chat_frame, wrap="word", state="disabled", 
-                                   bg="#0E0E10", fg="#EDEEEE", 
-                                   font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")), 
-                                   relief="flat", padx=8, pady=4,
-                                   borderwidth=0, highlightthickness=0)
-        
-        self.scrollbar = ttk.Scrollbar(chat_frame, command=self.chat_box.yview)
-        self.chat_box.configure(yscrollcommand=self.scrollbar.set)
-        
-        self.chat_box.pack(side="left", fill="both", expand=True)
-        self.scrollbar.pack(side="right", fill="y")
+        text_options = dict(wrap="word", state="disabled", 
+                            bg="#0E0E10", fg="#EDEEEE", 
+                            font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")), 
+                            relief="flat", padx=8, pady=4,
+                            borderwidth=0, highlightthickness=0)
+        
+        if self.message_store is not None:
+            # Only the visible window of the message store lives in the widget
+            self.chat_view = VirtualChatView(chat_frame, self.message_store, 
+                                             self._render_message, **text_options)
+            self.chat_view.pack(fill="both", expand=True)
+            self.chat_box = self.chat_view.text
+            self.scrollbar = self.chat_view.scrollbar
+        else:
+            self.chat_box = EnhancedText(chat_frame, **text_options)
+            
+            self.scrollbar = ttk.Scrollbar(chat_frame, command=self.chat_box.yview)
+            self.chat_box.configure(yscrollcommand=self.scrollbar.set)
+            
+            self.chat_box.pack(side="left", fill="both", expand=True)
+            self.scrollbar.pack(side="right", fill="y")
         
         self._update_chat_density()
         
@@ -217,8 +279,11 @@ class TwitchChatUI:
             self.chat_box.bind("<Leave>", self._on_chat_leave)
             
         self.root.bind("<Control-f>", lambda e: self._show_search())
+        self.root.bind("<F3>", lambda e: self._step_search(1))
+        self.root.bind("<Shift-F3>", lambda e: self._step_search(-1))
         self.root.bind("<Control-e>", lambda e: self._export_chat())
         self.root.bind("<Control-p>", lambda e: self.settings_window.show())
+        self.root.bind("<Control-i>", lambda e: self.perf_overlay.show())
         
         if config.get("HIDE_TITLE_BAR"):
             self.root.bind("<Button-1>", self._start_drag)
@@ -246,12 +311,56 @@ class TwitchChatUI:
                                   font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")+1))
             
     def _update_font_size(self, size):
+        # The TEXT_SIZE subscription restyles the chat box
         config.set("TEXT_SIZE", int(size))
-        self.chat_box.configure(font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")))
+        
+    def _subscribe_settings(self):
+        """Reconfigure the UI live when settings change.
+        
+        Settings can change on any thread, so Tk work is marshaled onto
+        the Tk thread with root.after.
+        """
+        def on_tk(handler):
+            return lambda changed, cfg: self.root.after(0, handler, changed, cfg)
+        
+        config.subscribe(["CHAT_DENSITY", "FONT_FAMILY", "TEXT_SIZE", "STREAMER_NAME", "MODJV_USERNAME", "INLINE_EMOTES"], 
+                         on_tk(self._on_render_settings_changed))
+        config.subscribe(["WINDOW_ON_TOP"], 
+                         on_tk(lambda changed, cfg: self.root.attributes("-topmost", cfg.WINDOW_ON_TOP)))
+        config.subscribe(["MESSAGE_CACHE_SIZE"], on_tk(self._on_cache_settings_changed))
+        config.subscribe(["PERF_INSTRUMENTATION"], on_tk(self._on_profiler_setting_changed))
+        config.subscribe(["EMOTE_IMAGE_CACHE_MB", "LAZY_LOAD_EMOTES"], on_tk(self._on_emote_settings_changed))
+        config.subscribe(["USER_TABLE_SIZE"], 
+                         lambda changed, cfg: twitch_data.resize_user_tables(cfg.USER_TABLE_SIZE))
+        
+    def _on_render_settings_changed(self, changed, cfg):
+        self.emote_images.set_height(self._emote_height())
+        self._update_chat_density()
         self._configure_tags()
+        if self.chat_view:
+            self.chat_view.refresh()
+            
+    def _on_emote_settings_changed(self, changed, cfg):
+        self.emote_images.set_budget(cfg.EMOTE_IMAGE_CACHE_MB * 1024 * 1024)
+        if cfg.INLINE_EMOTES and not cfg.LAZY_LOAD_EMOTES:
+            self.emote_images.preload(self.emotes)
+            
+    def _on_cache_settings_changed(self, changed, cfg):
+        self.message_cache = deque(self.message_cache, maxlen=cfg.MESSAGE_CACHE_SIZE)
+        
+    def _on_profiler_setting_changed(self, changed, cfg):
+        if cfg.PERF_INSTRUMENTATION:
+            profiler.enable(self.root)
+        else:
+            profiler.disable()
         
     def _smooth_scroll_to(self, position):
-        if config.get("SMOOTH_SCROLLING"):
+        if self.chat_view:
+            if position == "1.0":
+                self.chat_view.scroll_to_top()
+            else:
+                self.chat_view.scroll_to_end()
+        elif config.get("SMOOTH_SCROLLING"):
             current_pos = self.chat_box.yview()[0]
             target_pos = 0.0 if position == "1.0" else 1.0
             
@@ -265,6 +374,7 @@ class TwitchChatUI:
         else:
             self.chat_box.see(position)
             
+    @profiler.timed("configure_tags")
     def _configure_tags(self):
         self.chat_box.tag_config("message_text", foreground="#EDEEEE", 
                                 font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")))
@@ -283,27 +393,93 @@ class TwitchChatUI:
                                 foreground="white")
         self.chat_box.tag_config("badge", font=(config.get("FONT_FAMILY"), config.get("TEXT_SIZE")-1))
         
-        for emote in self.emote_list:
-            self.chat_box.tag_config(f"emote_{emote}", 
-                                   foreground=self.emote_colors.get(emote, "#FFFFFF"), 
-                                   font=(config.get("FONT_FAMILY") + " Bold", config.get("TEXT_SIZE") + 2))
+        # Only emote colors already seen in chat have a tag to refresh
+        for tag in self.emote_styles:
+            self._configure_emote_style(tag)
+            
+    def _emote_tag(self, emote):
+        """Shared style tag for an emote, configured the first time its color is used"""
+        tag = style_tag(emote)
+        if tag not in self.emote_styles:
+            self.emote_styles[tag] = emote_color(emote)
+            self._configure_emote_style(tag)
+        return tag
+        
+    def _configure_emote_style(self, tag):
+        self.chat_box.tag_config(tag, foreground=self.emote_styles[tag], 
+                               font=(config.get("FONT_FAMILY") + " Bold", config.get("TEXT_SIZE") + 2))
+
+    def _emote_height(self):
+        """Inline emote height in pixels for the current text size"""
+        return config.get("TEXT_SIZE") * 2
+        
+    def _schedule_emote_refresh(self):
+        """Re-render the virtual chat view once for a burst of image changes"""
+        if not self._emote_refresh_pending:
+            self._emote_refresh_pending = True
+            self.root.after_idle(self._refresh_emotes)
+            
+    def _refresh_emotes(self):
+        self._emote_refresh_pending = False
+        self.chat_view.refresh()
+        
+    def _on_emote_image_ready(self, emote):
+        """Swap an emote's text already in chat for its freshly decoded image"""
+        if not config.get("INLINE_EMOTES"):
+            return
+        if self.chat_view:
+            self._schedule_emote_refresh()
+            return
+        photo = self.emote_images.get(emote)
+        marks = self.emote_marks.get(emote)
+        if photo is None or not marks:
+            return
+        self.chat_box.configure(state="normal")
+        for mark, occurrence in marks.items():
+            word, shown = occurrence
+            if shown is photo:
+                continue
+            # Replaces the text, or an image still at an older text size
+            self.chat_box.delete(mark, f"{mark} +{1 if shown else len(word)}c")
+            self.chat_box.image_create(mark, image=photo, padx=1)
+            occurrence[1] = photo
+        self.chat_box.configure(state="disabled")
+        
+    def _on_emote_image_evicted(self, emote, photo):
+        """Put text back wherever the evicted image (of any size) is still shown"""
+        if self.chat_view:
+            self._schedule_emote_refresh()
+            return
+        marks = self.emote_marks.get(emote)
+        if not marks:
+            return
+        tag = self._emote_tag(emote)
+        self.chat_box.configure(state="normal")
+        for mark, occurrence in marks.items():
+            word, shown = occurrence
+            if shown is photo:
+                self.chat_box.delete(mark)
+                self.chat_box.insert(mark, word, (tag, "message_text"))
+                occurrence[1] = None
+        self.chat_box.configure(state="disabled")
 
+    @profiler.timed("drain_queue")
     def _drain_queue(self):
         try:
             while True:
-                data = self.msg_queue.get_nowait()
-                if isinstance(data, dict) and data.get('type') == 'ban':
-                    self._append_ban_notification(data['username'], data['reason'])
+                message = self.msg_queue.get_nowait()
+                if message.kind == ChatMessage.BAN:
+                    self._append_ban_notification(message)
                 else:
-                    username, color, text, badges = data
-                    self._append_line(username, color, text, badges)
+                    self._append_line(message)
+                profiler.record_latency(message.queued_at)
         except queue.Empty:
             pass
         self.root.after(100, self._drain_queue)
 
     def _monitor_queue(self):
         """Monitor queue size and auto-clear if needed"""
-        if self.running:
+        if self.engine.running:
             current_size = self.msg_queue.qsize()
             
             # Auto-clear queue if enabled and queue is too large
@@ -331,42 +507,99 @@ class TwitchChatUI:
         """Show current queue status"""
         queue_size = self.msg_queue.qsize()
         cache_size = len(self.message_cache)
-        recent_size = len(self.recent_chat)
+        recent_size = len(self.engine.recent_chat)
         
-        status = f"Queue Status:\n"
+        status = "Queue Status:\n"
         status += f"Message Queue: {queue_size} items\n"
         status += f"Message Cache: {cache_size}/{config.get('MESSAGE_CACHE_SIZE')} messages\n"
         status += f"Recent Chat: {recent_size}/{config.get('HISTORY_LEN')} messages\n"
-        status += f"Chatter Map: {len(self.chatter_map)} users\n"
-        status += f"Banned Users: {len(self.banned_users)} users"
+        status += f"Chatter Map: {len(self.engine.chatters.chatters)} users\n"
+        status += f"Banned Users: {len(self.engine.chatters.banned)} users"
         
         messagebox.showinfo("Queue Status", status)
 
-    def _append_ban_notification(self, banned_user_id, reason):
-        self.chat_box.configure(state="normal")
-        
-        base_name = re.sub(r'\d+$', '', banned_user_id)
-        self.banned_users[base_name] = time.time() + 120
-        
-        if base_name in self.chatter_map:
-            del self.chatter_map[base_name]
-        
-        ban_message = f"\n{banned_user_id} has been timed out by {config.get('MODJV_USERNAME')} for {reason} (120s).\n"
-        self.chat_box.insert("end", ban_message, "BAN_NOTIFICATION")
+    @profiler.timed("append_ban")
+    def _append_ban_notification(self, message):
+        seq = self._store_message(message)
         
+        if self.chat_view:
+            self.chat_view.on_append(seq)
+            return
+            
+        self.chat_box.configure(state="normal")
+        self.chat_box.insert("end", "\n")
+        self._track_line(seq)
+        self._render_message(message)
         self.chat_box.see("end")
         self.chat_box.configure(state="disabled")
 
-    def _append_line(self, username, color, text, badges=None):
-        if self.is_paused and not username == config.get("STREAMER_NAME"):
+    @profiler.timed("append_line")
+    def _append_line(self, message):
+        cfg = config.snapshot()
+        if self.is_paused and not message.username == cfg.STREAMER_NAME:
+            return
+            
+        seq = self._store_message(message)
+        self.message_cache.append(message)
+        
+        if self.chat_view:
+            self.chat_view.on_append(seq)
+            if cfg.ANIMATIONS_ENABLED:
+                self._animate_message_insertion()
             return
             
         self.chat_box.configure(state="normal")
         
         scroll_at_bottom = self._is_scroll_at_bottom()
+        self._track_line(seq)
+        self._render_message(message)
+            
+        if cfg.ANIMATIONS_ENABLED:
+            self._animate_message_insertion()
+            
+        if scroll_at_bottom:
+            self.chat_box.see("end")
+            
+        self.chat_box.configure(state="disabled")
         
-        if config.get("SHOW_TIMESTAMPS"):
-            timestamp = datetime.now().strftime("[%H:%M:%S] ")
+    def _store_message(self, message):
+        """Add a message to the store and search index, returns its seq"""
+        if self.message_store is None:
+            seq = self.next_seq
+            self.next_seq += 1
+            self.search_index.add(seq, message)
+            return seq
+        seq = self.message_store.append(message)
+        self.search_index.add(seq, message)
+        # Once the ring is full every append overwrites a message; trim the index in chunks.
+        # Postings kept meanwhile are skipped by search() since the store no longer has them.
+        first_seq = self.message_store.first_seq
+        if first_seq - self.search_index.first_seq >= max(1, self.message_store.capacity // 10):
+            self.search_index.prune(first_seq)
+        return seq
+        
+    def _track_line(self, seq):
+        """Remember which chat box line a text-mode message starts on"""
+        while len(self.seq_lines) < seq:
+            self.seq_lines.append(0)  # Not rendered (e.g. stored while hidden)
+        self.seq_lines.append(int(self.chat_box.index("end-1c").split(".")[0]))
+        
+    @profiler.timed("render_message")
+    def _render_message(self, message):
+        """Insert one stored message at the end of the chat box as a single line"""
+        cfg = config.snapshot()
+        if message.kind == ChatMessage.BAN:
+            ban_message = f"{message.username} has been timed out by {cfg.MODJV_USERNAME} for {message.reason} (120s).\n"
+            self.chat_box.insert("end", ban_message, "BAN_NOTIFICATION")
+            return
+            
+        username = message.username
+        color = message.color
+        text = message.text
+        badges = message.badge_names()
+        
+        if cfg.SHOW_TIMESTAMPS:
+            timestamp = "[" + message.time_string() + "] "
             self.chat_box.insert("end", timestamp, "timestamp")
         
         if badges:
@@ -380,48 +613,48 @@ class TwitchChatUI:
                                               foreground=badge_info["color"])
         
         tags = []
-        if username in twitch_data.highlighted_users:
+        highlight = twitch_data.highlight_color(username)
+        if highlight:
             tags.append("user_highlight")
-            color = twitch_data.highlighted_users[username]
+            color = highlight
             
         self.chat_box.insert("end", username, (username, *tags))
         self.chat_box.insert("end", ": ", "separator")
         
         words = text.split()
         message_tags = ["message_text"]
-        if config.get("HIGHLIGHT_USERNAME") and config.get("STREAMER_NAME").upper() in text.upper():
+        if cfg.HIGHLIGHT_USERNAME and cfg.STREAMER_NAME.upper() in text.upper():
             message_tags.append("mention_highlight")
             
         for word in words:
-            if word.upper() in self.emote_list:
-                emote_name = word.upper()
-                emote_tag = f"emote_{emote_name}"
-                self.chat_box.insert("end", f"{word} ", (emote_tag, *message_tags))
+            emote_name = word.upper()
+            if emote_name in self.emotes:
+                image = self.emote_images.get(emote_name) if cfg.INLINE_EMOTES else None
+                if not self.chat_view:
+                    self._mark_emote(emote_name, word, image)
+                if image is not None:
+                    self.chat_box.image_create("end", image=image, padx=1)
+                    self.chat_box.insert("end", " ", message_tags)
+                    continue
+                self.chat_box.insert("end", f"{word} ", (self._emote_tag(emote_name), *message_tags))
             else:
                 self.chat_box.insert("end", f"{word} ", message_tags)
                 
         self.chat_box.insert("end", "\n")
         
-        if not self.chat_box.tag_cget(username, "foreground"):
-            self.chat_box.tag_config(username, foreground=color, 
-                                   font=(config.get("FONT_FAMILY") + " Semibold", config.get("TEXT_SIZE")))
-            
-        if config.get("ANIMATIONS_ENABLED"):
-            self._animate_message_insertion()
-            
-        if scroll_at_bottom:
-            self.chat_box.see("end")
-            
-        self.chat_box.configure(state="disabled")
+        with profiler.stage("user_tag_config"):
+            if not self.chat_box.tag_cget(username, "foreground"):
+                self.chat_box.tag_config(username, foreground=color, 
+                                       font=(cfg.FONT_FAMILY + " Semibold", cfg.TEXT_SIZE))
         
-        self.message_cache.append({
-            "timestamp": datetime.now().isoformat(),
-            "username": username,
-            "text": text,
-            "color": color,
-            "badges": badges or []
-        })
+    def _mark_emote(self, emote, word, image):
+        """Text mode: mark where an emote is about to be inserted so image changes can find it"""
+        mark = f"emote{next(self._mark_ids)}"
+        self.chat_box.mark_set(mark, "end-1c")
+        self.chat_box.mark_gravity(mark, "left")  # Stays in front of what is inserted at it
+        self.emote_marks.setdefault(emote, {})[mark] = [word, image]
         
+    @profiler.timed("animate")
     def _animate_message_insertion(self):
         last_line = self.chat_box.index("end-2c")
         self.chat_box.tag_add("fade_in", last_line)
@@ -436,24 +669,25 @@ class TwitchChatUI:
         densities = ["compact", "normal", "comfortable"]
         current_index = densities.index(config.get("CHAT_DENSITY"))
         config.set("CHAT_DENSITY", densities[(current_index + 1) % len(densities)])
-        self._update_chat_density()
         
     def _toggle_timestamps(self):
         config.set("SHOW_TIMESTAMPS", not config.get("SHOW_TIMESTAMPS"))
         
     def _show_search(self):
-        search_term = simpledialog.askstring("Chat Search", "Enter search term:")
+        search_term = simpledialog.askstring("Chat Search", "Enter search term (from:user, last:10m):")
         if search_term:
             self._search_chat(search_term)
             
     def _search_chat(self, term):
-        self.search_results = []
-        content = self.chat_box.get("1.0", "end")
-        lines = content.split("\n")
-        
-        for i, line in enumerate(lines):
-            if term.lower() in line.lower():
-                self.search_results.append(i + 1)
+        # Every hit at once from the index, as seqs, so next/previous never rescans
+        filters = parse_query(term)
+        self.search_results = self.search_index.search(self.message_store, **filters)
+        if not self.chat_view:
+            # Without a store, multi-word terms are checked against the rendered line
+            text = (filters["text"] or "").lower()
+            self.search_results = [seq for seq in self.search_results 
+                                   if seq < len(self.seq_lines) and self.seq_lines[seq]
+                                   and (" " not in text or text in self._line_text(seq).lower())]
                 
         if self.search_results:
             self.current_search_index = 0
@@ -461,30 +695,80 @@ class TwitchChatUI:
         else:
             messagebox.showinfo("Search", "No matches found.")
             
+    def _step_search(self, step):
+        """Move to the next (1) or previous (-1) search hit"""
+        if not self.search_results:
+            return
+        self.current_search_index = (self.current_search_index + step) % len(self.search_results)
+        self._highlight_search_result()
+            
+    def _line_text(self, seq):
+        """Text-mode chat box line of a message"""
+        line = self.seq_lines[seq]
+        return self.chat_box.get(f"{line}.0", f"{line}.end")
+            
     def _highlight_search_result(self):
         if not self.search_results:
             return
             
-        line = self.search_results[self.current_search_index]
+        if self.chat_view:
+            self.chat_view.see_seq(self.search_results[self.current_search_index])
+            return
+            
+        line = self.seq_lines[self.search_results[self.current_search_index]]
         self.chat_box.see(f"{line}.0")
         self.chat_box.tag_remove("search_highlight", "1.0", "end")
         self.chat_box.tag_add("search_highlight", f"{line}.0", f"{line}.end")
         
+    def _open_chat_log(self):
+        """Open the on-disk session log if enabled"""
+        if not config.get("CHAT_LOG_ENABLED"):
+            return None
+        log_dir = config.get("CHAT_LOG_DIR") or os.path.join(config.get("SETTINGS_DIR"), "chat_logs")
+        try:
+            return ChatLog(log_dir, segment_bytes=config.get("CHAT_LOG_SEGMENT_MB") * 1024 * 1024,
+                           flush_interval=config.get("CHAT_LOG_FLUSH_SECONDS"),
+                           max_bytes=config.get("CHAT_LOG_MAX_MB") * 1024 * 1024)
+        except OSError as e:
+            print(f"[ERROR] Could not open chat log in {log_dir}: {e}")
+            return None
+            
+    @staticmethod
+    def _format_export_line(msg):
+        if msg.kind == ChatMessage.BAN:
+            return f"{msg.time_string()} {msg.username} has been timed out for {msg.reason}"
+        badges = " ".join([USER_BADGES.get(b, {}).get("text", "") for b in msg.badge_names()])
+        return f"{msg.time_string()} {badges} {msg.username}: {msg.text}"
+            
     def _export_chat(self):
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
         )
         if filename:
-            with open(filename, "w", encoding="utf-8") as f:
-                for msg in self.message_cache:
-                    timestamp = msg["timestamp"][11:19]
-                    badges = " ".join([USER_BADGES.get(b, {}).get("text", "") for b in msg["badges"]])
-                    f.write(f"{timestamp} {badges} {msg['username']}: {msg['text']}\n")
+            if self.chat_log:
+                # Full session from disk instead of only the in-memory cache
+                reader = self.chat_log.reader()
+                try:
+                    reader.export(filename, self._format_export_line)
+                finally:
+                    reader.close()
+            else:
+                with open(filename, "w", encoding="utf-8") as f:
+                    for msg in self.message_cache:
+                        f.write(self._format_export_line(msg) + "\n")
             messagebox.showinfo("Export", "Chat history exported successfully!")
             
     def _show_context_menu(self, event):
         try:
+            if self.chat_view:
+                message = self.message_store.get(self.chat_view.seq_at(event.y))
+                if message and message.kind == ChatMessage.CHAT:
+                    self.context_username = message.username
+                    self.context_message = message.text
+                self.context_menu.post(event.x_root, event.y_root)
+                return
+                
             index = self.chat_box.index(f"@{event.x},{event.y}")
             line_start = index.split(".")[0] + ".0"
             line_end = index.split(".")[0] + ".end"
@@ -509,7 +793,7 @@ class TwitchChatUI:
             color = simpledialog.askstring("Highlight User", 
                                          f"Enter color for {self.context_username}:\n(Hex code or color name)")
             if color:
-                twitch_data.highlighted_users[self.context_username] = color
+                twitch_data.highlight_user(self.context_username, color)
                 
     def _mock_reply(self):
         if hasattr(self, 'context_message'):
@@ -539,61 +823,23 @@ class TwitchChatUI:
             return
             
         self.input_entry.delete(0, tk.END)
-        badges = ["moderator"]
-        self.msg_queue.put((config.get("STREAMER_NAME"), "#00FF00", text, badges))
-        self.recent_chat.append(f"[{config.get('STREAMER_NAME')}]: {text}")
-        
-        # Store streamer message for immediate response
-        self.last_streamer_message = text
-        self.last_streamer_message_time = time.time()
-        
-        # Trigger immediate response based on probability
-        if random.random() < config.get("RESPOND_TO_STREAMER_CHANCE"):
-            self._trigger_immediate_response(text)
-
-    def _trigger_immediate_response(self, streamer_message):
-        """Trigger immediate response to streamer message"""
-        threading.Thread(target=self._generate_immediate_response, 
-                        args=(streamer_message,), daemon=True).start()
-
-    def _generate_immediate_response(self, streamer_message):
-        """Generate immediate response to streamer message"""
-        try:
-            # Get a random chatter
-            username, color, base_name, badges = self._get_chatter_id()
-            
-            system_instructions = (
-                f"You are a Twitch chatter responding immediately to the streamer {config.get('STREAMER_NAME')}. "
-                f"Generate exactly ONE short, quick response to: '{streamer_message}'\n"
-                "Keep it brief (1-2 sentences max) and relevant to what the streamer just said."
-            )
-            
-            user_text = f"Streamer {config.get('STREAMER_NAME')} just said: '{streamer_message}'. Give a quick response:"
-            
-            content = llm_pool._call_llm(system_instructions, user_text, self.last_screenshot_data or "")
-            
-            if content and len(content.strip()) > 5:
-                text = clean_chat_line(content.strip())
-                self.msg_queue.put((username, color, text, badges))
-                self.recent_chat.append(f"[{username}]: {text}")
-                
-        except Exception as e:
-            print(f"Immediate response error: {e}")
+        self.engine.send_streamer_message(text)
 
     def _trigger_modjv_intervention(self):
         """Trigger manual moderator intervention"""
-        self.modjv_override_requested = True
+        self.engine.request_mod_intervention()
         self.modjv_button.config(text="FORCING...", state=tk.DISABLED)
         self.root.after(5000, lambda: self.modjv_button.config(text="ModJV", state=tk.NORMAL))
 
     def _show_follower_stats(self):
         """Show current follower statistics"""
-        stats = f"Followers: {twitch_data.follower_count}/{twitch_data.follower_goal}\n"
-        stats += f"Subscribers: {len(twitch_data.subscribers)}\n"
-        stats += f"Hype Train: Level {twitch_data.hype_train_level}\n"
-        stats += f"Viewers: {twitch_data.viewer_count}\n"
-        stats += f"Peak Viewers: {twitch_data.peak_viewers}\n"
-        stats += f"Total Views: {twitch_data.total_views}"
+        channel = twitch_data.snapshot()
+        stats = f"Followers: {channel.follower_count}/{channel.follower_goal}\n"
+        stats += f"Subscribers: {channel.subscriber_count}\n"
+        stats += f"Hype Train: Level {channel.hype_train_level}\n"
+        stats += f"Viewers: {channel.viewer_count}\n"
+        stats += f"Peak Viewers: {channel.peak_viewers}\n"
+        stats += f"Total Views: {channel.total_views}"
         messagebox.showinfo("Stream Stats", stats)
 
     def _simulate_event(self):
@@ -607,144 +853,21 @@ class TwitchChatUI:
         choice_text = "Choose event:\n" + "\n".join(event_options)
         choice = simpledialog.askstring("Simulate Event", choice_text)
         
-        if choice == "1":
-            self._trigger_follower_event()
-        elif choice == "2":
-            self._trigger_subscriber_event()
-        elif choice == "3":
-            self._trigger_hype_train_event()
-        elif choice == "4":
-            self._trigger_donation_event()
-        elif choice == "5":
-            self._trigger_raid_event()
-        elif choice == "6":
-            self._trigger_host_event()
-        elif choice == "7":
-            self._trigger_bits_event()
-        elif choice == "8":
-            self._trigger_sub_streak_event()
-        elif choice == "9":
-            self._trigger_follower_goal_event()
-        elif choice == "10":
-            self._trigger_giveaway_event()
-        elif choice == "11":
-            self._trigger_milestone_event()
-
-    def _trigger_follower_event(self):
-        """Trigger new follower event"""
-        twitch_data.follower_count += 1
-        username = random.choice(USERNAME_POOL)
-        message = random.choice(EVENT_MESSAGES["follower"]).format(username=username)
-        self.msg_queue.put(("System", "#9147FF", message, []))
-
-    def _trigger_subscriber_event(self):
-        """Trigger new subscriber event"""
-        username = random.choice(USERNAME_POOL)
-        months = random.randint(1, 24)
-        twitch_data.subscribers[username] = months
-        message = random.choice(EVENT_MESSAGES["subscriber"]).format(username=username, months=months)
-        self.msg_queue.put(("System", "#FFD700", message, []))
-        # Assign subscriber badge
-        twitch_data.user_badges[username].append("subscriber")
-
-    def _trigger_hype_train_event(self):
-        """Trigger hype train event"""
-        twitch_data.hype_train_level = min(5, twitch_data.hype_train_level + 1)
-        message = random.choice(EVENT_MESSAGES["hype_train"]).format(level=twitch_data.hype_train_level)
-        self.msg_queue.put(("System", "#FF6B35", message, []))
-
-    def _trigger_donation_event(self):
-        """Trigger donation event"""
-        donor, amount, message, theme = random.choice(DONATION_MESSAGES)
-        self.root.after(0, lambda: DonationPopup(self.root, donor, amount, message, theme))
-        self._make_chat_react_to_donation(donor, amount, message)
-
-    def _trigger_raid_event(self):
-        """Trigger raid event"""
-        streamer = random.choice(USERNAME_POOL)
-        viewers = random.randint(10, 100)
-        message = random.choice(EVENT_MESSAGES["raid"]).format(streamer=streamer, viewers=viewers)
-        self.msg_queue.put(("System", "#FF69B4", message, []))
-        # Add raid viewers to current count
-        twitch_data.viewer_count += viewers
+        if choice and choice.isdigit() and 1 <= int(choice) <= len(ChatEngine.EVENT_NAMES):
+            # Events only queue their lines on the display timeline, so this returns at once
+            self.engine.trigger_event(ChatEngine.EVENT_NAMES[int(choice) - 1])
 
-    def _trigger_host_event(self):
-        """Trigger host event"""
-        streamer = random.choice(USERNAME_POOL)
-        viewers = random.randint(5, 50)
-        message = random.choice(EVENT_MESSAGES["host"]).format(streamer=streamer, viewers=viewers)
-        self.msg_queue.put(("System", "#00CED1", message, []))
-        # Add host viewers to current count
-        twitch_data.viewer_count += viewers
-
-    def _trigger_bits_event(self):
-        """Trigger bits event"""
-        username = random.choice(USERNAME_POOL)
-        amount = random.randint(100, 5000)
-        message = random.choice(EVENT_MESSAGES["bits"]).format(username=username, amount=amount)
-        self.msg_queue.put(("System", "#9147FF", message, []))
-
-    def _trigger_sub_streak_event(self):
-        """Trigger sub streak event"""
-        if twitch_data.subscribers:
-            subscriber = random.choice(list(twitch_data.subscribers.keys()))
-            streak = twitch_data.subscribers[subscriber]
-            if streak > 1:
-                message = random.choice(EVENT_MESSAGES["sub_streak"]).format(username=subscriber, streak=streak)
-                self.msg_queue.put(("System", "#FFD700", message, []))
-
-    def _trigger_follower_goal_event(self):
-        """Trigger follower goal event"""
-        remaining = twitch_data.follower_goal - twitch_data.follower_count
-        if remaining > 0:
-            message = random.choice(EVENT_MESSAGES["follower_goal"]).format(
-                count=remaining, goal=twitch_data.follower_goal, current=twitch_data.follower_count
-            )
-            self.msg_queue.put(("System", "#9147FF", message, []))
-
-    def _trigger_giveaway_event(self):
-        """Trigger giveaway event"""
-        message = random.choice(EVENT_MESSAGES["giveaway"])
-        self.msg_queue.put(("System", "#FFD700", message, []))
-
-    def _trigger_milestone_event(self):
-        """Trigger milestone event"""
-        milestones = [
-            "Reached 1000 total views!",
-            "500 followers achieved!",
-            "24 hour stream completed!",
-            "100 subscribers milestone!",
-            "Top 100 in category!",
-        ]
-        description = random.choice(milestones)
-        message = random.choice(EVENT_MESSAGES["milestone"]).format(description=description)
-        self.msg_queue.put(("System", "#32CD32", message, []))
-
-    def _make_chat_react_to_donation(self, donor, amount, message):
-        """Make chat react to donation"""
-        reactions = [
-            f"POG {amount}!",
-            f"LETS GO {donor}!",
-            f"WOW {amount}!",
-            f"POGCHAMP {donor}!",
-            f"THANK YOU {donor}!",
-            f"{amount} POGGERS",
-            f"BIG DONO {donor}!",
-            f"HOLY {amount}!",
-        ]
-        
-        # Add multiple reactions from different users
-        for _ in range(random.randint(2, 5)):
-            username, color, base_name, badges = self._get_chatter_id()
-            reaction = random.choice(reactions)
-            self.msg_queue.put((username, color, reaction, badges))
-            self.recent_chat.append(f"[{username}]: {reaction}")
-            time.sleep(0.2)
+    def _on_screenshot(self, img):
+        """Engine hook called from the generation thread with each new screenshot"""
+        if config.get("DEBUG_SCREENSHOT") and hasattr(self, 'debug_label'):
+            self.root.after(0, lambda i=img: self._update_debug_display(i))
 
+    @profiler.timed("debug_preview")
     def _update_debug_display(self, img):
         """Update screenshot preview in debug mode"""
         if img and hasattr(self, 'debug_label'):
             try:
+                from PIL import Image, ImageTk
                 display_img = img.copy()
                 display_img.thumbnail((400, 300), Image.Resampling.LANCZOS)
                 self.photo = ImageTk.PhotoImage(display_img)
@@ -752,534 +875,36 @@ class TwitchChatUI:
             except Exception as e:
                 print(f"Debug display error: {e}")
     
-    def _simulate_twitch_events(self):
-        """Simulate Twitch events with configurable probabilities"""
-        # New Follower
-        if random.random() < config.get("EVENT_FOLLOWER_CHANCE"):
-            self._trigger_follower_event()
-                
-        # New Subscriber
-        if random.random() < config.get("EVENT_SUBSCRIBER_CHANCE"):
-            self._trigger_subscriber_event()
-                
-        # Hype Train
-        if config.get("HYPE_TRAIN_ENABLED") and random.random() < config.get("EVENT_HYPE_TRAIN_CHANCE"):
-            self._trigger_hype_train_event()
-                    
-        # Follower Goal
-        if config.get("FOLLOWER_GOAL_ENABLED") and twitch_data.follower_count < twitch_data.follower_goal:
-            if random.random() < config.get("EVENT_FOLLOWER_GOAL_CHANCE"):
-                self._trigger_follower_goal_event()
-                    
-        # Raid Event
-        if random.random() < config.get("EVENT_RAID_CHANCE"):
-            self._trigger_raid_event()
-            
-        # Host Event
-        if random.random() < config.get("EVENT_HOST_CHANCE"):
-            self._trigger_host_event()
-            
-        # Bits Event
-        if random.random() < config.get("EVENT_BITS_CHANCE"):
-            self._trigger_bits_event()
-            
-        # Sub Streak
-        if config.get("SUB_STREAKS_ENABLED") and random.random() < config.get("EVENT_SUB_STREAK_CHANCE"):
-            self._trigger_sub_streak_event()
-            
-        # Giveaway
-        if random.random() < config.get("EVENT_GIVEAWAY_CHANCE"):
-            self._trigger_giveaway_event()
-            
-        # Milestone
-        if random.random() < config.get("EVENT_MILESTONE_CHANCE"):
-            self._trigger_milestone_event()
-
-    def _get_chatter_id(self):
-        """Get or create a consistent chatter ID with badges"""
-        now = time.time()
-        self.banned_users = {name: expiry for name, expiry in self.banned_users.items() if expiry > now}
-
-        available_pool = [name for name in USERNAME_POOL if name not in self.banned_users]
-        if not available_pool:
-            return "Viewer", random.choice(USERNAME_COLORS), "Viewer", []
-
-        # Check if we should reuse an existing user
-        if self.chatter_map and random.random() < 0.6:  # 60% chance to reuse existing user
-            available_users = [name for name in self.chatter_map.keys() if name in available_pool]
-            if available_users:
-                base_name = random.choice(available_users)
-                full_id, color = self.chatter_map[base_name]
-                # Get badges from stored user data
-                badges = twitch_data.user_badges.get(full_id, [])
-                return full_id, color, base_name, badges
-
-        # Create new user
-        base_name = random.choice(available_pool)
-        unique_num = random.randint(100, 999)
-        full_id = base_name + str(unique_num)
-        color = random.choice(USERNAME_COLORS)
-        
-        # Store user data
-        self.chatter_map[base_name] = (full_id, color)
-        
-        # Assign badges based on probability (consistent for this user)
-        badges = []
-        if random.random() < 0.3:  # 30% chance of being a sub
-            badges.append("subscriber")
-            if base_name not in twitch_data.subscribers:
-                twitch_data.subscribers[base_name] = 1
-                
-        if random.random() < 0.1:  # 10% chance of VIP
-            badges.append("vip")
-            
-        if random.random() < 0.05:  # 5% chance of founder
-            badges.append("founder")
-            
-        # Store badges for this user
-        twitch_data.user_badges[full_id] = badges
-        
-        # Update reputation
-        twitch_data.user_reputation[base_name]["messages"] += 1
-        
-        return full_id, color, base_name, badges
-
-    def _get_personality_weights(self):
-        """Get current personality weights from settings"""
-        return {
-            "hype": config.get("PERSONALITY_HYPE"),
-            "troll": config.get("PERSONALITY_TROLL"),
-            "gamer": config.get("PERSONALITY_GAMER"),
-            "question": config.get("PERSONALITY_QUESTION"),
-            "lol": config.get("PERSONALITY_LOL"),
-            "advice": config.get("PERSONALITY_ADVICE"),
-            "wholesome": config.get("PERSONALITY_WHOLESOME"),
-            "toxic": config.get("PERSONALITY_TOXIC"),
-            "speedrunner": config.get("PERSONALITY_SPEEDRUNNER"),
-            "lore_scholar": config.get("PERSONALITY_LORE_SCHOLAR"),
-            "clip_goblin": config.get("PERSONALITY_CLIP_GOBLIN"),
-            "backseat_gamer": config.get("PERSONALITY_BACKSEAT_GAMER"),
-            "copium_addict": config.get("PERSONALITY_COPIUM_ADDICT"),
-            "emote_spammer": config.get("PERSONALITY_EMOTE_SPAMMER"),
-        }
-
-    def _get_language_distribution(self):
-        """Get normalized language distribution based on enabled languages and weights"""
-        languages = config.get("LANGUAGES", {})
-        enabled_languages = {lang: data for lang, data in languages.items() if data.get("enabled", False)}
-        
-        if not enabled_languages:
-            # Default to English if no languages are enabled
-            return {"english": 1.0}
-        
-        # Calculate total weight
-        total_weight = sum(data.get("weight", 0.0) for data in enabled_languages.values())
-        
-        if total_weight == 0:
-            # If all weights are zero, distribute equally
-            weight_per_lang = 1.0 / len(enabled_languages)
-            return {lang: weight_per_lang for lang in enabled_languages.keys()}
-        
-        # Normalize weights
-        return {lang: data.get("weight", 0.0) / total_weight for lang, data in enabled_languages.items()}
-
-    def _get_language_instructions(self):
-        """Generate language instructions for the LLM based on current distribution"""
-        distribution = self._get_language_distribution()
-        
-        if len(distribution) == 1:
-            lang = list(distribution.keys())[0]
-            if lang == "english":
-                return "Generate all messages in English only."
-            elif lang == "tagalog":
-                return "Generate all messages in Tagalog (Filipino) only."
-            elif lang == "bisaya":
-                return "Generate all messages in Bisaya (Cebuano/Visayan) only."
-            elif lang == "Zambal":
-                return "Generate all messages in Zambal only."
-            elif lang == "japanese":
-                return "Generate all messages in Japanese only."
-        
-        # Multiple languages - create distribution instructions
-        instructions = ["Generate messages in the following language distribution:"]
-        for lang, weight in distribution.items():
-            percentage = weight * 100
-            if lang == "english":
-                instructions.append(f"- English: {percentage:.1f}%")
-            elif lang == "tagalog":
-                instructions.append(f"- Tagalog: {percentage:.1f}%")
-            elif lang == "bisaya":
-                instructions.append(f"- Bisaya: {percentage:.1f}%")
-            elif lang == "Zambal":
-                instructions.append(f"- Zambal: {percentage:.1f}%")
-            elif lang == "japanese":
-                instructions.append(f"- Japanese: {percentage:.1f}%")
-        
-        instructions.append("Mix languages naturally within the chat. Code-switching (mixing languages in one message) is allowed and encouraged for authentic chat experience.")
-        
-        return " ".join(instructions)
-
-    def _get_slang_instructions(self):
-        """Generate slang and style instructions based on current settings"""
-        instructions = []
-        
-        # Slang settings
-        if config.get("SLANG_ENABLED"):
-            intensity = config.get("SLANG_INTENSITY", 1)
-        if intensity > 0.7:
-            instructions.append(
-            "Use heavy slang, chaotic casual language, and loose phrasing like Twitch chat. "
-            "Sometimes drop proper punctuation entirely — no commas, no periods, more natural chat marks — just raw flow."
-        )
-        elif intensity > 0.4:
-            instructions.append(
-            "Use moderate slang and casual expressions. Occasionally skip punctuation or end sentences abruptly for a natural chat vibe."
-        )
-        elif intensity > 0.1:
-            instructions.append(
-            "Use light slang occasionally. Maybe drop punctuation once in a while but keep most sentences readable."
-        )
-
-        
-        # Formality level
-        formality = config.get("FORMALITY_LEVEL", 0.3)
-
-        if formality > 0.7:
-            instructions.append(
-            "Use highly formal language — rich, elaborate words, old-timey or Shakespearean-style English, "
-            "like 1500s British speech. Make it sound grand, theatrical, or humorously archaic."
-        )
-        elif formality > 0.4:
-                instructions.append(
-            "Use neutral, standard language — clear, readable, and appropriate for general chat."
-        )
-        else:
-            instructions.append(
-            "Use very casual and informal language — slang, shortcuts, chat-style expressions, and relaxed grammar."
-        )
-
-        
-        # Internet speak
-        internet_speak = config.get("INTERNET_SPEAK", 0.6)
-
-        if internet_speak > 0.7:
-            instructions.append(
-            "Heavily pepper messages with internet slang and abbreviations like 'lol', 'omg', 'brb', 'wtf', "
-            "and other common chat shortcuts. Messages should feel very casual and fast-moving, like real online chatter."
-        )
-        elif internet_speak > 0.4:
-            instructions.append(
-            "Use internet slang moderately — sprinkle abbreviations and casual chat expressions naturally, "
-            "but keep messages mostly readable."
-        )
-        else:
-            instructions.append(
-            "Use minimal or no internet slang — messages should be mostly standard text, though small casual words or emojis are fine occasionally."
-        )
-
-        
-        # Emote frequency
-        emote_freq = config.get("EMOTE_FREQUENCY", 0.7)
-
-        if emote_freq > 0.8:
-            instructions.append(
-            "Use emotes very frequently — almost every message should include at least one emote, just like a hype Twitch chat."
-        )
-        elif emote_freq > 0.5:
-            instructions.append(
-            "Use emotes regularly — include them naturally throughout the messages, giving the chat energy without overdoing it."
-        )
-        elif emote_freq > 0.2:
-            instructions.append(
-            "Use emotes occasionally — sprinkle them sparingly to add flavor, not overwhelm the text."
-        )
-        else:
-            instructions.append(
-            "Rarely or never use emotes — messages should be mostly text-based, with very few or no emotes."
-        )
-
-        
-        # Regional dialects
-        if config.get("REGIONAL_DIALECTS"):
-            instructions.append("Use regional variations and local expressions where appropriate.")
-        
-        return " ".join(instructions) if instructions else "Use standard internet chat language."
-
-    def _analyze_hype(self, lines):
-        """Analyze hype level in messages to adjust chat speed"""
-        hype_score = 0
-        chill_score = 0
-        
-        full_text = " ".join(lines).upper()
-        
-        # All caps messages are hype
-        if full_text == full_text.upper() and len(full_text) > 10:
-            hype_score += 2
-            
-        # Count hype words and emotes
-        for word in HYPE_WORDS + list(self.emote_list):
-            hype_score += full_text.count(word)
-        
-        # Count chill words
-        for word in CHILL_WORDS:
-            chill_score += full_text.count(word)
-
-        # Return normalized score
-        return (hype_score - chill_score) / (len(lines) * 2 or 1)
-
     def start_simulation(self):
         """Start the chat simulation"""
-        if not self.running:
-            self.running = True
+        if not self.engine.running:
+            self.engine.start()
             self.stream_stats.set_live_status(True)
-            threading.Thread(target=self._loop, daemon=True).start()
-            threading.Thread(target=self._event_loop, daemon=True).start()
             print("Chat simulation STARTED")
 
     def stop_simulation(self):
         """Stop the chat simulation"""
-        self.running = False
+        self.engine.stop()
         self.stream_stats.set_live_status(False)
         print("Chat simulation STOPPED")
 
     def restart_simulation(self):
         """Restart the chat simulation"""
+        # stop() cancels the old loop and joins it, so there is nothing to wait for
         self.stop_simulation()
-        time.sleep(1)
         self.start_simulation()
         print("Chat simulation RESTARTED")
 
-    def _event_loop(self):
-        """Event simulation loop"""
-        while self.running:
-            self._simulate_twitch_events()
-            time.sleep(10)  # Check for events every 10 seconds
-
-    def _loop(self):
-        """Main chat generation loop"""
-        last_line_time = time.time() - config.get("LLM_REQUEST_INTERVAL")
-        
-        while self.running:
-            try:
-                # Enforce cooldown between batches
-                time_since_last_line = time.time() - last_line_time
-                pause_needed = config.get("LLM_REQUEST_INTERVAL") - time_since_last_line
-                if pause_needed > 0:
-                    time.sleep(pause_needed)
-
-                now = time.time()
-                
-                # Update screenshot if needed
-                if (now - self.last_screenshot_time > config.get("SCREENSHOT_COOLDOWN")) or self.last_screenshot_data is None:
-                    data_url, img_obj = get_screen_data_url()
-                    self.last_screenshot_data = data_url
-                    self.last_screenshot_time = now
-                    if config.get("DEBUG_SCREENSHOT") and hasattr(self, 'debug_label'):
-                        self.root.after(0, lambda i=img_obj: self._update_debug_display(i))
-                
-                # Check for mod intervention
-                trigger_modjv = self.modjv_override_requested or random.random() < config.get("MODJV_CHAT_CHANCE")
-                
-                if trigger_modjv:
-                    self.modjv_override_requested = False
-                    
-                    lines, request_time = self._llm_generate_mod_intervention(self.last_screenshot_data, list(self.recent_chat))
-                    username = config.get("MODJV_USERNAME")
-                    color = "#FFD700"
-                    badges = ["moderator"]
-                    
-                    if lines:
-                        raw_line = lines[0]
-                        ban_match = re.search(r'\[ACTION:BAN\s+(\w+)\]\s*(.*)', raw_line, re.IGNORECASE)
-                        
-                        if ban_match:
-                            base_name_to_ban = ban_match.group(1).strip()
-                            mod_comment = ban_match.group(2).strip()
-                            full_user_id_to_ban = self.chatter_map.get(base_name_to_ban, (base_name_to_ban, None))[0]
-                            
-                            self.msg_queue.put({
-                                'type': 'ban', 
-                                'username': full_user_id_to_ban, 
-                                'reason': 'toxicity'
-                            })
-                            
-                            text = mod_comment or f"Keep the chat clean, {full_user_id_to_ban} is out for a bit."
-                        else:
-                            text = clean_chat_line(raw_line)
-                            
-                        if len(text) > 2:
-                            self.recent_chat.append(f"[{username}]: {text}")
-                            self.msg_queue.put((username, color, text, badges))
-                    
-                    time.sleep(config.get("MIN_DRIP_SPEED"))
-                    last_line_time = time.time()
-                    
-                else:
-                    # Check for donation popup
-                    if random.random() < config.get("DONATION_CHANCE"):
-                        donor, amount, message, theme = random.choice(DONATION_MESSAGES)
-                        self.root.after(0, lambda d=donor, a=amount, m=message, t=theme: DonationPopup(self.root, d, a, m, t))
-                        # Make chat react to donation
-                        self._make_chat_react_to_donation(donor, amount, message)
-
-                    # Generate normal chat batch
-                    lines, request_time = self._llm_generate_batch(self.last_screenshot_data, list(self.recent_chat), count=config.get("BATCH_SIZE"))
-                    
-                    # Calculate dynamic drip speed based on hype
-                    hype_score = self._analyze_hype(lines)
-                    normalized_score = (hype_score + 1) / 2
-                    drip_range = config.get("MAX_DRIP_SPEED") - config.get("MIN_DRIP_SPEED")
-                    drip_speed = config.get("MIN_DRIP_SPEED") + drip_range * (1 - normalized_score)
-                    drip_speed = max(config.get("MIN_DRIP_SPEED"), min(drip_speed, config.get("MAX_DRIP_SPEED")))
-                    
-                    # Default speed for single messages
-                    if len(lines) <= 1:
-                        drip_speed = (config.get("MIN_DRIP_SPEED") + config.get("MAX_DRIP_SPEED")) / 2
-
-                    # Drip feed messages with calculated speed
-                    for i, line in enumerate(lines):
-                        if not self.running: 
-                            break
-                        
-                        raw_text = line.replace('"', '').strip()
-                        text = clean_chat_line(raw_text)
-
-                        if len(text) < 2: 
-                            continue
-                        
-                        # Get chatter ID with badges
-                        username, color, base_name, badges = self._get_chatter_id()
-                        
-                        # Add to context and queue
-                        self.recent_chat.append(f"[{username}]: {text}")
-                        self.msg_queue.put((username, color, text, badges))
-                        
-                        # Pause between messages except the last one
-                        if i < len(lines) - 1:
-                            time.sleep(drip_speed)
-                        else:
-                            # Update timing after last message
-                            last_line_time = time.time()
-                    
-            except Exception as e:
-                print(f"Error in LLM loop: {e}")
-                time.sleep(1)  # Brief pause on error
-
-    def _llm_generate_batch(self, screen_data_url, recent_chat, count=None):
-        """Generate a batch of chat messages using LLM"""
-        if count is None:
-            count = config.get("BATCH_SIZE")
-            
-        start_time = time.time()
-        
-        # Select personalities based on current weights
-        personality_weights = self._get_personality_weights()
-        personalities = []
-        for personality, weight in personality_weights.items():
-            if random.random() < weight / 2.0:  # Normalize probability
-                personalities.append(personality)
-        
-        # Ensure we have at least 2 personalities
-        if len(personalities) < 2:
-            personalities = list(personality_weights.keys())[:2]
-        else:
-            personalities = random.sample(personalities, min(3, len(personalities)))
-        
-        # Get language instructions
-        language_instructions = self._get_language_instructions()
-        
-        reply_target_instruction = ""
-        if recent_chat and random.random() < config.get("CHATTER_REPLY_CHANCE"):
-            target_message = random.choice(list(recent_chat))
-            reply_target_instruction = (
-                f"IMPORTANT: At least one of the {count} messages must reply to this message: "
-                f"'{target_message}'. Make it sound like a real viewer actually responding — quick, casual, and acknowledging what they said."
-)
-
-
-        system_instructions = (
-    f"You are a fast-paced Twitch Chat simulator watching {config.get('STREAMER_NAME')}'s livestream. You MUST analyze and react to the visual state of the SCREENSHOT.\n"
-    f"Generate exactly {count} unique chat messages with no repeats.\n"
-    f"{language_instructions}\n"
-    "RULES:\n"
-    "1. Output raw text only — no quotes, no markdown, no numbering.\n"
-    "2. CRITICAL: Chat reactions MUST acknowledge what's happening on-screen and respond naturally to the RECENT_CHAT_CONTEXT.\n"
-    "3. Make the messages feel like they're from different viewers — varied, spontaneous, and not similar.\n"
-    "4. Keep the pace fast and chaotic. Short, punchy, realistic Twitch-style messages.\n"
-    f"5. Blend these personalities in the chat: " + " AND ".join([CHAT_PERSONALITIES[p] for p in personalities]) +
-    "\n6. Emotes: ONLY use text-based emotes like LUL KEKW PogChamp Kappa FeelsBadMan PepeHands MonkaS 4Head WutFace POG OMEGALUL PogU Sadge Okayge HYPERCLAP and other keyword emotes from the available list. Do NOT use Unicode emojis (😆 😂 🔥 💀 👀 ✨ etc.) or any graphical/symbolic characters. The chat client recognizes and styles matching text keywords automatically."
-)
-
-
-        user_text = (
-    f"RECENT_CHAT_CONTEXT (what viewers are currently saying and reacting to in real time):\n"
-    f"{recent_chat[-8:] if recent_chat else 'None'}\n\n"
-    f"{reply_target_instruction}\n"
-    "Your job is to generate new chat messages that feel naturally woven into an active Twitch stream. "
-    "These messages should pick up the momentum, jokes, reactions, and tone seen in the ongoing chat above. "
-    "Chatters should feel like they're responding not only to the streamer but also to each other, "
-    "continuing threads, jumping on small moments, and building hype or confusion depending on what the screenshot shows.\n\n"
-    f"Generate {count} new messages. Each message MUST:\n"
-    "• React directly to the visual SCREENSHOT (gameplay, streamer face, event, UI, etc.)\n"
-    "• Connect to the energy and tone of the RECENT_CHAT_CONTEXT\n"
-    "• Feel spontaneous, varied, and authentic to Twitch culture\n"
-    "• Be fast-paced, punchy, and chaotic — like real chat scrolling rapidly\n"
-    "• Sound like different viewers with different personalities jumping in\n\n"
-    "Do NOT repeat messages or structure. Keep it dynamic, and natural for a live chat environment."
-            )
-
-        
-        content = llm_pool._call_llm(system_instructions, user_text, screen_data_url)
-        
-        end_time = time.time()
-        request_time = end_time - start_time
-        
-        lines = [x.strip() for x in content.split('\n') if x.strip()]
-        return lines[:count], request_time
-
-    def _llm_generate_mod_intervention(self, screen_data_url, recent_chat):
-        """Generate moderator intervention using LLM"""
-        start_time = time.time()
-        target_username = random.choice(USERNAME_POOL)
-        
-        system_instructions = (
-    f"You are the chat moderator '{config.get('MODJV_USERNAME')}'. You are responsible for keeping the chat under control, reacting to viewer messages, and stepping in with warnings or conversation when needed.\n"
-    "You MUST generate exactly ONE line of output.\n"
-    "RULES:\n"
-    "1. Output raw text only — no quotes, no markdown, no numbering.\n"
-    "2. CRITICAL: You must reference a specific user or a specific topic mentioned in the RECENT_CHAT_CONTEXT. "
-    "Your message must feel like a real-time response to something someone in chat said.\n"
-    f"3. If you decide to ban or warn a user, start your message *immediately* with the action command: "
-    f"`[ACTION:BAN TARGET_USER_NAME]`. For example: `[ACTION:BAN {target_username}] That comment was unnecessary, calm down.`\n"
-    f"4. If you choose to ban someone, always use this base username: {target_username}.\n"
-    "5. If no ban is needed, reply with a natural moderator-style comment — either a gentle warning, a judgemental observation, or a stabilizing message that addresses the situation in chat.\n"
-    "6. Emotes: ONLY use text-based emotes like LUL KEKW PogChamp Kappa FeelsBadMan PepeHands MonkaS 4Head WutFace POG OMEGALUL PogU Sadge Okayge HYPERCLAP and other keyword emotes from the available list. Do NOT use Unicode emojis (😆 😂 🔥 💀 👀 ✨ etc.) or any graphical/symbolic characters.\n"
-    "Your tone should match a realistic Twitch moderator: firm when needed, casual when appropriate, but always reacting to the chat context."
-)
-
-
-        user_text = (
-    f"RECENT_CHAT_CONTEXT (latest messages from viewers):\n"
-    f"{recent_chat[-8:] if recent_chat else 'None'}\n\n"
-    "NOTE: Completely ignore the screenshot. Your response must be based ONLY on what users in the chat have been saying.\n"
-    "As the moderator, you must react directly to something specific in the chat history — either a user’s message, a topic being discussed, "
-    "or any ongoing tension, joke, or chaos happening in the context above.\n\n"
-    f"Generate {config.get('MODJV_USERNAME')}'s intervention now. Your output should be a single realistic moderator action or comment in one line."
-)
-
-        
-        content = llm_pool._call_llm(system_instructions, user_text, screen_data_url)
-        
-        end_time = time.time()
-        request_time = end_time - start_time
-        
-        lines = [x.strip() for x in content.split('\n') if x.strip()]
-        return lines[:1], request_time
-
     def _on_close(self):
         """Handle application close"""
         self.stop_simulation()
-        config.save_settings()  # Save settings when closing
+        if self.chat_log:
+            self.chat_log.close()
+        if self.channel_state:
+            self.channel_state.stop(twitch_data)
+        if self.cold_users:
+            self.cold_users.close()
+        config.flush()  # Write pending settings off the Tk thread
         self.root.after(100, self.root.destroy)
 
 # ===========================
@@ -1287,13 +912,11 @@ class TwitchChatUI:
 # ===========================
 
 if __name__ == "__main__":
-    # Check for required packages
-    try:
-        import mss
-        import requests
-        from PIL import Image
-    except ImportError as e:
-        print(f"Missing required package: {e}")
+    # Check for required packages without importing them; they load on first use
+    import importlib.util
+    missing = [name for name in ("mss", "requests", "PIL") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"Missing required package: {', '.join(missing)}")
         print("Please install required packages:")
         print("pip install mss pillow requests")
         exit(1)
@@ -1316,7 +939,7 @@ if __name__ == "__main__":
     print("60+ settings across 5 tabs")
     print(f"Settings file location: {config.get_settings_file()}")
     print("\nQuick Controls:")
-    print("Ctrl+P - Settings (with Start/Stop/Restart) | Ctrl+F - Search | Ctrl+E - Export")
+    print("Ctrl+P - Settings (with Start/Stop/Restart) | Ctrl+F - Search (F3/Shift+F3 next/prev) | Ctrl+E - Export")
     print("Follower Stats | Simulate Events")
     
     main.mainloop()
@@ -0,0 +1,132 @@
+import heapq
+import random
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from data_structures import (
+    USERNAME_POOL, USERNAME_COLORS, CHAT_PERSONALITIES, BADGE_BITS, mask_to_badges
+)
+
+# ===========================
+# SYNTHETIC VIEWER POPULATION
+# ===========================
+
+PERSONALITY_NAMES = list(CHAT_PERSONALITIES)
+
+class ViewerPopulation:
+    """Synthetic viewer population stored in compact parallel arrays.
+
+    Viewer i is described by one slot in each array; names are derived
+    from the index instead of being stored, so 100k viewers take about
+    2 MB. Chatters are drawn weighted by activity, optionally only from
+    the first `present` viewers so the current viewer count decides how
+    big the active crowd is.
+    """
+    def __init__(self, size, rng=None, name_pool=USERNAME_POOL):
+        self.size = max(1, int(size))
+        self.rng = rng or random.Random()
+        self.name_pool = list(name_pool)
+        self._pool_index = {name: i for i, name in enumerate(self.name_pool)}
+        self._suffix_width = len(str((self.size - 1) // len(self.name_pool)))
+
+        self.color_index = array('B')
+        self.badges = array('B')
+        self.personality = array('B')
+        self.activity = array('f')
+        self.reputation = array('h')
+        self._cumulative = array('d')
+
+        self.banned = {}  # index -> ban expiry time
+        self._ban_heap = []
+        self._lock = threading.Lock()
+
+        self._generate()
+
+    def _generate(self):
+        rng = self.rng
+        sub, vip, founder = BADGE_BITS["subscriber"], BADGE_BITS["vip"], BADGE_BITS["founder"]
+        total = 0.0
+        for _ in range(self.size):
+            self.color_index.append(rng.randrange(len(USERNAME_COLORS)))
+            self.personality.append(rng.randrange(len(PERSONALITY_NAMES)))
+
+            # Same badge odds as regular chatters
+            mask = 0
+            if rng.random() < 0.3:
+                mask |= sub
+            if rng.random() < 0.1:
+                mask |= vip
+            if rng.random() < 0.05:
+                mask |= founder
+            self.badges.append(mask)
+
+            # Heavy-tailed activity: most viewers lurk, a few carry the chat
+            activity = min(50.0, rng.paretovariate(1.5)) - 0.9
+            self.activity.append(activity)
+            self.reputation.append(0)
+            total += activity
+            self._cumulative.append(total)
+
+    def name(self, index):
+        """Get the display name of a viewer"""
+        base = self.name_pool[index % len(self.name_pool)]
+        return f"{base}{index // len(self.name_pool):0{self._suffix_width}d}"
+
+    def index_of(self, name):
+        """Get the viewer index for a display name, or None"""
+        width = self._suffix_width
+        base, suffix = name[:-width], name[-width:]
+        if not suffix.isdigit() or base not in self._pool_index:
+            return None
+        index = int(suffix) * len(self.name_pool) + self._pool_index[base]
+        return index if index < self.size else None
+
+    def color(self, index):
+        return USERNAME_COLORS[self.color_index[index]]
+
+    def badge_names(self, index):
+        return mask_to_badges(self.badges[index])
+
+    def personality_name(self, index):
+        return PERSONALITY_NAMES[self.personality[index]]
+
+    def sample(self, present=None, attempts=8, rng=None):
+        """Draw a non-banned viewer index weighted by activity, or None"""
+        rng = rng or self.rng
+        present = self.size if not present else max(1, min(present, self.size))
+        self.expire_bans()
+        weight_total = self._cumulative[present - 1]
+        for _ in range(attempts):
+            point = rng.random() * weight_total
+            index = min(bisect_right(self._cumulative, point, 0, present), present - 1)
+            if index not in self.banned:
+                return index
+        return None
+
+    def record_message(self, index):
+        """Bump a viewer's reputation (message count), saturating at the array limit"""
+        if self.reputation[index] < 32767:
+            self.reputation[index] += 1
+
+    def ban(self, index, until):
+        with self._lock:
+            self.banned[index] = until
+            heapq.heappush(self._ban_heap, (until, index))
+
+    def expire_bans(self, now=None):
+        if not self._ban_heap:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            while self._ban_heap and self._ban_heap[0][0] <= now:
+                expiry, index = heapq.heappop(self._ban_heap)
+                if self.banned.get(index) == expiry:
+                    del self.banned[index]
+
+    def memory_bytes(self):
+        """Approximate memory used by the attribute arrays"""
+        arrays = (self.color_index, self.badges, self.personality,
+                  self.activity, self.reputation, self._cumulative)
+        return sum(a.itemsize * len(a) for a in arrays)
@@ -0,0 +1,278 @@
+import functools
+import threading
+
+from config import config
+from data_structures import CHAT_PERSONALITIES
+
+# ===========================
+# PROMPT TEMPLATES
+# ===========================
+
+LANGUAGE_ONLY = {
+    "english": "Generate all messages in English only.",
+    "tagalog": "Generate all messages in Tagalog (Filipino) only.",
+    "bisaya": "Generate all messages in Bisaya (Cebuano/Visayan) only.",
+    "Zambal": "Generate all messages in Zambal only.",
+    "japanese": "Generate all messages in Japanese only.",
+}
+
+LANGUAGE_NAMES = {
+    "english": "English", "tagalog": "Tagalog", "bisaya": "Bisaya",
+    "Zambal": "Zambal", "japanese": "Japanese",
+}
+
+EMOTE_RULE = (
+    "Emotes: ONLY use text-based emotes like LUL KEKW PogChamp Kappa FeelsBadMan PepeHands MonkaS 4Head WutFace POG OMEGALUL PogU Sadge Okayge HYPERCLAP "
+    "and other keyword emotes from the available list. Do NOT use Unicode emojis (😆 😂 🔥 💀 👀 ✨ etc.) or any graphical/symbolic characters."
+)
+
+def _escape(text):
+    """Make a config-derived value safe to embed in a str.format template"""
+    return str(text).replace("{", "{{").replace("}", "}}")
+
+def personality_weights(cfg):
+    """Personality name -> weight from settings, in CHAT_PERSONALITIES order"""
+    return {name: getattr(cfg, "PERSONALITY_" + name.upper()) for name in CHAT_PERSONALITIES}
+
+def language_distribution(cfg):
+    """Get normalized language distribution based on enabled languages and weights"""
+    languages = cfg.LANGUAGES or {}
+    enabled_languages = {lang: data for lang, data in languages.items() if data.get("enabled", False)}
+
+    if not enabled_languages:
+        # Default to English if no languages are enabled
+        return {"english": 1.0}
+
+    total_weight = sum(data.get("weight", 0.0) for data in enabled_languages.values())
+    if total_weight == 0:
+        # If all weights are zero, distribute equally
+        weight_per_lang = 1.0 / len(enabled_languages)
+        return {lang: weight_per_lang for lang in enabled_languages}
+
+    return {lang: data.get("weight", 0.0) / total_weight for lang, data in enabled_languages.items()}
+
+def language_instructions(cfg):
+    """Generate language instructions for the LLM based on current distribution"""
+    distribution = language_distribution(cfg)
+
+    if len(distribution) == 1:
+        lang = next(iter(distribution))
+        if lang in LANGUAGE_ONLY:
+            return LANGUAGE_ONLY[lang]
+
+    # Multiple languages - create distribution instructions
+    instructions = ["Generate messages in the following language distribution:"]
+    for lang, weight in distribution.items():
+        if lang in LANGUAGE_NAMES:
+            instructions.append(f"- {LANGUAGE_NAMES[lang]}: {weight * 100:.1f}%")
+    instructions.append("Mix languages naturally within the chat. Code-switching (mixing languages in one message) is allowed and encouraged for authentic chat experience.")
+    return " ".join(instructions)
+
+def slang_instructions(cfg):
+    """Generate slang and style instructions based on current settings"""
+    instructions = []
+
+    intensity = cfg.SLANG_INTENSITY if cfg.SLANG_ENABLED else 0
+    if intensity > 0.7:
+        instructions.append(
+            "Use heavy slang, chaotic casual language, and loose phrasing like Twitch chat. "
+            "Sometimes drop proper punctuation entirely — no commas, no periods, more natural chat marks — just raw flow."
+        )
+    elif intensity > 0.4:
+        instructions.append(
+            "Use moderate slang and casual expressions. Occasionally skip punctuation or end sentences abruptly for a natural chat vibe."
+        )
+    elif intensity > 0.1:
+        instructions.append(
+            "Use light slang occasionally. Maybe drop punctuation once in a while but keep most sentences readable."
+        )
+
+    formality = cfg.FORMALITY_LEVEL
+    if formality > 0.7:
+        instructions.append(
+            "Use highly formal language — rich, elaborate words, old-timey or Shakespearean-style English, "
+            "like 1500s British speech. Make it sound grand, theatrical, or humorously archaic."
+        )
+    elif formality > 0.4:
+        instructions.append(
+            "Use neutral, standard language — clear, readable, and appropriate for general chat."
+        )
+    else:
+        instructions.append(
+            "Use very casual and informal language — slang, shortcuts, chat-style expressions, and relaxed grammar."
+        )
+
+    internet_speak = cfg.INTERNET_SPEAK
+    if internet_speak > 0.7:
+        instructions.append(
+            "Heavily pepper messages with internet slang and abbreviations like 'lol', 'omg', 'brb', 'wtf', "
+            "and other common chat shortcuts. Messages should feel very casual and fast-moving, like real online chatter."
+        )
+    elif internet_speak > 0.4:
+        instructions.append(
+            "Use internet slang moderately — sprinkle abbreviations and casual chat expressions naturally, "
+            "but keep messages mostly readable."
+        )
+    else:
+        instructions.append(
+            "Use minimal or no internet slang — messages should be mostly standard text, though small casual words or emojis are fine occasionally."
+        )
+
+    emote_freq = cfg.EMOTE_FREQUENCY
+    if emote_freq > 0.8:
+        instructions.append(
+            "Use emotes very frequently — almost every message should include at least one emote, just like a hype Twitch chat."
+        )
+    elif emote_freq > 0.5:
+        instructions.append(
+            "Use emotes regularly — include them naturally throughout the messages, giving the chat energy without overdoing it."
+        )
+    elif emote_freq > 0.2:
+        instructions.append(
+            "Use emotes occasionally — sprinkle them sparingly to add flavor, not overwhelm the text."
+        )
+    else:
+        instructions.append(
+            "Rarely or never use emotes — messages should be mostly text-based, with very few or no emotes."
+        )
+
+    if cfg.REGIONAL_DIALECTS:
+        instructions.append("Use regional variations and local expressions where appropriate.")
+
+    return " ".join(instructions) if instructions else "Use standard internet chat language."
+
+# Settings baked into compiled prompts; other changes (BATCH_SIZE, window size, ...) keep them
+PROMPT_KEYS = (
+    "STREAMER_NAME", "MODJV_USERNAME", "LANGUAGES", "SLANG_ENABLED", "SLANG_INTENSITY",
+    "FORMALITY_LEVEL", "INTERNET_SPEAK", "EMOTE_FREQUENCY", "REGIONAL_DIALECTS",
+) + tuple("PERSONALITY_" + name.upper() for name in CHAT_PERSONALITIES)
+
+def prompt_key(cfg):
+    """Values of PROMPT_KEYS in a snapshot, compared to decide whether to recompile"""
+    return tuple(getattr(cfg, key) for key in PROMPT_KEYS)
+
+@functools.lru_cache(maxsize=512)
+def personality_blend(personalities):
+    """Joined descriptions for a tuple of personality names"""
+    return " AND ".join(CHAT_PERSONALITIES[p] for p in personalities)
+
+class PromptTemplates:
+    """Prompt text compiled once per change to the settings that shape it.
+
+    Everything derived from settings is baked in at compile time; the
+    format() calls only fill in the per-batch parts (count, sampled
+    personalities, recent chat, reply target, ban target). Those come
+    last in every prompt, so consecutive requests share a fixed prefix.
+    """
+    def __init__(self, cfg):
+        self.key = prompt_key(cfg)
+        self.personality_weights = personality_weights(cfg)
+        self.personality_names = list(self.personality_weights)
+        self.language_instructions = language_instructions(cfg)
+        self.slang_instructions = slang_instructions(cfg)
+
+        streamer = _escape(cfg.STREAMER_NAME)
+        moderator = _escape(cfg.MODJV_USERNAME)
+        languages = _escape(self.language_instructions)
+        slang = _escape(self.slang_instructions)
+
+        self.batch_system = (
+            f"You are a fast-paced Twitch Chat simulator watching {streamer}'s livestream. You MUST analyze and react to the visual state of the SCREENSHOT.\n"
+            f"{languages}\n"
+            f"STYLE: {slang}\n"
+            "RULES:\n"
+            "1. Output raw text only — no quotes, no markdown, no numbering.\n"
+            "2. CRITICAL: Chat reactions MUST acknowledge what's happening on-screen and respond naturally to the RECENT_CHAT_CONTEXT.\n"
+            "3. Make the messages feel like they're from different viewers — varied, spontaneous, and not similar.\n"
+            "4. Keep the pace fast and chaotic. Short, punchy, realistic Twitch-style messages.\n"
+            f"5. {EMOTE_RULE} The chat client recognizes and styles matching text keywords automatically.\n"
+            "6. Blend these personalities in the chat: {personalities}\n"
+            "Generate exactly {count} unique chat messages with no repeats."
+        )
+        self.reply_target = (
+            "IMPORTANT: At least one of the {count} messages must reply to this message: "
+            "'{target}'. Make it sound like a real viewer actually responding — quick, casual, and acknowledging what they said."
+        )
+        self.batch_user = (
+            "Your job is to generate new chat messages that feel naturally woven into an active Twitch stream. "
+            "These messages should pick up the momentum, jokes, reactions, and tone seen in the ongoing chat below. "
+            "Chatters should feel like they're responding not only to the streamer but also to each other, "
+            "continuing threads, jumping on small moments, and building hype or confusion depending on what the screenshot shows.\n\n"
+            "Each new message MUST:\n"
+            "• React directly to the visual SCREENSHOT (gameplay, streamer face, event, UI, etc.)\n"
+            "• Connect to the energy and tone of the RECENT_CHAT_CONTEXT\n"
+            "• Feel spontaneous, varied, and authentic to Twitch culture\n"
+            "• Be fast-paced, punchy, and chaotic — like real chat scrolling rapidly\n"
+            "• Sound like different viewers with different personalities jumping in\n\n"
+            "Do NOT repeat messages or structure. Keep it dynamic, and natural for a live chat environment.\n\n"
+            "RECENT_CHAT_CONTEXT (what viewers are currently saying and reacting to in real time):\n"
+            "{recent_chat}\n\n"
+            "{reply_target}\n"
+            "Generate {count} new messages."
+        )
+        self.mod_system = (
+            f"You are the chat moderator '{moderator}'. You are responsible for keeping the chat under control, reacting to viewer messages, and stepping in with warnings or conversation when needed.\n"
+            "You MUST generate exactly ONE line of output.\n"
+            "RULES:\n"
+            "1. Output raw text only — no quotes, no markdown, no numbering.\n"
+            "2. CRITICAL: You must reference a specific user or a specific topic mentioned in the RECENT_CHAT_CONTEXT. "
+            "Your message must feel like a real-time response to something someone in chat said.\n"
+            "3. If you decide to ban or warn a user, start your message *immediately* with the action command: "
+            "`[ACTION:BAN TARGET_USER_NAME]`.\n"
+            "4. If no ban is needed, reply with a natural moderator-style comment — either a gentle warning, a judgemental observation, or a stabilizing message that addresses the situation in chat.\n"
+            f"5. {EMOTE_RULE}\n"
+            "Your tone should match a realistic Twitch moderator: firm when needed, casual when appropriate, but always reacting to the chat context.\n"
+            "If you choose to ban someone, always use this base username: {target}. "
+            "For example: `[ACTION:BAN {target}] That comment was unnecessary, calm down.`"
+        )
+        self.mod_user = (
+            "NOTE: Completely ignore the screenshot. Your response must be based ONLY on what users in the chat have been saying.\n"
+            "As the moderator, you must react directly to something specific in the chat history — either a user’s message, a topic being discussed, "
+            "or any ongoing tension, joke, or chaos happening in the context below.\n\n"
+            f"Generate {moderator}'s intervention now. Your output should be a single realistic moderator action or comment in one line.\n\n"
+            "RECENT_CHAT_CONTEXT (latest messages from viewers):\n"
+            "{recent_chat}"
+        )
+        self.immediate_system = (
+            f"You are a Twitch chatter responding immediately to the streamer {streamer}. "
+            "Keep it brief (1-2 sentences max) and relevant to what the streamer just said.\n"
+            "Generate exactly ONE short, quick response to: '{message}'"
+        )
+        self.immediate_user = f"Streamer {streamer} just said: '{{message}}'. Give a quick response:"
+
+    @staticmethod
+    def _recent(recent_chat):
+        return str(recent_chat[-8:]) if recent_chat else "None"
+
+    def batch(self, count, personalities, recent_chat, reply_to=None):
+        """(system, user) prompts for a batch of chat messages"""
+        reply_target = self.reply_target.format(count=count, target=reply_to) if reply_to is not None else ""
+        system = self.batch_system.format(count=count, personalities=personality_blend(tuple(personalities)))
+        user = self.batch_user.format(recent_chat=self._recent(recent_chat), reply_target=reply_target, count=count)
+        return system, user
+
+    def mod_intervention(self, target_username, recent_chat):
+        """(system, user) prompts for a moderator intervention"""
+        return (self.mod_system.format(target=target_username),
+                self.mod_user.format(recent_chat=self._recent(recent_chat)))
+
+    def immediate_response(self, streamer_message):
+        """(system, user) prompts for a reply to the streamer"""
+        return (self.immediate_system.format(message=streamer_message),
+                self.immediate_user.format(message=streamer_message))
+
+_compiled = None
+_compile_lock = threading.Lock()
+
+def templates(cfg=None):
+    """PromptTemplates for the current settings, recompiled only when a PROMPT_KEYS value changes"""
+    global _compiled
+    cfg = cfg or config.snapshot()
+    key = prompt_key(cfg)
+    compiled = _compiled
+    if compiled is not None and compiled.key == key:
+        return compiled
+    with _compile_lock:
+        if _compiled is None or _compiled.key != key:
+            _compiled = PromptTemplates(cfg)
+        return _compiled
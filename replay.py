@@ -0,0 +1,98 @@
+import json
+import random
+import threading
+import time
+
+# ===========================
+# SEEDED RANDOM STREAMS
+# ===========================
+
+class RandomStreams:
+    """One random.Random per subsystem, all derived from a single seed.
+
+    Each stream is seeded from "<seed>:<name>", so a subsystem that draws
+    more or fewer numbers never shifts what the others see, and the same
+    seed gives the same sequence per stream on every run. Without a seed
+    every stream is seeded from the OS like the global random module.
+    """
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        stream = self._streams.get(name)
+        if stream is None:
+            with self._lock:
+                stream = self._streams.get(name)
+                if stream is None:
+                    stream = random.Random(None if self.seed is None else f"{self.seed}:{name}")
+                    self._streams[name] = stream
+        return stream
+
+# ===========================
+# LLM RECORD / REPLAY
+# ===========================
+
+class LLMRecorder:
+    """Passes calls through to an LLM client and appends each answer to a JSON Lines file.
+
+    Every line holds the completion text and how long the call took.
+    Cancelled calls are not recorded since the engine drops their output.
+    """
+    def __init__(self, path, client):
+        self.path = path
+        self.client = client
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _call_llm(self, system_instructions, user_text, screen_data_url, cancel=None):
+        start = time.monotonic()
+        content = self.client._call_llm(system_instructions, user_text, screen_data_url, cancel=cancel)
+        if cancel and cancel.cancelled:
+            return content
+        record = {"latency": round(time.monotonic() - start, 4), "content": content}
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._file.flush()
+        return content
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class LLMReplayer:
+    """Answers calls with the responses of an LLMRecorder file, in recorded order.
+
+    Each answer is delayed by its recorded latency (pass realtime=False
+    to answer at once) so the engine paces a replay like the original
+    session. Once the recording runs out every call returns "" and
+    `exhausted` turns True.
+    """
+    def __init__(self, path, realtime=True):
+        self.realtime = realtime
+        self._lock = threading.Lock()
+        with open(path, encoding="utf-8") as f:
+            self._records = [json.loads(line) for line in f if line.strip()]
+        self._next = 0
+        self.exhausted = False
+        print(f"[INFO] Replaying {len(self._records)} LLM responses from {path}")
+
+    def _call_llm(self, system_instructions, user_text, screen_data_url, cancel=None):
+        with self._lock:
+            if self._next >= len(self._records):
+                self.exhausted = True
+                return ""
+            record = self._records[self._next]
+            self._next += 1
+        if self.realtime:
+            if cancel:
+                if cancel.wait(record["latency"]):
+                    return ""
+            else:
+                time.sleep(record["latency"])
+        return record["content"]
+
+    def close(self):
+        pass
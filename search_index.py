@@ -0,0 +1,172 @@
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+# ===========================
+# CHAT SEARCH INDEX
+# ===========================
+
+NGRAM = 3
+
+def _ngrams(token):
+    return {token[i:i + NGRAM] for i in range(len(token) - NGRAM + 1)}
+
+class ChatSearchIndex:
+    """Incrementally maintained inverted index over stored chat messages.
+
+    tokens:  lowercased whitespace token -> ascending seqs containing it
+    ngrams:  trigram -> tokens containing it, for substring matches
+    users:   lowercased username -> ascending seqs
+    times:   message timestamps parallel to the indexed seqs
+
+    The trigram index is kept over the token vocabulary rather than every
+    message, so substring search costs memory per distinct word only.
+    Each indexed message also keeps its tokens and username in order, so
+    prune() only visits the postings of the messages it drops.
+    """
+    def __init__(self):
+        self.tokens = {}
+        self.ngrams = {}
+        self.users = {}
+        self.first_seq = 0
+        self._seqs = array('I')
+        self._times = array('d')
+        self._keys = deque()  # (tokens, username) parallel to _seqs
+
+    def add(self, seq, message):
+        """Index a message stored under seq (seqs must be added in order)"""
+        tokens = tuple(set(message.text.lower().split()))
+        username = message.username.lower()
+        self._seqs.append(seq)
+        self._times.append(message.timestamp)
+        self._keys.append((tokens, username))
+        self.users.setdefault(username, array('I')).append(seq)
+        for token in tokens:
+            postings = self.tokens.get(token)
+            if postings is None:
+                postings = self.tokens[token] = array('I')
+                for gram in _ngrams(token):
+                    self.ngrams.setdefault(gram, set()).add(token)
+            postings.append(seq)
+
+    def prune(self, first_seq):
+        """Drop postings for messages older than first_seq (after the store trims)"""
+        if first_seq <= self.first_seq:
+            return
+        self.first_seq = first_seq
+        cut = bisect_left(self._seqs, first_seq)
+        if not cut:
+            return
+        del self._seqs[:cut]
+        del self._times[:cut]
+        expired_tokens, expired_users = set(), set()
+        for _ in range(cut):
+            tokens, username = self._keys.popleft()
+            expired_tokens.update(tokens)
+            expired_users.add(username)
+        for keys, postings_map in ((expired_tokens, self.tokens), (expired_users, self.users)):
+            for key in keys:
+                postings = postings_map[key]
+                del postings[:bisect_left(postings, first_seq)]
+                if postings:
+                    continue
+                del postings_map[key]
+                if postings_map is self.tokens:
+                    for gram in _ngrams(key):
+                        tokens = self.ngrams.get(gram)
+                        if tokens is not None:
+                            tokens.discard(key)
+                            if not tokens:
+                                del self.ngrams[gram]
+
+    def _matching_tokens(self, word):
+        """Vocabulary tokens that contain word as a substring"""
+        if len(word) < NGRAM:
+            return [token for token in self.tokens if word in token]
+        candidates = None
+        for gram in _ngrams(word):
+            tokens = self.ngrams.get(gram)
+            if not tokens:
+                return []
+            candidates = set(tokens) if candidates is None else candidates & tokens
+        return [token for token in candidates if word in token]
+
+    def _word_seqs(self, word):
+        seqs = set()
+        for token in self._matching_tokens(word):
+            seqs.update(self.tokens[token])
+        for username, postings in self.users.items():
+            if word in username:
+                seqs.update(postings)
+        return seqs
+
+    def search(self, store, text=None, user=None, start_time=None, end_time=None):
+        """Return ascending seqs of stored messages matching every given filter.
+
+        text matches as a case-insensitive substring of the message or the
+        username, user matches the username exactly, and times bound the
+        message timestamp as [start_time, end_time). Without a store each
+        word is matched on its own and hits are not checked against the full
+        text, so callers verify multi-word terms themselves.
+        """
+        lo = bisect_left(self._times, start_time) if start_time is not None else 0
+        hi = bisect_left(self._times, end_time) if end_time is not None else len(self._seqs)
+        if lo >= hi:
+            return []
+        min_seq, max_seq = self._seqs[lo], self._seqs[hi - 1]
+
+        candidates = None
+        if user:
+            candidates = set(self.users.get(user.lower(), ()))
+        term = text.lower().strip() if text else ""
+        for word in term.split():
+            seqs = self._word_seqs(word)
+            candidates = seqs if candidates is None else candidates & seqs
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = self._seqs[lo:hi]
+
+        results = []
+        for seq in sorted(candidates):
+            if seq < min_seq or seq > max_seq:
+                continue
+            if store is not None:
+                message = store.get(seq)
+                if message is None:
+                    continue
+                # Multi-word terms and terms spanning tokens need the real text
+                if term and term not in message.text.lower() and term not in message.username.lower():
+                    continue
+            results.append(seq)
+        return results
+
+    def __len__(self):
+        return len(self._seqs)
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smh]?)$")
+_UNITS = {"": 60, "s": 1, "m": 60, "h": 3600}
+
+def parse_query(query, now=None):
+    """Split a search box query into search() filters.
+
+    Supports "from:NAME" for the username and "last:10m" (s/m/h) for a
+    time window; everything else is the text term.
+    """
+    filters = {"text": None, "user": None, "start_time": None}
+    words = []
+    for part in query.split():
+        key, _, value = part.partition(":")
+        key = key.lower()
+        if key == "from" and value:
+            filters["user"] = value.lstrip("@")
+        elif key in ("last", "since") and _DURATION.match(value.lower()):
+            amount, unit = _DURATION.match(value.lower()).groups()
+            now = time.time() if now is None else now
+            filters["start_time"] = now - float(amount) * _UNITS[unit]
+        else:
+            words.append(part)
+    filters["text"] = " ".join(words) or None
+    return filters
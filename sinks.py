@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+from config import config
+from data_structures import USER_BADGES, ChatMessage
+
+# ===========================
+# MESSAGE SINKS
+# ===========================
+
+class ChatSink:
+    """Destination for ChatMessage records produced by a ChatEngine"""
+    def write(self, message):
+        pass
+
+    def close(self):
+        pass
+
+class QueueSink(ChatSink):
+    """Put messages on the queue drained by TwitchChatUI._drain_queue.
+    
+    Each message is stamped with its time.monotonic() enqueue time for latency tracking.
+    """
+    def __init__(self, msg_queue):
+        self.msg_queue = msg_queue
+
+    def write(self, message):
+        message.queued_at = time.monotonic()
+        self.msg_queue.put(message)
+
+class StdoutSink(ChatSink):
+    """Print messages as plain chat lines"""
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+
+    def write(self, message):
+        timestamp = message.time_string()
+        if message.kind == ChatMessage.BAN:
+            print(f"{self.prefix}[{timestamp}] {message.username} has been timed out by "
+                  f"{config.get('MODJV_USERNAME')} for {message.reason} (120s).", flush=True)
+            return
+        badge_text = "".join(USER_BADGES[b]["text"] + " " for b in message.badge_names())
+        print(f"{self.prefix}[{timestamp}] {badge_text}{message.username}: {message.text}", flush=True)
+
+class JsonlSink(ChatSink):
+    """Append messages to a JSON Lines file"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, message):
+        line = json.dumps(message.to_dict(), ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+class CallbackSink(ChatSink):
+    """Forward messages to a plain callable"""
+    def __init__(self, on_message):
+        self.on_message = on_message
+
+    def write(self, message):
+        self.on_message(message)
+
+class ChatLogSink(ChatSink):
+    """Append messages to an on-disk ChatLog"""
+    def __init__(self, chat_log):
+        self.chat_log = chat_log
+
+    def write(self, message):
+        self.chat_log.append(message)
+
+    def close(self):
+        self.chat_log.close()
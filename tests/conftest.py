@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Keep the settings file out of the real home directory and make the flat modules importable
+os.environ["HOME"] = tempfile.mkdtemp(prefix="twitch_sim_tests_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
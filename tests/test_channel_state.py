@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from channel_state import ChannelStateStore
+from data_structures import TwitchData
+
+def make_channel():
+    data = TwitchData()
+    data.add_follower(5)
+    data.add_subscriber("alice", 3)
+    data.record_user_message("alice")
+    return data
+
+def test_checkpoint_and_restore(tmp_path):
+    store = ChannelStateStore(str(tmp_path))
+    data = make_channel()
+    assert store.checkpoint(data)
+    assert not store.checkpoint(data)  # Nothing changed since
+
+    restored = TwitchData()
+    assert store.restore(restored)
+    assert restored.follower_count == 5
+    assert restored.subscribers == {"alice": 3}
+    assert restored.get_badges("alice") == ["subscriber"]
+    assert restored.user_reputation.get("alice")["messages"] == 1
+    assert restored.take_changes() is None
+
+def test_restore_skips_torn_journal_line(tmp_path):
+    store = ChannelStateStore(str(tmp_path))
+    data = make_channel()
+    store.checkpoint(data)
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"counters":{"follower_count":9')
+    data.add_follower()
+    store.checkpoint(data)
+
+    restored = TwitchData()
+    store.restore(restored)
+    assert restored.follower_count == 6
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    store = ChannelStateStore(str(tmp_path), compact_bytes=1)
+    data = make_channel()
+    store.checkpoint(data)
+    assert os.path.exists(store.base_path)
+    assert os.path.getsize(store.journal_path) == 0
+
+    restored = TwitchData()
+    store.restore(restored)
+    assert restored.follower_count == 5
+
+def test_failed_checkpoint_keeps_changes_pending(tmp_path, monkeypatch):
+    store = ChannelStateStore(str(tmp_path))
+    data = make_channel()
+
+    def fail(line):
+        raise OSError("disk full")
+    monkeypatch.setattr(store, "_append", fail)
+    with pytest.raises(OSError):
+        store.checkpoint(data)
+    monkeypatch.undo()
+
+    assert store.checkpoint(data)
+    restored = TwitchData()
+    store.restore(restored)
+    assert restored.follower_count == 5
+    assert restored.subscribers == {"alice": 3}
@@ -0,0 +1,83 @@
+import glob
+import os
+import time
+
+from chat_log import ChatLog, ChatLogReader, INDEX_RECORD
+from data_structures import ChatMessage
+
+def write_log(directory, count, segment_bytes=64 * 1024 * 1024):
+    log = ChatLog(str(directory), segment_bytes=segment_bytes, session="test")
+    for i in range(count):
+        log.append(ChatMessage(f"user{i}", "#FFFFFF", f"message {i}", ["vip"], timestamp=1000.0 + i))
+    return log
+
+def test_get_and_range_across_segments(tmp_path):
+    log = write_log(tmp_path, 50, segment_bytes=512)
+    reader = log.reader()
+    assert len(reader) == 50
+    assert len(log._segments) > 1
+    assert reader.get(0).text == "message 0"
+    assert reader.get(49).username == "user49"
+    assert reader.get(7).badge_names() == ["vip"]
+    assert [m.text for m in reader.range(18, 22)] == [f"message {i}" for i in range(18, 22)]
+    reader.close()
+    log.close()
+
+def test_find_time_and_scan(tmp_path):
+    log = write_log(tmp_path, 30, segment_bytes=400)
+    reader = log.reader()
+    assert reader.find_time(0) == 0
+    assert reader.find_time(1010.0) == 10
+    assert reader.find_time(1010.5) == 11
+    assert reader.find_time(5000) == 30
+    assert [m.username for m in reader.scan_time(1005.0, 1008.0)] == ["user5", "user6", "user7"]
+    reader.close()
+    log.close()
+
+def test_export_and_reopen_session(tmp_path):
+    write_log(tmp_path, 5).close()
+    assert ChatLogReader.sessions(str(tmp_path)) == ["test"]
+    reader = ChatLogReader.open_session(str(tmp_path), "test")
+    out = tmp_path / "export.txt"
+    assert reader.export(str(out), lambda m: m.text, start_time=1003.0) == 2
+    assert out.read_text(encoding="utf-8").splitlines() == ["message 3", "message 4"]
+    reader.close()
+
+def test_reader_ignores_torn_index_entry(tmp_path):
+    log = write_log(tmp_path, 3)
+    log.close()
+    with open(log._segments[0] + ".idx", "ab") as f:
+        f.write(b"\x00\x01\x02")
+    reader = ChatLogReader.open_session(str(tmp_path), "test")
+    assert len(reader) == 3
+    reader.close()
+
+def test_reader_drops_entries_past_the_data(tmp_path):
+    log = write_log(tmp_path, 3)
+    log.close()
+    base = log._segments[0]
+    with open(base + ".jsonl", "rb+") as f:
+        f.truncate(f.seek(0, 2) - 5)  # The last record never fully reached disk
+    reader = ChatLogReader.open_session(str(tmp_path), "test")
+    assert len(reader) == 2
+    assert [m.text for m in reader.range()] == ["message 0", "message 1"]
+    reader.close()
+
+def test_timed_flush_reaches_disk(tmp_path):
+    log = ChatLog(str(tmp_path), session="test", flush_interval=0.05)
+    log.append(ChatMessage("user", "#FFFFFF", "hello", timestamp=1.0))
+    deadline = time.monotonic() + 2
+    while os.path.getsize(log._segments[0] + ".jsonl") == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert os.path.getsize(log._segments[0] + ".idx") == INDEX_RECORD.size
+    log.close()
+
+def test_oldest_segments_are_deleted_past_the_cap(tmp_path):
+    log = write_log(tmp_path, 200, segment_bytes=1024)
+    log.close()
+    capped = ChatLog(str(tmp_path), session="next", max_bytes=4096)
+    sizes = [os.path.getsize(path) for path in glob.glob(str(tmp_path / "chat-*"))]
+    assert sum(sizes) <= 4096
+    assert not os.path.exists(log._segments[0] + ".jsonl")
+    assert os.path.exists(log._segments[-1] + ".jsonl")  # Newest segments survive
+    capped.close()
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from display_timeline import DisplayTimeline
+
+def test_releases_in_time_order():
+    timeline = DisplayTimeline()
+    released = []
+    done = threading.Event()
+    timeline.start()
+    try:
+        now = time.monotonic()
+        timeline.add(now + 0.06, released.append, "late")
+        timeline.add(now + 0.02, released.append, "early")
+        timeline.add(now + 0.08, done.set)
+        assert done.wait(2)
+    finally:
+        timeline.stop()
+    assert timeline.join(2)
+    assert released == ["early", "late"]
+
+def test_reserve_spaces_slots_after_the_queue():
+    timeline = DisplayTimeline()
+    first = timeline.reserve(3, 0.5)
+    second = timeline.reserve(2, 0.5)
+    assert [round(b - a, 6) for a, b in zip(first, first[1:])] == [0.5, 0.5]
+    assert round(second[0] - first[-1], 6) == 0.5
+    assert timeline.reserve(0, 0.5) == []
+    assert 1.5 < timeline.backlog() <= 2.0  # First slot is now, then four gaps
+
+def test_wait_for_backlog_blocks_until_drained():
+    timeline = DisplayTimeline()
+    timeline.start()
+    try:
+        for at in timeline.reserve(3, 0.05):
+            timeline.add(at, lambda: None)
+        assert not timeline.wait_for_backlog(0, timeout=0.01)
+        assert timeline.wait_for_backlog(0.02, timeout=2)
+    finally:
+        timeline.stop()
+    assert not timeline.wait_for_backlog(0)  # Stopped
+    assert timeline.pending() == 0
+
+def test_failing_callback_does_not_stop_release():
+    timeline = DisplayTimeline()
+    done = threading.Event()
+    timeline.start()
+    try:
+        now = time.monotonic()
+        timeline.add(now, lambda: 1 / 0)
+        timeline.add(now + 0.01, done.set)
+        assert done.wait(2)
+    finally:
+        timeline.stop()
+
+def test_front_slots_start_before_the_backlog():
+    timeline = DisplayTimeline()
+    queued = timeline.reserve(10, 1.0)
+    front = timeline.reserve(2, 0.2, front=True)
+    assert front[0] < queued[1]
+    assert timeline.reserve(1, 1.0)[0] == queued[-1] + 1.0  # The tail is unchanged
+    assert not timeline.running
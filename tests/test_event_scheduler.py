@@ -0,0 +1,48 @@
+import random
+import threading
+
+from event_scheduler import EventScheduler
+
+def test_fires_events_at_their_rates():
+    fired = []
+    done = threading.Event()
+    def handler(name):
+        fired.append(name)
+        if len(fired) >= 5:
+            done.set()
+    scheduler = EventScheduler(handler, rng=random.Random(1))
+    scheduler.set_rates({"fast": 6000.0, "never": 0})
+    scheduler.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+    assert scheduler.join(2)
+    assert set(fired) == {"fast"}
+
+def test_rate_change_reschedules_only_that_event():
+    scheduler = EventScheduler(lambda name: None, rng=random.Random(2))
+    scheduler.set_rates({"a": 0.001, "b": 0.001})
+    scheduler.start()
+    try:
+        due_b = scheduler._due["b"]
+        scheduler.set_rates({"a": 0, "b": 0.001})
+        assert "a" not in scheduler._due
+        assert scheduler._due["b"] == due_b
+        assert scheduler.next_due() > 0
+    finally:
+        scheduler.stop()
+    assert scheduler.join(2)
+
+def test_restart_leaves_a_single_thread():
+    fired = []
+    scheduler = EventScheduler(fired.append, rng=random.Random(3))
+    scheduler.start()
+    first = scheduler._thread
+    scheduler.stop()
+    scheduler.start()
+    scheduler.stop()
+    assert scheduler.join(2)
+    first.join(2)
+    assert not first.is_alive()
+    assert fired == []
@@ -0,0 +1,20 @@
+from hype_analyzer import HypeAnalyzer, KeywordAutomaton
+
+def test_automaton_counts_whole_words_only():
+    automaton = KeywordAutomaton({"OP": "hype", "NO WAY": "hype", "STOP": "chill"})
+    assert automaton.count("STOP") == {"chill": 1}
+    assert automaton.count("OP OP, NO WAY") == {"hype": 3}
+    assert automaton.count("OPTIONS") == {}
+
+def test_analyze_counts_hype_chill_and_emotes():
+    analyzer = HypeAnalyzer()
+    assert analyzer.analyze("clutch play, chill") == {"hype": 1, "chill": 1}
+    # A hype word that is also an emote counts once, as an emote
+    assert analyzer.analyze("POGGERS KEKW", emotes={"POGGERS", "KEKW"}) == {"hype": 0, "emote": 2}
+
+def test_score_rewards_caps_and_penalizes_chill():
+    analyzer = HypeAnalyzer()
+    assert analyzer.score(["LETS GO THAT WAS INSANE"]) > 0
+    assert analyzer.score(["calm down", "ok relax"]) < 0
+    assert analyzer.score([]) == 0
+    assert analyzer.score(["😀😀😀😀😀😀😀😀😀😀😀"]) == 0  # Emoji-only text is not all caps
@@ -0,0 +1,46 @@
+import time
+
+from cancellation import CancelToken
+from replay import RandomStreams, LLMRecorder, LLMReplayer
+
+class FakeClient:
+    def __init__(self, answers):
+        self.answers = list(answers)
+
+    def _call_llm(self, system_instructions, user_text, screen_data_url, cancel=None):
+        return self.answers.pop(0)
+
+def test_seeded_streams_repeat_and_stay_independent():
+    a, b = RandomStreams(7), RandomStreams(7)
+    first = [a.get("chatters").random() for _ in range(5)]
+    b.get("events").random()  # Drawing from another stream must not shift this one
+    assert [b.get("chatters").random() for _ in range(5)] == first
+    assert a.get("chatters") is a.get("chatters")
+    assert RandomStreams(8).get("chatters").random() != RandomStreams(7).get("chatters").random()
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "llm.jsonl")
+    recorder = LLMRecorder(path, FakeClient(["one", "two", "dropped"]))
+    assert recorder._call_llm("s", "u", "") == "one"
+    assert recorder._call_llm("s", "u", "") == "two"
+    cancel = CancelToken()
+    cancel.cancel()
+    recorder._call_llm("s", "u", "", cancel=cancel)  # Cancelled calls are not recorded
+    recorder.close()
+
+    replayer = LLMReplayer(path, realtime=False)
+    assert replayer._call_llm("other", "prompt", "") == "one"
+    assert replayer._call_llm("other", "prompt", "") == "two"
+    assert not replayer.exhausted
+    assert replayer._call_llm("other", "prompt", "") == ""
+    assert replayer.exhausted
+
+def test_realtime_replay_is_cancellable(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    path.write_text('{"latency": 30, "content": "slow"}\n', encoding="utf-8")
+    replayer = LLMReplayer(str(path))
+    cancel = CancelToken()
+    cancel.cancel()
+    start = time.monotonic()
+    assert replayer._call_llm("s", "u", "", cancel=cancel) == ""
+    assert time.monotonic() - start < 1
@@ -0,0 +1,48 @@
+from data_structures import ChatMessage, MessageStore
+from search_index import ChatSearchIndex, parse_query
+
+def build(lines, capacity=100):
+    store = MessageStore(capacity)
+    index = ChatSearchIndex()
+    for i, (username, text) in enumerate(lines):
+        message = ChatMessage(username, "#FFFFFF", text, timestamp=100.0 + i)
+        index.add(store.append(message), message)
+    return store, index
+
+LINES = [
+    ("alice", "that was a clutch play"),
+    ("bob", "POGGERS clutch"),
+    ("carol", "clutch play again"),
+    ("alice", "gg everyone"),
+]
+
+def test_text_user_and_time_filters():
+    store, index = build(LINES)
+    assert index.search(store, text="clutch") == [0, 1, 2]
+    assert index.search(store, text="lutc") == [0, 1, 2]  # Substring through the trigram index
+    assert index.search(store, text="clutch play") == [0, 2]
+    assert index.search(store, text="poggers") == [1]
+    assert index.search(store, user="ALICE") == [0, 3]
+    assert index.search(store, text="clutch", start_time=101.0, end_time=102.0) == [1]
+    assert index.search(store, text="ali") == [0, 3]  # Matches usernames too
+    assert index.search(store, text="missing") == []
+
+def test_without_store_words_match_on_their_own():
+    _, index = build(LINES)
+    assert index.search(None, text="play clutch") == [0, 2]
+
+def test_prune_after_store_wraps():
+    store, index = build(LINES, capacity=2)
+    assert store.first_seq == 2
+    assert store.get(0) is None
+    index.prune(store.first_seq)
+    assert len(index) == 2
+    assert index.search(store, text="clutch") == [2]
+    assert "poggers" not in index.tokens
+    assert not any("poggers" in tokens for tokens in index.ngrams.values())
+
+def test_parse_query():
+    filters = parse_query("from:@Bob last:10m clutch play", now=1000.0)
+    assert filters == {"text": "clutch play", "user": "Bob", "start_time": 400.0}
+    assert parse_query("since:30s", now=100.0)["start_time"] == 70.0
+    assert parse_query("last:soon")["text"] == "last:soon"
@@ -0,0 +1,49 @@
+import os
+
+from user_tables import ColdUserStore, LRUTable
+
+def test_evicts_least_recently_used(tmp_path):
+    table = LRUTable("users", 2)
+    table["a"] = 1
+    table["b"] = 2
+    table["a"]  # Touch so "b" is now the oldest
+    table["c"] = 3
+    assert "b" not in table
+    assert table.get("b") is None
+    assert table.evictions == 1
+    assert sorted(table.items()) == [("a", 1), ("c", 3)]
+
+def test_spills_to_cold_store_and_promotes_back(tmp_path):
+    cold = ColdUserStore(os.path.join(tmp_path, "cold"))
+    table = LRUTable("users", 2, default_factory=list, cold_store=cold)
+    table["a"] = ["vip"]
+    table["b"] = []
+    table["c"] = []
+    assert "a" not in table
+    assert cold.has("users", "a")
+
+    assert table["a"] == ["vip"]
+    assert not cold.has("users", "a")
+    assert cold.has("users", "b")
+    assert len(table) == 2
+    cold.close()
+
+def test_restore_keeps_newer_spilled_copy(tmp_path):
+    cold = ColdUserStore(os.path.join(tmp_path, "cold"))
+    table = LRUTable("users", 1, cold_store=cold)
+    table["a"] = "new"
+    table["b"] = "other"
+    table.restore("a", "old snapshot")
+    assert table.get("a") == "new"
+    cold.close()
+
+def test_resize_evicts_overflow(tmp_path):
+    cold = ColdUserStore(os.path.join(tmp_path, "cold"))
+    table = LRUTable("users", 10, cold_store=cold)
+    for i in range(5):
+        table[i] = i
+    table.resize(2)
+    assert len(table) == 2
+    assert cold.count() == 3
+    cold.close()
+    assert cold.count() == 0
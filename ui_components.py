@@ -1,105 +1,12 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog, filedialog
-import threading
-import time
+from tkinter import ttk, messagebox, filedialog
+import tkinter.font as tkfont
 import random
-import queue
-import json
-import re
-import os
-import base64
-import io
-import requests
-import mss
 from datetime import datetime
-from PIL import Image, ImageOps, ImageTk
 
 from config import config
-from data_structures import (
-    twitch_data, INVISIBLE_CHARS, DONATION_MESSAGES, EVENT_MESSAGES, 
-    EMOTE_LIST, EMOTE_COLORS, HYPE_WORDS, CHILL_WORDS, USERNAME_POOL, 
-    USERNAME_COLORS, CHAT_PERSONALITIES, USER_BADGES
-)
-
-# ===========================
-# HELPER FUNCTIONS
-# ===========================
-
-def clean_chat_line(text):
-    for invisible, replacement in INVISIBLE_CHARS.items():
-        text = text.replace(invisible, replacement)
-    return ' '.join(text.split()).strip()
-
-def get_screen_data_url(max_w=None, max_h=None):
-    """Get screenshot as data URL"""
-    if max_w is None:
-        max_w = config.get("IMAGE_SIZE")
-    if max_h is None:
-        max_h = config.get("IMAGE_SIZE")
-        
-    try:
-        with mss.mss() as sct:
-            monitor = sct.monitors[1]
-            raw = sct.grab(monitor)
-            img = Image.frombytes("RGB", raw.size, raw.bgra, "raw", "BGRX")
-            
-            if config.get("ADAPTIVE_QUALITY") and threading.active_count() > 10:
-                max_w = max_w // 2
-                max_h = max_h // 2
-                
-            img = ImageOps.contain(img, (max_w, max_h))
-            
-            buf = io.BytesIO()
-            quality = 70 if threading.active_count() <= 10 else 30
-            img.save(buf, format="JPEG", quality=quality)
-            b64 = base64.b64encode(buf.getvalue()).decode("utf-8")
-            buf.close()
-            
-            return f"data:image/jpeg;base64,{b64}", img
-    except Exception as e:
-        print(f"[ERROR] Screenshot error: {e}")
-        return "data:image/jpeg;base64,", None
-
-class LLMConnectionPool:
-    def __init__(self):
-        self.session = requests.Session() if config.get("KEEP_ALIVE_CONNECTION") else None
-        self.request_queue = queue.Queue()
-        self.active_requests = 0
-        self.max_concurrent = config.get("CONCURRENT_REQUESTS", 2)
-        
-    def _call_llm(self, system_instructions, user_text, screen_data_url):
-        payload = {
-            "model": config.get("MODEL"),
-            "messages": [
-                {"role": "system", "content": [{"type": "text", "text": system_instructions}]},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": user_text},
-                        {"type": "image_url", "image_url": {"url": screen_data_url}}
-                    ]
-                }
-            ],
-            "temperature": config.get("TEMPERATURE"),
-            "max_tokens": config.get("MAX_TOKENS"),
-            "stream": False
-        }
-
-        try:
-            timeout = config.get("LLM_TIMEOUT", 30)
-            if self.session:
-                resp = self.session.post(config.get("API_URL"), json=payload, timeout=timeout)
-            else:
-                resp = requests.post(config.get("API_URL"), json=payload, timeout=timeout)
-                
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            return content
-        except Exception as e:
-            print(f"[ERROR] LLM Error: {e}")
-            return ""
-
-llm_pool = LLMConnectionPool()
+from data_structures import twitch_data, EMOTE_LIST
+from instrumentation import profiler
 
 # ===========================
 # UI COMPONENTS
@@ -255,6 +162,140 @@ class EnhancedText(tk.Text):
     def clear_highlights(self):
         self.tag_remove("search_highlight", "1.0", "end")
 
+class VirtualChatView:
+    """Chat view that only keeps the visible window of a MessageStore in its Text widget"""
+    def __init__(self, parent, store, render_message, **text_kwargs):
+        self.store = store
+        self.render_message = render_message
+        self.frame = tk.Frame(parent, bg=text_kwargs.get("bg", "#0E0E10"))
+
+        self.text = EnhancedText(self.frame, **text_kwargs)
+        self.scrollbar = ttk.Scrollbar(self.frame, command=self._on_scrollbar)
+
+        self.text.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.top_seq = store.first_seq
+        self.rendered = []  # Sequence numbers currently in the widget, one per line
+        self.follow = True  # Stick to the newest message
+        self.highlight_seq = None
+        self._rows = 20
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+
+    def pack(self, **kwargs):
+        return self.frame.pack(**kwargs)
+
+    def _on_resize(self, event=None):
+        linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace") or 1
+        rows = max(1, self.text.winfo_height() // linespace)
+        if rows != self._rows:
+            self._rows = rows
+            self.refresh()
+
+    def _max_top(self):
+        return max(self.store.first_seq, self.store.next_seq - self._rows)
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            total = max(1, len(self.store))
+            target = self.store.first_seq + int(float(args[0]) * total)
+            self.scroll_to(target)
+        elif action == "scroll":
+            amount = int(args[0])
+            if args[1] == "pages":
+                amount *= self._rows
+            self.scroll(amount)
+
+    def scroll(self, amount):
+        self.scroll_to(self.top_seq + amount)
+        return "break"
+
+    def scroll_to(self, seq):
+        """Show the window starting at seq"""
+        self.top_seq = max(self.store.first_seq, min(seq, self._max_top()))
+        self.follow = self.top_seq >= self._max_top()
+        self.refresh()
+
+    def scroll_to_top(self):
+        self.scroll_to(self.store.first_seq)
+
+    def scroll_to_end(self):
+        self.scroll_to(self.store.next_seq)
+
+    def see_seq(self, seq, highlight=True):
+        """Jump to a message, optionally marking it as the current search hit"""
+        self.highlight_seq = seq if highlight else None
+        self.scroll_to(seq - self._rows // 2)
+
+    def seq_at(self, y):
+        """Get the sequence number of the message rendered at widget height y"""
+        line = int(self.text.index(f"@0,{y}").split(".")[0])
+        if 1 <= line <= len(self.rendered):
+            return self.rendered[line - 1]
+        return None
+
+    @profiler.timed("virtual_view_append")
+    def on_append(self, seq):
+        """Called after a message was added to the store"""
+        if not self.follow:
+            self._update_scrollbar()
+            return
+
+        self.text.configure(state="normal")
+        self._render(seq)
+
+        # Keep the widget at a constant size by dropping the oldest line
+        while len(self.rendered) > self._rows:
+            self.text.delete("1.0", "2.0")
+            self.rendered.pop(0)
+        self.top_seq = self.rendered[0] if self.rendered else seq
+
+        self.text.see("end")
+        self.text.configure(state="disabled")
+        self._update_scrollbar()
+
+    @profiler.timed("virtual_view_refresh")
+    def refresh(self):
+        """Re-render the visible window from the store"""
+        if self.follow:
+            self.top_seq = self._max_top()
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.rendered = []
+        for seq, _ in zip(range(self.top_seq, self.store.next_seq), range(self._rows)):
+            self._render(seq)
+
+        if self.follow:
+            self.text.see("end")
+        else:
+            self.text.yview_moveto(0)
+        self.text.configure(state="disabled")
+        self._update_scrollbar()
+
+    def _render(self, seq):
+        message = self.store.get(seq)
+        if message is None:
+            return
+        line = len(self.rendered) + 1
+        self.render_message(message)
+        self.rendered.append(seq)
+        if seq == self.highlight_seq:
+            self.text.tag_add("search_highlight", f"{line}.0", f"{line}.end")
+
+    def _update_scrollbar(self):
+        total = len(self.store)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = (self.top_seq - self.store.first_seq) / total
+        last = min(1.0, first + len(self.rendered) / total)
+        self.scrollbar.set(first, last)
+
 class StreamStatsPanel:
     def __init__(self, parent, app):
         self.parent = parent
@@ -263,6 +304,7 @@ class StreamStatsPanel:
         self.live_indicator = None
         self.viewer_count_label = None
         self.follower_count_label = None
+        self.chat_rate_label = None
         self.is_live = False
         
     def create_panel(self):
@@ -305,13 +347,20 @@ class StreamStatsPanel:
                                 bg="#0E0E10", fg="#FFFFFF")
         follower_icon.pack(side="left")
         
+        channel = twitch_data.snapshot()
         self.follower_count_label = tk.Label(follower_frame, 
-                                           text=f"{twitch_data.follower_count}/{twitch_data.follower_goal}", 
+                                           text=f"{channel.follower_count}/{channel.follower_goal}", 
                                            font=("Segoe UI", 10), bg="#0E0E10", fg="#FFFFFF")
         self.follower_count_label.pack(side="left", padx=(5, 0))
         
+        # Chat activity from the engine's live analytics
+        self.chat_rate_label = tk.Label(self.frame, text="💬 0/min", font=("Segoe UI", 10), 
+                                      bg="#0E0E10", fg="#FFFFFF")
+        self.chat_rate_label.pack(side="left", padx=20)
+        
         return self.frame
     
+    @profiler.timed("stats_update")
     def update_stats(self):
         if not self.frame:
             return
@@ -323,20 +372,29 @@ class StreamStatsPanel:
             else:
                 # Simple random fluctuation
                 base_viewers = config.get("VIEWER_BASE_COUNT")
-                fluctuation = random.randint(
+                fluctuation = self.app.engine.rng.get("viewers").randint(
                     config.get("VIEWER_FLUCTUATION_MIN"), 
                     config.get("VIEWER_FLUCTUATION_MAX")
                 )
-                twitch_data.viewer_count = max(10, base_viewers + fluctuation)
+                twitch_data.set_viewer_count(max(10, base_viewers + fluctuation))
             
+            channel = twitch_data.snapshot()
             if config.get("VIEWER_COUNT_AFFECTS_CHAT"):
-                # Adjust batch size based on viewer count
-                viewer_ratio = twitch_data.viewer_count / 100
-                config.set("BATCH_SIZE", max(1, min(10, int(5 * viewer_ratio))))
+                # Adjust batch size based on viewer count; engine state, so the saved setting is untouched
+                viewer_ratio = channel.viewer_count / 100
+                self.app.engine.batch_size = max(1, min(10, int(5 * viewer_ratio)))
+            else:
+                self.app.engine.batch_size = None
             
-            self.viewer_count_label.config(text=str(twitch_data.viewer_count))
+            self.viewer_count_label.config(text=str(channel.viewer_count))
             self.follower_count_label.config(
-                text=f"{twitch_data.follower_count}/{twitch_data.follower_goal}"
+                text=f"{channel.follower_count}/{channel.follower_goal}"
+            )
+            
+            chat_stats = self.app.engine.analytics.snapshot()
+            hype_icon = "🔥" if chat_stats["hype_balance"] > 0.25 else "💬"
+            self.chat_rate_label.config(
+                text=f"{hype_icon} {chat_stats['messages_per_sec'] * 60:.0f}/min · {chat_stats['unique_chatters']} chatting"
             )
             
         # Animate live indicator
@@ -361,45 +419,111 @@ class StreamStatsPanel:
         
         # Calculate base viewers with growth
         base_viewers = config.get("VIEWER_BASE_COUNT") * time_factor
-        growth_factor = 1.0 + (config.get("VIEWER_GROWTH_RATE") * len(twitch_data.viewer_history) / 60)
+        channel = twitch_data.snapshot()
+        growth_factor = 1.0 + (config.get("VIEWER_GROWTH_RATE") * len(channel.viewer_history) / 60)
         
         # Add realistic fluctuation
-        fluctuation = random.randint(
+        rng = self.app.engine.rng.get("viewers")
+        fluctuation = rng.randint(
             config.get("VIEWER_FLUCTUATION_MIN"), 
             config.get("VIEWER_FLUCTUATION_MAX")
         )
         
-        # Event-based spikes
+        # Event-based spikes, more common while chat is hyped
         event_spike = 0
-        if random.random() < 0.05:  # 5% chance of viewer spike
-            event_spike = random.randint(5, 25)
+        hype = max(0.0, self.app.engine.analytics.hype_balance())
+        if rng.random() < 0.05 * (1 + hype):  # 5% base chance of viewer spike
+            event_spike = rng.randint(5, 25)
         
         # Calculate new viewer count
         new_viewers = max(10, int(base_viewers * growth_factor + fluctuation + event_spike))
         
-        # Smooth transition (avoid jumps)
-        if twitch_data.viewer_count > 0:
-            change = new_viewers - twitch_data.viewer_count
-            if abs(change) > 20:  # Limit rapid changes
-                new_viewers = twitch_data.viewer_count + (20 if change > 0 else -20)
+        # Smooth transition (avoid jumps), scaled so large audiences can still move
+        if channel.viewer_count > 0:
+            change = new_viewers - channel.viewer_count
+            max_step = max(20, channel.viewer_count // 10)
+            if abs(change) > max_step:  # Limit rapid changes
+                new_viewers = channel.viewer_count + (max_step if change > 0 else -max_step)
         
-        twitch_data.viewer_count = new_viewers
-        twitch_data.viewer_history.append(new_viewers)
-        twitch_data.peak_viewers = max(twitch_data.peak_viewers, new_viewers)
-        twitch_data.total_views += new_viewers
+        twitch_data.record_viewer_sample(new_viewers)
     
     def set_live_status(self, is_live):
         self.is_live = is_live
         if is_live:
             self.update_stats()
 
+class PerfOverlay:
+    """Live view of render timings collected by the profiler"""
+    def __init__(self, parent):
+        self.parent = parent
+        self.window = None
+        self.text = None
+        
+    def show(self):
+        if self.window and self.window.winfo_exists():
+            self.window.lift()
+            return
+            
+        profiler.enable(self.parent)
+        
+        self.window = tk.Toplevel(self.parent)
+        self.window.title("Render Profiler")
+        self.window.geometry("460x360")
+        self.window.configure(bg="#1F1F23")
+        self.window.attributes("-topmost", True)
+        
+        button_frame = tk.Frame(self.window, bg="#1F1F23")
+        button_frame.pack(side="bottom", fill="x", pady=5)
+        ttk.Button(button_frame, text="💾 Export", command=self._export).pack(side="left", padx=5)
+        ttk.Button(button_frame, text="🔄 Reset", command=profiler.reset).pack(side="left", padx=5)
+        
+        self.text = tk.Text(self.window, bg="#0E0E10", fg="#EFEFF1", font=("Consolas", 9),
+                            relief="flat", borderwidth=0, highlightthickness=0)
+        self.text.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        self._refresh()
+        
+    def _refresh(self):
+        if not (self.window and self.window.winfo_exists()):
+            return
+            
+        summary = profiler.summary()
+        lines = [f"{'stage':<22}{'count':>7}{'mean':>8}{'p95':>8}{'max':>8}  (ms)"]
+        stages = sorted(summary["stages"].items(), key=lambda item: -item[1]["total"])
+        for name, stats in stages:
+            lines.append(f"{name:<22}{stats['count']:>7}{stats['mean']:>8.2f}"
+                         f"{stats['p95']:>8.2f}{stats['max']:>8.2f}")
+            
+        frames = summary["frame_times"]
+        latency = summary["queue_latency"]
+        lines.append("")
+        lines.append(f"Frame time   mean {frames['mean']:.1f}  p95 {frames['p95']:.1f}  "
+                     f"max {frames['max']:.1f}  janky {summary['janky_frames']}")
+        lines.append(f"Queue→screen mean {latency['mean']:.1f}  p95 {latency['p95']:.1f}  "
+                     f"max {latency['max']:.1f}")
+        
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines))
+        self.text.configure(state="disabled")
+        self.window.after(1000, self._refresh)
+        
+    def _export(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filename:
+            profiler.export(filename)
+
 class SettingsWindow:
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
         self.window = None
         self.restart_required_settings = [
-            "WINDOW_WIDTH", "WINDOW_HEIGHT", "FONT_FAMILY", "HIDE_TITLE_BAR", "SETTINGS_DIR"
+            "WINDOW_WIDTH", "WINDOW_HEIGHT", "FONT_FAMILY", "HIDE_TITLE_BAR", "SETTINGS_DIR",
+            "VIRTUAL_CHAT_VIEW", "SYNTHETIC_POPULATION_SIZE", "CHAT_LOG_ENABLED", "CHANNEL_STATE_ENABLED"
         ]
         
     def show(self):
@@ -417,7 +541,7 @@ class SettingsWindow:
         button_frame.pack(side="bottom", fill="x", pady=10)
         
         ttk.Button(button_frame, text="💾 Save Settings", 
-                  command=config.save_settings).pack(side="left", padx=10)
+                  command=lambda: config.schedule_save(0)).pack(side="left", padx=10)
         ttk.Button(button_frame, text="🔄 Load Defaults", 
                   command=self._load_defaults).pack(side="left", padx=10)
         ttk.Button(button_frame, text="❌ Close", 
@@ -698,7 +822,8 @@ class SettingsWindow:
         
     def _update_language_setting(self, lang_code, setting, value):
         """Update a specific language setting"""
-        languages = config.get("LANGUAGES", {}).copy()
+        # Copy the inner dicts too: editing the live one in place would hide the change from config.set
+        languages = {code: dict(data) for code, data in config.get("LANGUAGES", {}).items()}
         if lang_code not in languages:
             languages[lang_code] = {"enabled": False, "weight": 0.0}
         
@@ -715,10 +840,12 @@ class SettingsWindow:
             "Zambal": {"enabled": True, "weight": 0.2},
             "japanese": {"enabled": True, "weight": 0.2},
         }
-        config.set("LANGUAGES", languages)
-        config.set("SLANG_ENABLED", True)
-        config.set("SLANG_INTENSITY", 0.5)
-        config.set("CODE_SWITCHING", True)
+        config.update({
+            "LANGUAGES": languages,
+            "SLANG_ENABLED": True,
+            "SLANG_INTENSITY": 0.5,
+            "CODE_SWITCHING": True,
+        })
         messagebox.showinfo("Preset Applied", "All languages enabled with equal weights! 🌍")
         
     def _apply_english_only_preset(self):
@@ -730,9 +857,11 @@ class SettingsWindow:
             "Zambal": {"enabled": False, "weight": 0.0},
             "japanese": {"enabled": False, "weight": 0.0},
         }
-        config.set("LANGUAGES", languages)
-        config.set("SLANG_ENABLED", True)
-        config.set("SLANG_INTENSITY", 0.7)
+        config.update({
+            "LANGUAGES": languages,
+            "SLANG_ENABLED": True,
+            "SLANG_INTENSITY": 0.7,
+        })
         messagebox.showinfo("Preset Applied", "English only mode activated! 🇺🇸")
         
     def _apply_filipino_mix_preset(self):
@@ -744,10 +873,12 @@ class SettingsWindow:
             "Zambal": {"enabled": False, "weight": 0.0},
             "japanese": {"enabled": False, "weight": 0.0},
         }
-        config.set("LANGUAGES", languages)
-        config.set("SLANG_ENABLED", True)
-        config.set("SLANG_INTENSITY", 0.8)
-        config.set("CODE_SWITCHING", True)
+        config.update({
+            "LANGUAGES": languages,
+            "SLANG_ENABLED": True,
+            "SLANG_INTENSITY": 0.8,
+            "CODE_SWITCHING": True,
+        })
         messagebox.showinfo("Preset Applied", "Filipino language mix activated! 🇵🇭")
         
     def _apply_international_preset(self):
@@ -759,10 +890,12 @@ class SettingsWindow:
             "Zambal": {"enabled": True, "weight": 0.2},
             "japanese": {"enabled": True, "weight": 0.1},
         }
-        config.set("LANGUAGES", languages)
-        config.set("SLANG_ENABLED", True)
-        config.set("SLANG_INTENSITY", 0.4)
-        config.set("CODE_SWITCHING", True)
+        config.update({
+            "LANGUAGES": languages,
+            "SLANG_ENABLED": True,
+            "SLANG_INTENSITY": 0.4,
+            "CODE_SWITCHING": True,
+        })
         messagebox.showinfo("Preset Applied", "International language mix activated! 🌐")
         
     def _apply_max_slang_preset(self):
@@ -774,12 +907,14 @@ class SettingsWindow:
             "Zambal": {"enabled": False, "weight": 0.0},
             "japanese": {"enabled": False, "weight": 0.0},
         }
-        config.set("LANGUAGES", languages)
-        config.set("SLANG_ENABLED", True)
-        config.set("SLANG_INTENSITY", 1.0)
-        config.set("FORMALITY_LEVEL", 0.0)
-        config.set("EMOTE_FREQUENCY", 0.9)
-        config.set("INTERNET_SPEAK", 0.9)
+        config.update({
+            "LANGUAGES": languages,
+            "SLANG_ENABLED": True,
+            "SLANG_INTENSITY": 1.0,
+            "FORMALITY_LEVEL": 0.0,
+            "EMOTE_FREQUENCY": 0.9,
+            "INTERNET_SPEAK": 0.9,
+        })
         messagebox.showinfo("Preset Applied", "Maximum slang mode activated! Very casual chat! 🔥")
         
     def _create_event_settings(self, parent, num_settings):
@@ -797,51 +932,51 @@ class SettingsWindow:
         
         # Event settings with descriptions
         event_settings = [
-            ("New Follower Chance", "EVENT_FOLLOWER_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.1, "resolution": 0.001, 
-              "description": "Probability of new follower event per check"}),
+            ("New Follower Rate", "EVENT_FOLLOWER_RATE", "scale", 
+             {"from_": 0.0, "to": 0.6, "resolution": 0.002, 
+              "description": "Average new follower events per minute"}),
             
-            ("New Subscriber Chance", "EVENT_SUBSCRIBER_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.05, "resolution": 0.001,
-              "description": "Probability of new subscriber event per check"}),
+            ("New Subscriber Rate", "EVENT_SUBSCRIBER_RATE", "scale", 
+             {"from_": 0.0, "to": 0.3, "resolution": 0.002, 
+              "description": "Average new subscriber events per minute"}),
             
-            ("Hype Train Chance", "EVENT_HYPE_TRAIN_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.02, "resolution": 0.001,
-              "description": "Probability of hype train level increase"}),
+            ("Hype Train Rate", "EVENT_HYPE_TRAIN_RATE", "scale", 
+             {"from_": 0.0, "to": 0.12, "resolution": 0.002, 
+              "description": "Average hype train level increases per minute"}),
             
-            ("Raid Chance", "EVENT_RAID_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.01, "resolution": 0.001,
-              "description": "Probability of incoming raid event"}),
+            ("Raid Rate", "EVENT_RAID_RATE", "scale", 
+             {"from_": 0.0, "to": 0.06, "resolution": 0.002, 
+              "description": "Average incoming raids per minute"}),
             
-            ("Host Chance", "EVENT_HOST_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.008, "resolution": 0.001,
-              "description": "Probability of host event"}),
+            ("Host Rate", "EVENT_HOST_RATE", "scale", 
+             {"from_": 0.0, "to": 0.048, "resolution": 0.002, 
+              "description": "Average host events per minute"}),
             
-            ("Bits Chance", "EVENT_BITS_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.03, "resolution": 0.001,
-              "description": "Probability of bits donation event"}),
+            ("Bits Rate", "EVENT_BITS_RATE", "scale", 
+             {"from_": 0.0, "to": 0.18, "resolution": 0.002, 
+              "description": "Average bits donations per minute"}),
             
-            ("Sub Streak Chance", "EVENT_SUB_STREAK_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.04, "resolution": 0.001,
-              "description": "Probability of sub streak announcement"}),
+            ("Sub Streak Rate", "EVENT_SUB_STREAK_RATE", "scale", 
+             {"from_": 0.0, "to": 0.24, "resolution": 0.002, 
+              "description": "Average sub streak announcements per minute"}),
             
-            ("Follower Goal Chance", "EVENT_FOLLOWER_GOAL_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.08, "resolution": 0.001,
-              "description": "Probability of follower goal update"}),
+            ("Follower Goal Rate", "EVENT_FOLLOWER_GOAL_RATE", "scale", 
+             {"from_": 0.0, "to": 0.48, "resolution": 0.002, 
+              "description": "Average follower goal updates per minute"}),
             
-            ("Giveaway Chance", "EVENT_GIVEAWAY_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.005, "resolution": 0.001,
-              "description": "Probability of giveaway start"}),
+            ("Giveaway Rate", "EVENT_GIVEAWAY_RATE", "scale", 
+             {"from_": 0.0, "to": 0.03, "resolution": 0.002, 
+              "description": "Average giveaway starts per minute"}),
             
-            ("Milestone Chance", "EVENT_MILESTONE_CHANCE", "scale", 
-             {"from_": 0.0, "to": 0.005, "resolution": 0.001,
-              "description": "Probability of milestone achievement"}),
+            ("Milestone Rate", "EVENT_MILESTONE_RATE", "scale", 
+             {"from_": 0.0, "to": 0.03, "resolution": 0.002, 
+              "description": "Average milestone achievements per minute"}),
         ]
         
         # Viewer dynamics settings
         viewer_settings = [
             ("Base Viewer Count", "VIEWER_BASE_COUNT", "scale", 
-             {"from_": 10, "to": 200, "resolution": 5,
+             {"from_": 10, "to": 20000, "resolution": 10,
               "description": "Average number of viewers when stream is live"}),
             
             ("Viewer Fluctuation Min", "VIEWER_FLUCTUATION_MIN", "scale", 
@@ -859,6 +994,10 @@ class SettingsWindow:
             ("Peak Hour Multiplier", "VIEWER_PEAK_HOUR_MULTIPLIER", "scale", 
              {"from_": 1.0, "to": 3.0, "resolution": 0.1,
               "description": "Viewer multiplier during peak hours (6PM-10PM)"}),
+            
+            ("Synthetic Population", "SYNTHETIC_POPULATION_SIZE", "scale", 
+             {"from_": 0, "to": 200000, "resolution": 1000,
+              "description": "Generated viewers to draw chatters from (0 = username pool, requires restart)"}),
         ]
         
         # Add section label for events
@@ -927,20 +1066,24 @@ class SettingsWindow:
             ("Memory Optimization", "MEMORY_OPTIMIZATION", "checkbox", {"description": "Optimize memory usage"}),
             ("Keep-Alive Connection", "KEEP_ALIVE_CONNECTION", "checkbox", {"description": "Maintain persistent LLM connection"}),
             ("Debounced LLM Calls", "DEBOUNCED_LLM_CALLS", "checkbox", {"description": "Wait for pauses before new LLM calls"}),
+            ("Inline Emote Images", "INLINE_EMOTES", "checkbox", {"description": "Show emote images in chat instead of colored text"}),
             ("Lazy Load Emotes", "LAZY_LOAD_EMOTES", "checkbox", {"description": "Load emote images only when first used"}),
             ("Compression Enabled", "COMPRESSION_ENABLED", "checkbox", {"description": "Compress images to reduce memory usage"}),
             ("Queue Prioritization", "QUEUE_PRIORITIZATION", "checkbox", {"description": "User messages get priority over AI generation"}),
             ("Auto Clear Queue", "AUTO_CLEAR_QUEUE", "checkbox", {"description": "Automatically clear queue when it gets too full"}),
             ("Retry Failed Requests", "RETRY_FAILED_REQUESTS", "checkbox", {"description": "Automatically retry failed LLM requests"}),
+            ("Virtualized Chat View", "VIRTUAL_CHAT_VIEW", "checkbox", {"description": "Only render visible messages for very long sessions"}),
+            ("Chat Log To Disk", "CHAT_LOG_ENABLED", "checkbox", {"description": "Keep the full session history on disk for export"}),
+            ("Persist Channel State", "CHANNEL_STATE_ENABLED", "checkbox", {"description": "Resume followers, subs and chatters next launch"}),
         ]
         
-        for i, (label, setting, type_, kwargs) in enumerate(settings[:10]):
+        for i, (label, setting, type_, kwargs) in enumerate(settings):
             self._create_setting_widget(scrollable_frame, label, setting, type_, kwargs, i)
         
         # Queue management section
         queue_label = tk.Label(scrollable_frame, text="Queue Management", 
                               bg="#0E0E10", fg="#9147FF", font=("Segoe UI", 12, "bold"))
-        queue_label.grid(row=10, column=0, sticky="w", pady=(20, 10))
+        queue_label.grid(row=len(settings), column=0, sticky="w", pady=(20, 10))
         
         queue_settings = [
             ("Max Queue Size", "MAX_QUEUE_SIZE", "scale", {"from_": 1, "to": 10, "resolution": 10, "description": "Maximum messages in queue before auto-clear"}),
@@ -949,9 +1092,11 @@ class SettingsWindow:
             ("Max Retries", "MAX_RETRIES", "scale", {"from_": 0, "to": 10, "resolution": 1, "description": "Maximum retry attempts for failed requests"}),
             ("Concurrent Requests", "CONCURRENT_REQUESTS", "scale", {"from_": 0, "to": 3, "resolution": 1, "description": "Maximum simultaneous LLM requests"}),
             ("Request Buffer Size", "REQUEST_BUFFER_SIZE", "scale", {"from_": 5, "to": 50, "resolution": 5, "description": "Buffer size for pending LLM requests"}),
+            ("User Table Size", "USER_TABLE_SIZE", "scale", {"from_": 1000, "to": 100000, "resolution": 1000, "description": "Users kept in memory before spilling to disk"}),
+            ("Emote Image Memory (MB)", "EMOTE_IMAGE_CACHE_MB", "scale", {"from_": 4, "to": 256, "resolution": 4, "description": "Memory budget for decoded emote images"}),
         ]
         
-        start_row = 11
+        start_row = len(settings) + 1
         for i, (label, setting, type_, kwargs) in enumerate(queue_settings):
             self._create_setting_widget(scrollable_frame, label, setting, type_, kwargs, start_row + i)
         
@@ -1105,15 +1250,8 @@ class SettingsWindow:
             restart_label.grid(row=0, column=4, padx=(10, 0))
     
     def _update_setting(self, name, value):
+        # Subsystems that cache settings subscribe to config and reconfigure themselves
         config.set(name, value)
-        
-        if name == "CHAT_DENSITY" and hasattr(self.app, '_update_chat_density'):
-            self.app._update_chat_density()
-        elif name == "TEXT_SIZE" and hasattr(self.app, '_update_font_size'):
-            self.app._update_font_size(value)
-        elif name == "WINDOW_ON_TOP" and hasattr(self.app, 'root'):
-            self.app.root.attributes("-topmost", value)
-        
         print(f"[INFO] Updated {name} = {value}")
     
     def _load_defaults(self):
@@ -1127,7 +1265,7 @@ class SettingsWindow:
             "RESPOND_TO_STREAMER_CHANCE": 0.9,
             "ANIMATIONS_ENABLED": False, "SMOOTH_SCROLLING": False,
             "PERSONALITY_HYPE": 1.8, "PERSONALITY_GAMER": 1.5, "PERSONALITY_CLIP_GOBLIN": 1.6,
-            "EVENT_FOLLOWER_CHANCE": 0.05, "EVENT_SUBSCRIBER_CHANCE": 0.03,
+            "EVENT_FOLLOWER_RATE": 0.3, "EVENT_SUBSCRIBER_RATE": 0.18,
             "VIEWER_BASE_COUNT": 80, "VIEWER_PEAK_HOUR_MULTIPLIER": 2.0
         }
         self._apply_preset(updates, "Tournament Mode activated! 🎮")
@@ -1139,7 +1277,7 @@ class SettingsWindow:
             "RESPOND_TO_STREAMER_CHANCE": 0.6,
             "ANIMATIONS_ENABLED": True, "SMOOTH_SCROLLING": True,
             "PERSONALITY_WHOLESOME": 1.7, "PERSONALITY_LOL": 1.3, "PERSONALITY_TOXIC": 0.1,
-            "EVENT_FOLLOWER_CHANCE": 0.01, "EVENT_SUBSCRIBER_CHANCE": 0.005,
+            "EVENT_FOLLOWER_RATE": 0.06, "EVENT_SUBSCRIBER_RATE": 0.03,
             "VIEWER_BASE_COUNT": 25, "VIEWER_PEAK_HOUR_MULTIPLIER": 1.2
         }
         self._apply_preset(updates, "Chill Stream mode activated! 🌿")
@@ -1151,7 +1289,7 @@ class SettingsWindow:
             "RESPOND_TO_STREAMER_CHANCE": 0.95,
             "ANIMATIONS_ENABLED": True, "SMOOTH_SCROLLING": True,
             "PERSONALITY_HYPE": 1.9, "PERSONALITY_EMOTE_SPAMMER": 1.5, "PERSONALITY_LOL": 1.4,
-            "EVENT_FOLLOWER_CHANCE": 0.08, "EVENT_HYPE_TRAIN_CHANCE": 0.015,
+            "EVENT_FOLLOWER_RATE": 0.48, "EVENT_HYPE_TRAIN_RATE": 0.09,
             "VIEWER_BASE_COUNT": 120, "VIEWER_PEAK_HOUR_MULTIPLIER": 2.5
         }
         self._apply_preset(updates, "Hype Chat mode activated! 🔥")
@@ -1163,7 +1301,7 @@ class SettingsWindow:
             "RESPOND_TO_STREAMER_CHANCE": 0.7,
             "ANIMATIONS_ENABLED": True, "SMOOTH_SCROLLING": True,
             "PERSONALITY_LORE_SCHOLAR": 1.6, "PERSONALITY_ADVICE": 1.3, "PERSONALITY_QUESTION": 1.4,
-            "EVENT_FOLLOWER_CHANCE": 0.03, "EVENT_SUBSCRIBER_CHANCE": 0.02,
+            "EVENT_FOLLOWER_RATE": 0.18, "EVENT_SUBSCRIBER_RATE": 0.12,
             "VIEWER_BASE_COUNT": 40, "VIEWER_PEAK_HOUR_MULTIPLIER": 1.3
         }
         self._apply_preset(updates, "Creative Mode activated! 📚")
@@ -1175,7 +1313,7 @@ class SettingsWindow:
             "RESPOND_TO_STREAMER_CHANCE": 0.85,
             "ANIMATIONS_ENABLED": True, "SMOOTH_SCROLLING": True,
             "PERSONALITY_HYPE": 1.7, "PERSONALITY_EMOTE_SPAMMER": 1.8, "PERSONALITY_LOL": 1.6,
-            "EVENT_FOLLOWER_CHANCE": 0.1, "EVENT_RAID_CHANCE": 0.01,
+            "EVENT_FOLLOWER_RATE": 0.6, "EVENT_RAID_RATE": 0.06,
             "VIEWER_BASE_COUNT": 150, "VIEWER_PEAK_HOUR_MULTIPLIER": 2.8
         }
         self._apply_preset(updates, "Party Mode activated! 🎉")
@@ -1186,7 +1324,7 @@ class SettingsWindow:
             "MODJV_CHAT_CHANCE": 0.08, "CHATTER_REPLY_CHANCE": 0.5,
             "RESPOND_TO_STREAMER_CHANCE": 0.8,
             "PERSONALITY_SPEEDRUNNER": 1.8, "PERSONALITY_BACKSEAT_GAMER": 1.5, "PERSONALITY_ADVICE": 1.4,
-            "EVENT_FOLLOWER_CHANCE": 0.04, "EVENT_BITS_CHANCE": 0.02,
+            "EVENT_FOLLOWER_RATE": 0.24, "EVENT_BITS_RATE": 0.12,
             "VIEWER_BASE_COUNT": 60, "VIEWER_PEAK_HOUR_MULTIPLIER": 1.8
         }
         self._apply_preset(updates, "Speedrun Mode activated! ⚡")
@@ -1197,7 +1335,7 @@ class SettingsWindow:
             "MODJV_CHAT_CHANCE": 0.03, "CHATTER_REPLY_CHANCE": 0.3,
             "RESPOND_TO_STREAMER_CHANCE": 0.6,
             "PERSONALITY_WHOLESOME": 1.5, "PERSONALITY_LOL": 1.2, "PERSONALITY_QUESTION": 1.1,
-            "EVENT_FOLLOWER_CHANCE": 0.015, "EVENT_SUBSCRIBER_CHANCE": 0.008,
+            "EVENT_FOLLOWER_RATE": 0.09, "EVENT_SUBSCRIBER_RATE": 0.048,
             "VIEWER_BASE_COUNT": 35, "VIEWER_PEAK_HOUR_MULTIPLIER": 1.4
         }
         self._apply_preset(updates, "Music Stream mode activated! 🎵")
@@ -1208,12 +1346,12 @@ class SettingsWindow:
             "MODJV_CHAT_CHANCE": 0.04, "CHATTER_REPLY_CHANCE": 0.9,
             "RESPOND_TO_STREAMER_CHANCE": 0.5,
             "PERSONALITY_LORE_SCHOLAR": 1.8, "PERSONALITY_QUESTION": 1.5, "PERSONALITY_ADVICE": 1.2,
-            "EVENT_FOLLOWER_CHANCE": 0.025, "EVENT_MILESTONE_CHANCE": 0.003,
+            "EVENT_FOLLOWER_RATE": 0.15, "EVENT_MILESTONE_RATE": 0.018,
             "VIEWER_BASE_COUNT": 30, "VIEWER_PEAK_HOUR_MULTIPLIER": 1.2
         }
         self._apply_preset(updates, "Story Mode activated! 📖")
     
     def _apply_preset(self, updates, message):
-        for key, value in updates.items():
-            self._update_setting(key, value)
+        # One atomic update so the engine never sees half a preset
+        config.update(updates)
         messagebox.showinfo("Preset Applied", message)
@@ -0,0 +1,136 @@
+import dbm
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# ===========================
+# BOUNDED USER TABLES
+# ===========================
+
+class ColdUserStore:
+    """On-disk key/value store for users evicted from memory (dbm + JSON values)"""
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = dbm.open(path, "c")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table, key):
+        return f"{table}:{key}".encode("utf-8")
+
+    def put(self, table, key, value):
+        with self._lock:
+            if self._db is not None:
+                self._db[self._key(table, key)] = json.dumps(value).encode("utf-8")
+
+    def has(self, table, key):
+        with self._lock:
+            return self._db is not None and self._key(table, key) in self._db
+
+    def pop(self, table, key):
+        """Remove and return a stored value, or None"""
+        db_key = self._key(table, key)
+        with self._lock:
+            if self._db is None or db_key not in self._db:
+                return None
+            value = json.loads(self._db[db_key])
+            del self._db[db_key]
+            return value
+
+    def count(self):
+        with self._lock:
+            return len(self._db) if self._db is not None else 0
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+class LRUTable:
+    """Dict-like table holding at most `capacity` users in memory.
+
+    The least recently used entry is evicted on overflow and handed to
+    the cold store, if one is attached; a later lookup promotes it back.
+    Without a cold store evicted users are simply forgotten. Not
+    thread-safe on its own, callers (TwitchData) hold their lock.
+    """
+    def __init__(self, name, capacity, default_factory=None, cold_store=None):
+        self.name = name
+        self.capacity = max(1, int(capacity))
+        self.default_factory = default_factory
+        self.cold_store = cold_store
+        self._items = OrderedDict()
+        self.evictions = 0
+
+    def _promote(self, key):
+        if key in self._items:
+            self._items.move_to_end(key)
+            return True
+        if self.cold_store is not None:
+            value = self.cold_store.pop(self.name, key)
+            if value is not None:
+                self._insert(key, value)
+                return True
+        return False
+
+    def _insert(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        self._evict_overflow()
+
+    def _evict_overflow(self):
+        while len(self._items) > self.capacity:
+            old_key, old_value = self._items.popitem(last=False)
+            self.evictions += 1
+            if self.cold_store is not None:
+                self.cold_store.put(self.name, old_key, old_value)
+
+    def __getitem__(self, key):
+        if self._promote(key):
+            return self._items[key]
+        if self.default_factory is None:
+            raise KeyError(key)
+        value = self.default_factory()
+        self._insert(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._items:
+            self._items[key] = value
+            self._items.move_to_end(key)
+        else:
+            if self.cold_store is not None:
+                self.cold_store.pop(self.name, key)
+            self._insert(key, value)
+
+    def restore(self, key, value):
+        """Set a value loaded from a snapshot unless a newer copy was spilled to disk.
+
+        A user only reaches the cold store after its last in-memory write,
+        so a spilled copy is always at least as new as saved snapshots.
+        """
+        if self.cold_store is not None and key not in self._items and self.cold_store.has(self.name, key):
+            return
+        self[key] = value
+
+    def get(self, key, default=None):
+        return self._items[key] if self._promote(key) else default
+
+    def __contains__(self, key):
+        """Only checks memory; use get() to include cold users"""
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def items(self):
+        return list(self._items.items())
+
+    def resize(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._evict_overflow()